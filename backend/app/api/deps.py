@@ -0,0 +1,19 @@
+"""Shared endpoint dependencies."""
+
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from app.core.security import TokenData, verify_token
+
+bearer_scheme = HTTPBearer(auto_error=False)
+
+def get_bearer_token(credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme)) -> str:
+    if credentials is None:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    return credentials.credentials
+
+def get_current_user(token: str = Depends(get_bearer_token)) -> TokenData:
+    """Authenticated caller from the bearer token, via the verified-token cache."""
+    data = verify_token(token)
+    if data is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired token", headers={"WWW-Authenticate": "Bearer"})
+    return data
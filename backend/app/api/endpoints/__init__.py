@@ -1,3 +1,3 @@
-from app.api.endpoints import environment, education, user, ai
+from app.api.endpoints import environment, education, user, ai, lod, export
 
-__all__ = ["environment", "education", "user", "ai"]
+__all__ = ["environment", "education", "user", "ai", "lod", "export"]
@@ -1,14 +1,42 @@
-from fastapi import APIRouter, Depends
+import asyncio
+import json
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from app.db import get_db
-from app.models import AIAnalysis, GreenAction
-from app.schemas.ai_result import AIAnalysisResponse, GreenActionResponse, AIAnalysisCreate, GreenActionCreate
+from app.models import AIAnalysis, GreenAction, AQIForecast
+from app.schemas.ai_result import (
+    AIAnalysisResponse,
+    GreenActionResponse,
+    AIAnalysisCreate,
+    GreenActionCreate,
+    AnalysisJobCreate,
+    AnalysisJobResponse,
+    ScenarioSimulationRequest,
+    AQIForecastResponse,
+)
+from app.core.config import settings
+from app.services.ai_service import AIService
+from app.services.analysis_inputs import AnalysisInputs
+from app.services.analysis_jobs import analysis_jobs, JobQueueFull
+from app.services.spatial_join import SpatialJoin
+from app.services.forecasting import AQIForecaster
+from app.services.analysis_materializer import AnalysisMaterializer
+from app.services.streaming_stats import correlation_stream
+from app.services.model_store import model_store
 
 router = APIRouter(prefix="/api", tags=["ai"])
 
 @router.get("/ai/analysis", response_model=list[AIAnalysisResponse])
-def list_ai_analysis(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(AIAnalysis).offset(skip).limit(limit).all()
+def list_ai_analysis(ward_name: str = None, source: str = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    query = db.query(AIAnalysis)
+    if ward_name:
+        query = query.filter(AIAnalysis.ward_name == ward_name)
+    if source:
+        query = query.filter(AIAnalysis.source == source)
+    return query.order_by(AIAnalysis.id).offset(skip).limit(limit).all()
 
 @router.post("/ai/analysis", response_model=AIAnalysisResponse)
 def create_ai_analysis(analysis: AIAnalysisCreate, db: Session = Depends(get_db)):
@@ -19,8 +47,13 @@ def create_ai_analysis(analysis: AIAnalysisCreate, db: Session = Depends(get_db)
     return db_analysis
 
 @router.get("/ai/recommendations", response_model=list[GreenActionResponse])
-def list_green_actions(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(GreenAction).offset(skip).limit(limit).all()
+def list_green_actions(ward_name: str = None, source: str = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    query = db.query(GreenAction)
+    if ward_name:
+        query = query.filter(GreenAction.ward_name == ward_name)
+    if source:
+        query = query.filter(GreenAction.source == source)
+    return query.order_by(GreenAction.id).offset(skip).limit(limit).all()
 
 @router.post("/ai/recommendations", response_model=GreenActionResponse)
 def create_green_action(action: GreenActionCreate, db: Session = Depends(get_db)):
@@ -29,3 +62,102 @@ def create_green_action(action: GreenActionCreate, db: Session = Depends(get_db)
     db.commit()
     db.refresh(db_action)
     return db_action
+
+@router.get("/ai/correlations/live")
+def list_live_correlations(ward_name: str = None):
+    wards = [ward_name] if ward_name else correlation_stream.wards()
+    return [correlation_stream.correlations(ward) for ward in wards]
+
+@router.get("/ai/models/stats")
+def get_model_store_stats():
+    return model_store.stats()
+
+@router.post("/ai/jobs", response_model=AnalysisJobResponse, status_code=202)
+def create_analysis_job(job: AnalysisJobCreate, db: Session = Depends(get_db)):
+    if job.kind == "correlation":
+        if not job.ward_name:
+            raise HTTPException(status_code=422, detail="ward_name is required for correlation jobs")
+        aligned = SpatialJoin.aligned_features(db, job.ward_name)
+        payload = {
+            "ward_name": job.ward_name,
+            "aligned": aligned,
+            "forecast_peak_aqi": AQIForecaster.peak(db, job.ward_name),
+        }
+    else:
+        payload = {"wards": AnalysisInputs.ward_aggregates(db), "n_clusters": job.n_clusters}
+
+    try:
+        job_id = analysis_jobs.submit(db, job.kind, payload)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return analysis_jobs.status(db, job_id)
+
+@router.get("/ai/jobs/{job_id}", response_model=AnalysisJobResponse)
+def get_analysis_job(job_id: str, db: Session = Depends(get_db)):
+    status = analysis_jobs.status(db, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return status
+
+@router.get("/ai/jobs/{job_id}/events")
+async def stream_analysis_job(job_id: str):
+    if await run_in_threadpool(analysis_jobs.fetch_status, job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        last = None
+        while True:
+            status = await run_in_threadpool(analysis_jobs.fetch_status, job_id)
+            if status is None:
+                return
+            if status["status"] != last:
+                last = status["status"]
+                yield f"event: {last}\ndata: {json.dumps(jsonable_encoder(status))}\n\n"
+            if status["finished_at"] is not None:
+                return
+            future = analysis_jobs.get_future(job_id)
+            if future is not None and not future.done():
+                # Wake as soon as the worker finishes, with a periodic heartbeat
+                await asyncio.wait({asyncio.wrap_future(future)}, timeout=15)
+            elif future is not None:
+                await asyncio.sleep(0.1)  # finished here, waiting for the writer to record it
+            else:
+                await asyncio.sleep(1)  # running on another worker
+            yield ": keep-alive\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+@router.post("/ai/scenarios")
+def simulate_scenarios(request: ScenarioSimulationRequest, db: Session = Depends(get_db)):
+    if request.n_draws is not None and not 100 <= request.n_draws <= settings.scenario_max_draws:
+        raise HTTPException(status_code=422, detail=f"n_draws must be between 100 and {settings.scenario_max_draws}")
+    scenarios = [scenario.dict() for scenario in request.scenarios]
+    result = AIService.simulate_scenarios(scenarios, AnalysisInputs.ward_aggregates(db), request.n_draws, request.seed)
+    if "error" in result:
+        raise HTTPException(status_code=422, detail=result["error"])
+    return result
+
+@router.get("/ai/forecasts", response_model=list[AQIForecastResponse])
+def list_forecasts(ward_name: str = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    query = db.query(AQIForecast)
+    if ward_name:
+        query = query.filter(AQIForecast.ward_name == ward_name)
+    return query.order_by(AQIForecast.ward_name, AQIForecast.target_time).offset(skip).limit(limit).all()
+
+@router.post("/ai/forecasts/refresh")
+def refresh_forecasts(db: Session = Depends(get_db)):
+    return AQIForecaster.refit_all(db)
+
+@router.post("/ai/materialize")
+def materialize_analysis(force: bool = False, db: Session = Depends(get_db)):
+    return AnalysisMaterializer.run(db, force=force)
+
+@router.get("/ai/significance")
+def get_correlation_significance(ward_name: str = None, iterations: int = None, seed: int = None, db: Session = Depends(get_db)):
+    if iterations is not None and not 100 <= iterations <= settings.resampling_max_iterations:
+        raise HTTPException(status_code=422, detail=f"iterations must be between 100 and {settings.resampling_max_iterations}")
+    per_ward = SpatialJoin.split_by_ward(SpatialJoin.aligned_features(db, ward_name))
+    result = AIService.correlation_significance(per_ward, iterations, seed)
+    if "error" in result:
+        raise HTTPException(status_code=422, detail=result["error"])
+    return result
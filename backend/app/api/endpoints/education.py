@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from app.db import get_db
 from app.models import School, Course
 from app.schemas.education import SchoolResponse, CourseResponse, SchoolCreate, CourseCreate
+from app.services.streaming_stats import correlation_stream
 
 router = APIRouter(prefix="/api", tags=["education"])
 
@@ -16,6 +17,8 @@ def create_school(school: SchoolCreate, db: Session = Depends(get_db)):
     db.add(db_school)
     db.commit()
     db.refresh(db_school)
+    if db_school.avg_score is not None:
+        correlation_stream.observe(db_school.ward_name, "school_score", db_school.avg_score * 100)
     return db_school
 
 @router.get("/courses", response_model=list[CourseResponse])
@@ -1,8 +1,21 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import and_, func, or_
 from sqlalchemy.orm import Session
 from app.db import get_db
 from app.models import AirQuality, WeatherData, EnergyData
-from app.schemas.air_quality import AirQualityResponse, WeatherDataResponse, EnergyDataResponse
+from app.schemas.air_quality import (
+    AirQualityResponse,
+    AirQualityCreate,
+    WeatherDataResponse,
+    EnergyDataResponse,
+    EnergyDataCreate,
+)
+from app.services.streaming_stats import correlation_stream, renewable_percentage
+from app.services.aqi_raster import AQIRaster, aqi_tiles
+from app.services.forecasting import AQIForecaster
+from app.services.anomaly_detection import aqi_anomalies, coordinate_range, station_key
 
 router = APIRouter(prefix="/api", tags=["environment"])
 
@@ -10,6 +23,84 @@ router = APIRouter(prefix="/api", tags=["environment"])
 def get_air_quality(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     return db.query(AirQuality).offset(skip).limit(limit).all()
 
+def _near(column, rounded: float):
+    """Readings whose coordinate ``station_key`` rounds to ``rounded`` (missing ones count as 0)."""
+    low, high = coordinate_range(rounded)
+    clause = and_(column >= low, column < high)
+    return or_(clause, column.is_(None)) if rounded == 0.0 else clause
+
+@router.post("/air-quality", response_model=AirQualityResponse)
+def create_air_quality(reading: AirQualityCreate, db: Session = Depends(get_db)):
+    key = station_key(reading.ward_name, reading.lat, reading.lng)
+    if aqi_anomalies.needs_seed(key):
+        # (Re)load this station's recent history, including readings other workers stored
+        ward_name, lat, lng = key
+        recent = (
+            db.query(AirQuality.aqi)
+            .filter(
+                AirQuality.ward_name == ward_name,
+                _near(AirQuality.lat, lat),
+                _near(AirQuality.lng, lng),
+                AirQuality.valid(),
+            )
+            .order_by(AirQuality.id.desc())
+            .limit(aqi_anomalies.window)
+            .all()
+        )
+        aqi_anomalies.seed(key, [aqi for (aqi,) in reversed(recent) if aqi is not None])
+    score, is_anomaly = aqi_anomalies.check(key, reading.aqi)
+
+    # updated_at changes on later edits; the forecast buckets by when the reading was taken
+    observed_at = datetime.utcnow()
+    db_reading = AirQuality(**reading.dict(), is_anomaly=is_anomaly, anomaly_score=score, updated_at=observed_at)
+    db.add(db_reading)
+    db.commit()
+    db.refresh(db_reading)
+    if not is_anomaly:
+        correlation_stream.observe(db_reading.ward_name, "aqi", db_reading.aqi)
+        aqi_tiles.observe(db_reading.lat, db_reading.lng, db_reading.aqi)
+        AQIForecaster.observe_reading(db, db_reading.ward_name, db_reading.aqi, observed_at)
+    return db_reading
+
+@router.get("/air-quality/anomalies", response_model=list[AirQualityResponse])
+def list_air_quality_anomalies(ward_name: str = None, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    query = db.query(AirQuality).filter(AirQuality.is_anomaly.is_(True))
+    if ward_name:
+        query = query.filter(AirQuality.ward_name == ward_name)
+    return query.order_by(AirQuality.id.desc()).offset(skip).limit(limit).all()
+
+@router.get("/air-quality/grid")
+def get_air_quality_grid(
+    ward_name: str = None,
+    lat_min: float = None,
+    lat_max: float = None,
+    lng_min: float = None,
+    lng_max: float = None,
+    resolution: int = 64,
+    db: Session = Depends(get_db),
+):
+    if not 2 <= resolution <= 512:
+        raise HTTPException(status_code=422, detail="resolution must be between 2 and 512")
+    if None in (lat_min, lat_max, lng_min, lng_max):
+        query = db.query(func.min(AirQuality.lat), func.max(AirQuality.lat), func.min(AirQuality.lng), func.max(AirQuality.lng))
+        if ward_name:
+            query = query.filter(AirQuality.ward_name == ward_name)
+        lat_min, lat_max, lng_min, lng_max = query.one()
+        if lat_min is None:
+            raise HTTPException(status_code=404, detail="No air quality stations found")
+    return AQIRaster.grid(aqi_tiles.stations(db), lat_min, lat_max, lng_min, lng_max, resolution)
+
+@router.get("/air-quality/tiles/{z}/{x}/{y}.{fmt}")
+def get_air_quality_tile(z: int, x: int, y: int, fmt: Literal["png", "json"], request: Request, db: Session = Depends(get_db)):
+    if not (0 <= z <= 22 and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=404, detail="Tile out of range")
+    content, fingerprint = aqi_tiles.get_tile(db, z, x, y, fmt)
+    headers = {"ETag": f'"{fingerprint}"', "Cache-Control": "public, max-age=60"}
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    media_type = "image/png" if fmt == "png" else "application/json"
+    return Response(content=content, media_type=media_type, headers=headers)
+
 @router.get("/weather", response_model=list[WeatherDataResponse])
 def get_weather(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     return db.query(WeatherData).offset(skip).limit(limit).all()
@@ -17,3 +108,16 @@ def get_weather(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
 @router.get("/energy", response_model=list[EnergyDataResponse])
 def get_energy(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     return db.query(EnergyData).offset(skip).limit(limit).all()
+
+@router.post("/energy", response_model=EnergyDataResponse)
+def create_energy(energy: EnergyDataCreate, db: Session = Depends(get_db)):
+    db_energy = EnergyData(**energy.dict())
+    db.add(db_energy)
+    db.commit()
+    db.refresh(db_energy)
+    correlation_stream.observe(
+        db_energy.ward_name,
+        "renewable_percentage",
+        renewable_percentage(db_energy.solar_potential_kw, db_energy.current_usage_kw),
+    )
+    return db_energy
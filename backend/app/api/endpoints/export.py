@@ -0,0 +1,29 @@
+from datetime import datetime
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from app.services.columnar_export import FORMATS, TABLES, ColumnarExporter, pyarrow_available
+
+router = APIRouter(prefix="/api", tags=["export"])
+
+@router.get("/export/{table}.{fmt}")
+def export_columnar(table: str, fmt: str, columns: str = None, start: datetime = None, end: datetime = None, compression: str = None):
+    if table not in TABLES or fmt not in FORMATS:
+        raise HTTPException(status_code=404, detail=f"Unknown export: {table}.{fmt}")
+    if not pyarrow_available():
+        raise HTTPException(status_code=503, detail="Columnar export requires pyarrow")
+    try:
+        exporter = ColumnarExporter(
+            table,
+            columns=[name.strip() for name in columns.split(",") if name.strip()] if columns else None,
+            start=start,
+            end=end,
+            fmt=fmt,
+            compression=compression,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return StreamingResponse(
+        exporter.iter_chunks(),
+        media_type=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{table}.{fmt}"'},
+    )
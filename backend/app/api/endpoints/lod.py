@@ -0,0 +1,76 @@
+from datetime import datetime
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.services.lod_stream import (
+    DATASETS,
+    MEDIA_TYPES,
+    LODStreamExporter,
+    accepts_gzip,
+    gzip_chunks,
+    jsonld_context,
+    watermark,
+)
+from app.services.sparql_store import lod_store, SPARQLQueryError
+
+router = APIRouter(prefix="/api", tags=["lod"])
+
+@router.get("/lod/context.jsonld")
+def get_lod_context():
+    return jsonld_context()
+
+def _run_sparql(query: str) -> Response:
+    if not query:
+        raise HTTPException(status_code=400, detail="Missing SPARQL query")
+    try:
+        media_type, body = lod_store.query(query)
+    except SPARQLQueryError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid SPARQL query: {e}")
+    return Response(content=body, media_type=media_type)
+
+@router.get("/lod/sparql")
+def sparql_query(query: str = None):
+    return _run_sparql(query)
+
+@router.post("/lod/sparql")
+async def sparql_query_post(request: Request):
+    # SPARQL 1.1 protocol: form-encoded ``query`` or a raw application/sparql-query body
+    if request.headers.get("content-type", "").startswith("application/sparql-query"):
+        query = (await request.body()).decode("utf-8")
+    else:
+        query = (await request.form()).get("query")
+    return await run_in_threadpool(_run_sparql, query)
+
+@router.get("/lod/sparql/stats")
+def sparql_stats():
+    return lod_store.stats()
+
+@router.post("/lod/sparql/sync")
+def sparql_sync(full: bool = False):
+    if full:
+        return {"triples": lod_store.rebuild(), **lod_store.stats()}
+    return {"added": lod_store.sync(), **lod_store.stats()}
+
+@router.get("/lod/{dataset}.{fmt}")
+def export_lod(dataset: str, fmt: str, request: Request, since: datetime = None):
+    if dataset not in DATASETS:
+        raise HTTPException(status_code=404, detail=f"Unknown dataset: {dataset}")
+    if fmt not in MEDIA_TYPES:
+        raise HTTPException(status_code=404, detail=f"Unsupported format: {fmt}")
+
+    context_url = settings.lod_context_url or str(request.url_for("get_lod_context"))
+    headers = {"Content-Disposition": f'attachment; filename="{dataset}.{fmt}"'}
+    # Read before streaming and used as the upper bound, so the stream covers exactly
+    # up to the watermark clients pass back as ``since`` on their next pull
+    latest = watermark(DATASETS[dataset])
+    if latest is not None:
+        headers["X-Export-Watermark"] = latest.isoformat()
+    exporter = LODStreamExporter(DATASETS[dataset], fmt, since=since, context_url=context_url, until=latest)
+
+    chunks = exporter.iter_chunks()
+    if accepts_gzip(request.headers.get("accept-encoding", "")):
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+        headers["Vary"] = "Accept-Encoding"
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[fmt], headers=headers)
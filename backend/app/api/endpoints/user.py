@@ -1,8 +1,22 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.api.deps import get_current_user, get_bearer_token
+from app.core.security import TokenData, create_access_token, revoke_token
 from app.db import get_db
 from app.models import User, CitizenFeedback
-from app.schemas.user import UserResponse, FeedbackResponse, UserCreate, FeedbackCreate
+from app.schemas.user import (
+    UserResponse,
+    FeedbackResponse,
+    UserCreate,
+    FeedbackCreate,
+    LoginRequest,
+    TokenResponse,
+    FeedbackSearchHit,
+    FeedbackSearchResponse,
+)
+from app.services.feedback_search import FeedbackSearch
+from app.services.password_hashing import password_hasher, HashingBusy
 
 router = APIRouter(prefix="/api", tags=["users"])
 
@@ -10,20 +24,75 @@ router = APIRouter(prefix="/api", tags=["users"])
 def list_users(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     return db.query(User).offset(skip).limit(limit).all()
 
+def _hashing_busy(e: HashingBusy) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+def _save(db: Session, instance):
+    db.add(instance)
+    db.commit()
+    db.refresh(instance)
+    return instance
+
 @router.post("/users", response_model=UserResponse)
-def create_user(user: UserCreate, db: Session = Depends(get_db)):
-    import bcrypt
-    hashed_pw = bcrypt.hashpw(user.password.encode(), bcrypt.gensalt()).decode()
+async def create_user(user: UserCreate, db: Session = Depends(get_db)):
+    # Hash in the process pool; the event loop only awaits the result
+    try:
+        hashed_pw = await password_hasher.hash(user.password)
+    except HashingBusy as e:
+        raise _hashing_busy(e)
     db_user = User(full_name=user.full_name, email=user.email, role=user.role, password_hash=hashed_pw)
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    return await run_in_threadpool(_save, db, db_user)
+
+@router.post("/users/login", response_model=TokenResponse)
+async def login(credentials: LoginRequest, db: Session = Depends(get_db)):
+    db_user = await run_in_threadpool(lambda: db.query(User).filter(User.email == credentials.email).first())
+    try:
+        if db_user is None or not db_user.password_hash:
+            # Same bcrypt work as a real check so unknown emails are not distinguishable by timing
+            await password_hasher.verify_dummy(credentials.password)
+            ok, new_hash = False, None
+        else:
+            ok, new_hash = await password_hasher.verify(credentials.password, db_user.password_hash)
+    except HashingBusy as e:
+        raise _hashing_busy(e)
+    if not ok:
+        raise HTTPException(status_code=401, detail="Incorrect email or password")
+
+    if new_hash is not None:
+        # Cost or scheme changed since this hash was made: upgrade it transparently
+        db_user.password_hash = new_hash
+        await run_in_threadpool(_save, db, db_user)
+
+    token = create_access_token({"user_id": db_user.id, "email": db_user.email, "role": db_user.role})
+    return TokenResponse(access_token=token)
+
+@router.get("/users/me", response_model=UserResponse)
+def read_current_user(current: TokenData = Depends(get_current_user), db: Session = Depends(get_db)):
+    db_user = db.query(User).filter(User.id == current.user_id).first()
+    if db_user is None:
+        raise HTTPException(status_code=404, detail="User not found")
     return db_user
 
+@router.post("/users/logout", status_code=204)
+def logout(token: str = Depends(get_bearer_token), current: TokenData = Depends(get_current_user)):
+    revoke_token(token)
+
 @router.get("/feedback", response_model=list[FeedbackResponse])
 def list_feedback(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     return db.query(CitizenFeedback).offset(skip).limit(limit).all()
 
+@router.get("/feedback/search", response_model=FeedbackSearchResponse)
+def search_feedback(q: str, ward_name: str = None, skip: int = 0, limit: int = 20, db: Session = Depends(get_db)):
+    if not q.strip():
+        raise HTTPException(status_code=422, detail="Query must not be empty")
+    limit = max(1, min(limit, 100))
+    result = FeedbackSearch.search(db, q, ward_name, max(0, skip), limit)
+    result["items"] = [
+        FeedbackSearchHit(**FeedbackResponse.model_validate(item["feedback"]).model_dump(), score=item["score"])
+        for item in result["items"]
+    ]
+    return result
+
 @router.post("/feedback", response_model=FeedbackResponse)
 def create_feedback(feedback: FeedbackCreate, db: Session = Depends(get_db)):
     db_feedback = CitizenFeedback(**feedback.dict())
@@ -4,6 +4,7 @@ from .config import settings
 from .security import (
     create_access_token,
     verify_token,
+    revoke_token,
     get_password_hash,
     verify_password,
     is_admin,
@@ -15,6 +16,7 @@ __all__ = [
     "settings",
     "create_access_token",
     "verify_token",
+    "revoke_token",
     "get_password_hash",
     "verify_password",
     "is_admin",
@@ -18,6 +18,47 @@ class Settings(BaseSettings):
     secret_key: str = Field(default="your-secret-key-change-in-production", alias="SECRET_KEY")
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    token_cache_size: int = 4096
+    token_revocation_refresh_seconds: float = 5.0  # Logouts on other workers take effect within this
+
+    # Password hashing
+    bcrypt_rounds: int = 12
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 64
+
+    # Prometheus metrics at /metrics
+    metrics_enabled: bool = True
+
+    # Schema migrations, applied once per deploy with `python -m app.db.init_db`.
+    # Workers only compare the stored revision with the code's at startup
+    schema_check_strict: bool = False
+    migration_lock_timeout_ms: int = 5000
+
+    # Query monitoring: slow statements and repeated statements (N+1) per request.
+    # query_explain_slow re-runs slow SELECTs under EXPLAIN ANALYZE, debug mode only
+    query_monitor_enabled: bool = True
+    slow_query_ms: float = 200.0
+    n_plus_one_threshold: int = 10
+    query_explain_slow: bool = False
+
+    # Rate limiting: "METHOD path-glob" -> per-client rate (tokens/s) and burst,
+    # plus optional route_rate/route_burst shared by all clients
+    rate_limit_enabled: bool = True
+    rate_limit_redis_url: str = ""
+    rate_limit_redis_timeout_seconds: float = 0.25
+    rate_limit_redis_backoff_seconds: float = 30.0  # Use in-process buckets this long after a Redis error
+    rate_limit_stripes: int = 64
+    rate_limit_trust_forwarded: bool = False
+    rate_limit_rules: dict = {
+        "POST */users/login": {"rate": 0.5, "burst": 10, "route_rate": 20},
+        "POST */users": {"rate": 0.05, "burst": 5, "route_rate": 5},
+        "POST */feedback": {"rate": 0.2, "burst": 10, "route_rate": 20},
+        "POST */ai/*": {"rate": 0.2, "burst": 5, "route_rate": 2},
+        "POST */lod/sparql/sync": {"rate": 0.05, "burst": 2, "route_rate": 0.1},
+        "POST */air-quality": {"rate": 10, "burst": 50},
+        "POST */energy": {"rate": 10, "burst": 50},
+        "POST */schools": {"rate": 1, "burst": 20},
+    }
 
     # Database
     database_url: str = Field(
@@ -59,6 +100,69 @@ class Settings(BaseSettings):
     # AI
     ai_correlation_threshold: float = 0.5
     ai_cluster_count: int = 5
+    ai_stream_snapshot_path: str = "data/correlation_stream.json"
+    ai_stream_snapshot_interval_seconds: int = 300
+    ai_model_store_dir: str = "data/models"
+    ai_model_store_max_entries: int = 256
+    ai_model_store_memory_entries: int = 32
+    ai_job_workers: int = 2
+    ai_job_max_pending: int = 32
+    ai_job_history: int = 500
+
+    # Spatial join of AQI stations onto schools / energy sites
+    spatial_join_k: int = 3
+    spatial_join_max_distance_km: float = 5.0
+
+    # Interpolated AQI raster / map tiles
+    aqi_raster_neighbors: int = 8
+    aqi_raster_max_distance_km: float = 10.0
+    aqi_raster_power: float = 2.0
+    aqi_raster_refresh_seconds: int = 30
+    aqi_tile_cache_size: int = 2048
+
+    # Monte Carlo scenario simulation
+    scenario_default_draws: int = 2000
+    scenario_max_draws: int = 20000
+    scenario_max_scenarios: int = 20
+    scenario_seed: int = 42
+    scenario_cache_size: int = 128
+
+    # AQI forecasting
+    forecast_bucket_hours: int = 1
+    forecast_horizon_hours: int = 24
+    forecast_history_days: int = 14
+    forecast_damping: float = 0.9
+
+    # Streaming anomaly detection (robust z-score over a per-station window)
+    anomaly_window: int = 48
+    anomaly_threshold: float = 5.0
+    anomaly_min_samples: int = 8
+    anomaly_min_scale: float = 2.0
+    anomaly_reseed_seconds: float = 300.0  # Re-read each station's window from the DB this often
+
+    # Bootstrap / permutation significance
+    resampling_iterations: int = 2000
+    resampling_max_iterations: int = 20000
+    resampling_seed: int = 42
+    resampling_confidence: float = 0.95
+
+    # Linked Open Data export
+    lod_base_uri: str = "http://example.org/"
+    lod_stream_batch_size: int = 1000
+    lod_context_url: str = ""  # Shared JSON-LD context; defaults to /lod/context.jsonld
+    lod_commit_lag_seconds: int = 30  # Watermarks trail now by this much so in-flight rows are not skipped
+
+    # Columnar (Parquet / Arrow) export
+    columnar_batch_size: int = 50000
+    columnar_compression: str = "zstd"  # Parquet
+    columnar_arrow_compression: str = "none"  # Arrow IPC; compressed files cannot be memory-mapped zero-copy
+
+    # SPARQL endpoint / local triple store
+    sparql_store_dir: str = "data/lod_store"
+    sparql_sync_interval_seconds: int = 30  # How often the elected worker journals new rows
+    sparql_refresh_seconds: float = 2.0  # How often a worker checks the journal for new segments on query
+    sparql_cache_size: int = 256
+    sparql_compact_segments: int = 64
 
     model_config = ConfigDict(
         extra='ignore',
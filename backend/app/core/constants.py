@@ -28,6 +28,12 @@ MIN_CORRELATION_THRESHOLD = 0.3
 STRONG_CORRELATION = 0.7
 MODERATE_CORRELATION = 0.5
 
+# Column order of the wards x metrics matrix used by batch correlation
+CORRELATION_METRICS = ("aqi", "school_score", "renewable_percentage")
+
+# GreenAction impact_score for the impact levels used in recommendations
+IMPACT_SCORES = {"high": 80.0, "medium": 50.0, "low": 20.0}
+
 # Pagination
 DEFAULT_PAGE_SIZE = 20
 MAX_PAGE_SIZE = 100
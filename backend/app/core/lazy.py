@@ -0,0 +1,47 @@
+"""Deferred imports for heavy optional dependencies."""
+
+import importlib
+import sys
+import threading
+import types
+
+_import_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports the real module on first attribute access.
+
+    After loading, the real module's namespace is copied onto the proxy so
+    later lookups are plain attribute reads with no extra indirection.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = name
+        self.__dict__["_lazy_loaded"] = False
+
+    def _load(self) -> types.ModuleType:
+        with _import_lock:
+            module = importlib.import_module(self._lazy_target)
+            if not self._lazy_loaded:
+                self.__dict__.update(module.__dict__)
+                self.__dict__["_lazy_loaded"] = True
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._lazy_loaded else "not loaded"
+        return f"<lazy module '{self._lazy_target}' ({state})>"
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Return ``name`` if already imported, otherwise a proxy that imports on use."""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    return LazyModule(name)
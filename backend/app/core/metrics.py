@@ -0,0 +1,189 @@
+"""Prometheus instrumentation: HTTP routes, DB pool, upstream APIs and AIService."""
+
+import functools
+import inspect
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Buckets tuned for API calls: 5 ms .. 30 s
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests currently being handled", ["method"])
+DB_POOL_WAIT = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled DB connection",
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+UPSTREAM_LATENCY = Histogram(
+    "upstream_request_duration_seconds", "Latency of calls to external data services",
+    ["target", "operation"], buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_ERRORS = Counter(
+    "upstream_request_errors_total", "Failed calls to external data services", ["target", "operation"],
+)
+AI_SERVICE_LATENCY = Histogram(
+    "ai_service_duration_seconds", "AIService call duration", ["method"],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency per route template and in-flight requests.
+
+    The route template is read from ``scope["route"]``, which the router sets
+    while dispatching, so no extra matching is done. Labelled children are
+    cached, so a request costs a dict lookup plus the observation itself.
+    Unmatched paths share one label to bound cardinality.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._children = {}
+
+    def _child(self, metric, *labels):
+        key = (metric, labels)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = metric.labels(*labels)
+        return child
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        in_flight = self._child(HTTP_IN_FLIGHT, method)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            self._child(HTTP_LATENCY, method, route, str(status["code"])).observe(time.perf_counter() - start)
+
+
+class DBPoolCollector:
+    """Reads SQLAlchemy pool counters at scrape time (no per-query cost)."""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def collect(self):
+        pool = self.engine.pool
+        for name, attr, doc in (
+            ("db_pool_size", "size", "Configured pool size"),
+            ("db_pool_checked_out", "checkedout", "Connections currently checked out"),
+            ("db_pool_checked_in", "checkedin", "Idle connections in the pool"),
+            ("db_pool_overflow", "overflow", "Connections open beyond pool_size"),
+        ):
+            getter = getattr(pool, attr, None)
+            if getter is not None:
+                yield GaugeMetricFamily(name, doc, value=getter())
+
+
+class RateLimitCollector:
+    """Exports the rate limiter's allowed / rejected counters."""
+
+    def __init__(self, metrics):
+        self.metrics = metrics
+
+    def collect(self):
+        family = CounterMetricFamily(
+            "rate_limit_requests", "Requests seen by the rate limiter", labels=["rule", "outcome"],
+        )
+        for rule, counts in self.metrics.snapshot().items():
+            family.add_metric([rule, "allowed"], counts["allowed"])
+            family.add_metric([rule, "rejected"], counts["rejected"])
+        yield family
+
+
+def instrument_engine(engine) -> None:
+    """Time pool checkouts and export pool gauges for ``engine``.
+
+    Wraps the pool's ``_do_get`` (the blocking acquire); a pool replaced by
+    ``engine.dispose()`` is not re-wrapped.
+    """
+    pool = engine.pool
+    acquire = pool._do_get
+    observe = DB_POOL_WAIT.observe
+
+    def timed_do_get():
+        start = time.perf_counter()
+        try:
+            return acquire()
+        finally:
+            observe(time.perf_counter() - start)
+
+    pool._do_get = timed_do_get
+    REGISTRY.register(DBPoolCollector(engine))
+
+
+def track_upstream(target: str):
+    """Record latency, and errors (exceptions or ``success: False`` results), of an upstream call."""
+
+    def decorator(fn):
+        operation = fn.__name__
+        latency = UPSTREAM_LATENCY.labels(target, operation)
+        errors = UPSTREAM_ERRORS.labels(target, operation)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = await fn(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                latency.observe(time.perf_counter() - start)
+            if isinstance(result, dict) and result.get("success") is False:
+                errors.inc()
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def timed_ai_call(fn):
+    """Observe the duration of an AIService method."""
+    histogram = AI_SERVICE_LATENCY.labels(fn.__name__)
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - start)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - start)
+    return wrapper
+
+
+def render_metrics() -> tuple:
+    """``(body, content type)`` for the /metrics endpoint."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,70 @@
+"""Process pools for CPU-bound work started from the threaded API server."""
+
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+
+def pool_context():
+    """``forkserver`` where available, otherwise ``spawn``.
+
+    Forking the API process would copy locks held by its other threads (DB
+    pool, logging, import lock) into the child in whatever state they were.
+    """
+    method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+    return multiprocessing.get_context(method)
+
+
+class ProcessPool:
+    """Lazily created ``ProcessPoolExecutor`` that replaces itself once broken.
+
+    A worker that dies (OOM kill, segfault) breaks the whole executor: its
+    pending futures fail with ``BrokenProcessPool`` and every later submit
+    raises. The broken executor is dropped so the next submit starts a new
+    one, and a submit that hits a broken executor is retried once.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+        self.restarts = 0
+
+    def _get(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=pool_context())
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        # Only drops the reference: a broken executor already stopped its workers,
+        # and this may run on its management thread, which must not join itself
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+                self.restarts += 1
+
+    def submit(self, fn, *args) -> Future:
+        for attempt in range(2):
+            executor = self._get()
+            try:
+                future = executor.submit(fn, *args)
+            except BrokenProcessPool:
+                self._discard(executor)
+                if attempt:
+                    raise
+                continue
+            future.add_done_callback(partial(self._on_done, executor))
+            return future
+
+    def _on_done(self, executor: ProcessPoolExecutor, future: Future) -> None:
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard(executor)
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
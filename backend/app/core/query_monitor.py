@@ -0,0 +1,170 @@
+"""SQLAlchemy slow-query logging and per-request N+1 detection."""
+
+import contextvars
+import re
+import threading
+import time
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# Expanded IN lists differ only in placeholder count; fold them into one shape
+_IN_LIST_RE = re.compile(r"\(\s*(?:\?|%\([^)]+\)s|:\w+)(?:\s*,\s*(?:\?|%\([^)]+\)s|:\w+))*\s*\)")
+
+_current = contextvars.ContextVar("query_stats", default=None)
+
+
+def normalize_statement(statement: str) -> str:
+    return _IN_LIST_RE.sub("(...)", _WHITESPACE_RE.sub(" ", statement).strip())
+
+
+def _shorten(statement: str, limit: int = 300) -> str:
+    statement = _WHITESPACE_RE.sub(" ", statement).strip()
+    return statement if len(statement) <= limit else statement[:limit] + " ..."
+
+
+class RequestQueryStats:
+    """Statements run while handling one request."""
+
+    __slots__ = ("scope", "count", "total_seconds", "shapes")
+
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.count = 0
+        self.total_seconds = 0.0
+        self.shapes = {}
+
+    @property
+    def route(self) -> str:
+        # Set by the router before the endpoint runs, so available to every query
+        route = self.scope.get("route")
+        return f"{self.scope['method']} {getattr(route, 'path', self.scope['path'])}"
+
+    def record(self, statement: str, seconds: float) -> None:
+        self.count += 1
+        self.total_seconds += seconds
+        shape = normalize_statement(statement)
+        self.shapes[shape] = self.shapes.get(shape, 0) + 1
+
+    def repeated(self, threshold: int) -> list:
+        """``(count, statement)`` for shapes run at least ``threshold`` times, most frequent first."""
+        return sorted(((n, shape) for shape, n in self.shapes.items() if n >= threshold), reverse=True)
+
+
+def current_query_stats():
+    """Stats of the request being handled, or None outside a request."""
+    return _current.get()
+
+
+class QueryMonitor:
+    """Engine listeners timing every statement.
+
+    Statements slower than ``slow_query_ms`` are printed with the route
+    that issued them, at most once a minute per route and statement shape.
+    With ``explain`` set, slow SELECTs are re-run under ``EXPLAIN ANALYZE``
+    (``EXPLAIN QUERY PLAN`` on SQLite) on a separate cursor and the plan is
+    printed too; this doubles the cost of slow queries, so it is only
+    honoured in debug mode.
+    """
+
+    log_interval = 60.0
+
+    def __init__(self, slow_query_ms: float = None, explain: bool = None):
+        self.slow_seconds = (settings.slow_query_ms if slow_query_ms is None else slow_query_ms) / 1000
+        self.explain = (settings.query_explain_slow if explain is None else explain) and settings.debug
+        self._last_logged = {}
+        self._lock = threading.Lock()
+        self.slow_count = 0
+
+    def install(self, engine) -> None:
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    @staticmethod
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        # Kept on the per-statement context: a statement that raises never
+        # reaches _after, and anything left on the connection would outlive it
+        if context is not None:
+            context._query_start_time = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        started = getattr(context, "_query_start_time", None)
+        if started is None:
+            return
+        seconds = time.perf_counter() - started
+        stats = _current.get()
+        if stats is not None:
+            stats.record(statement, seconds)
+        if seconds >= self.slow_seconds:
+            self._report_slow(conn, statement, parameters, executemany, seconds, stats)
+
+    def _should_log(self, key: tuple) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            self.slow_count += 1
+            last = self._last_logged.get(key)
+            if last is not None and now - last < self.log_interval:
+                return False
+            if len(self._last_logged) > 1024:
+                self._last_logged.clear()
+            self._last_logged[key] = now
+            return True
+
+    def _report_slow(self, conn, statement, parameters, executemany, seconds, stats) -> None:
+        route = stats.route if stats is not None else "(no request)"
+        if not self._should_log((route, normalize_statement(statement))):
+            return
+        print(f"⚠️  Slow query ({seconds * 1000:.0f} ms) in {route}: {_shorten(statement)}")
+        if self.explain and not executemany and statement.lstrip()[:6].upper() == "SELECT":
+            plan = self._explain(conn, statement, parameters)
+            if plan:
+                print("    " + "\n    ".join(plan))
+
+    @staticmethod
+    def _explain(conn, statement, parameters) -> list:
+        prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN ANALYZE "
+        # A fresh DBAPI cursor, so the original result set is left untouched
+        cursor = conn.connection.cursor()
+        try:
+            cursor.execute(prefix + statement, parameters)
+            return [" | ".join(str(value) for value in row) for row in cursor.fetchall()]
+        except Exception as e:
+            return [f"(EXPLAIN failed: {e})"]
+        finally:
+            cursor.close()
+
+
+class QueryCountMiddleware:
+    """ASGI middleware counting statements per request and flagging N+1 patterns.
+
+    A request is reported when one statement shape runs at least
+    ``n_plus_one_threshold`` times, which is what lazy loading a relation
+    inside a loop looks like.
+    """
+
+    def __init__(self, app, n_plus_one_threshold: int = None):
+        self.app = app
+        self.threshold = n_plus_one_threshold or settings.n_plus_one_threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestQueryStats(scope)
+        token = _current.set(stats)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _current.reset(token)
+            repeated = stats.repeated(self.threshold)
+            if repeated:
+                count, shape = repeated[0]
+                print(
+                    f"⚠️  Possible N+1 in {stats.route}: {stats.count} queries "
+                    f"({stats.total_seconds * 1000:.0f} ms), {count}x {_shorten(shape, 200)}"
+                )
+
+
+query_monitor = QueryMonitor()
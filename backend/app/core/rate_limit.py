@@ -0,0 +1,279 @@
+"""Token-bucket rate limiting middleware for write and expensive routes."""
+
+import json
+import math
+import threading
+import time
+from fnmatch import fnmatchcase
+from functools import lru_cache
+
+from app.core.config import settings
+
+
+class RateLimitRule:
+    """Per-client and whole-route token buckets for one ``METHOD pattern`` key."""
+
+    __slots__ = ("name", "method", "pattern", "rate", "burst", "route_rate", "route_burst")
+
+    def __init__(self, name: str, rate: float, burst: float, route_rate: float = None, route_burst: float = None):
+        method, _, pattern = name.partition(" ")
+        self.name = name
+        self.method = method.upper()
+        self.pattern = pattern
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.route_rate = float(route_rate) if route_rate else None
+        self.route_burst = float(route_burst or burst * 10)
+
+    def matches(self, method: str, path: str) -> bool:
+        return (self.method == "*" or self.method == method) and fnmatchcase(path, self.pattern)
+
+
+class StripedBucketStore:
+    """In-process token buckets sharded over independently locked stripes.
+
+    Requests for different clients rarely contend on the same lock. Once a
+    stripe holds more than ``max_keys_per_stripe`` buckets it drops those
+    idle for an hour, which have refilled to full for any practical rate.
+    """
+
+    def __init__(self, stripes: int = None, max_keys_per_stripe: int = 4096):
+        self.stripes = stripes or settings.rate_limit_stripes
+        self.max_keys_per_stripe = max_keys_per_stripe
+        self._buckets = [dict() for _ in range(self.stripes)]
+        self._locks = [threading.Lock() for _ in range(self.stripes)]
+
+    def take(self, key: str, rate: float, burst: float, now: float = None) -> tuple:
+        """Consume one token; returns ``(allowed, retry_after_seconds)``."""
+        now = time.monotonic() if now is None else now
+        stripe = hash(key) % self.stripes
+        buckets = self._buckets[stripe]
+        with self._locks[stripe]:
+            tokens, last = buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - last) * rate)
+            if tokens >= 1.0:
+                buckets[key] = (tokens - 1.0, now)
+                allowed, retry_after = True, 0.0
+            else:
+                buckets[key] = (tokens, now)
+                allowed, retry_after = False, (1.0 - tokens) / rate
+            if len(buckets) > self.max_keys_per_stripe:
+                self._prune(buckets, now)
+        return allowed, retry_after
+
+    def refund(self, key: str, burst: float) -> None:
+        """Return a token taken for a request that was rejected elsewhere."""
+        stripe = hash(key) % self.stripes
+        buckets = self._buckets[stripe]
+        with self._locks[stripe]:
+            if key in buckets:
+                tokens, last = buckets[key]
+                buckets[key] = (min(burst, tokens + 1.0), last)
+
+    @staticmethod
+    def _prune(buckets: dict, now: float) -> None:
+        for key in [k for k, (_, last) in buckets.items() if now - last > 3600]:
+            del buckets[key]
+
+    async def take_async(self, key: str, rate: float, burst: float) -> tuple:
+        return self.take(key, rate, burst)
+
+    async def refund_async(self, key: str, burst: float) -> None:
+        self.refund(key, burst)
+
+
+# Atomic token bucket: KEYS[1] bucket, ARGV rate, burst, now (seconds)
+_REDIS_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+else
+  retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(retry_after)}
+"""
+
+# Give back one token: KEYS[1] bucket, ARGV burst
+_REDIS_REFUND_SCRIPT = """
+local tokens = tonumber(redis.call('HGET', KEYS[1], 'tokens'))
+if tokens then
+  redis.call('HSET', KEYS[1], 'tokens', math.min(tonumber(ARGV[1]), tokens + 1))
+end
+return 0
+"""
+
+
+class RedisBucketStore:
+    """Token buckets in a Redis-compatible server, shared by all workers.
+
+    Uses ``redis.asyncio`` (optional dependency) and a Lua script so each
+    take is a single atomic round trip. If the server is unreachable the
+    in-process store is used instead, so limits degrade to per-worker; the
+    server is then left alone for ``backoff_seconds`` rather than making
+    every request wait for a connect timeout.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        prefix: str = "ratelimit:",
+        fallback: StripedBucketStore = None,
+        timeout: float = None,
+        backoff_seconds: float = None,
+        client=None,
+    ):
+        timeout = settings.rate_limit_redis_timeout_seconds if timeout is None else timeout
+        if client is None:
+            import redis.asyncio as redis_asyncio
+
+            client = redis_asyncio.from_url(url, socket_connect_timeout=timeout, socket_timeout=timeout)
+        self.client = client
+        self.prefix = prefix
+        self.fallback = fallback or StripedBucketStore()
+        self.backoff_seconds = settings.rate_limit_redis_backoff_seconds if backoff_seconds is None else backoff_seconds
+        self._script = self.client.register_script(_REDIS_BUCKET_SCRIPT)
+        self._refund_script = self.client.register_script(_REDIS_REFUND_SCRIPT)
+        self._retry_at = 0.0
+        self._warned = False
+
+    async def take_async(self, key: str, rate: float, burst: float) -> tuple:
+        if time.monotonic() < self._retry_at:
+            return self.fallback.take(key, rate, burst)
+        try:
+            allowed, retry_after = await self._script(keys=[self.prefix + key], args=[rate, burst, time.time()])
+        except Exception as e:
+            self._retry_at = time.monotonic() + self.backoff_seconds
+            if not self._warned:
+                print(f"⚠️  Rate limit backend unavailable, using in-process buckets: {e}")
+                self._warned = True
+            return self.fallback.take(key, rate, burst)
+        self._warned = False
+        return bool(int(allowed)), float(retry_after)
+
+    async def refund_async(self, key: str, burst: float) -> None:
+        if time.monotonic() < self._retry_at:
+            return self.fallback.refund(key, burst)
+        try:
+            await self._refund_script(keys=[self.prefix + key], args=[burst])
+        except Exception:
+            self.fallback.refund(key, burst)
+
+
+class RateLimitMetrics:
+    """Allowed / rejected counters per rule."""
+
+    def __init__(self):
+        self.allowed = {}
+        self.rejected = {}
+        self._lock = threading.Lock()
+
+    def record(self, rule: str, allowed: bool) -> None:
+        counters = self.allowed if allowed else self.rejected
+        with self._lock:
+            counters[rule] = counters.get(rule, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            rules = sorted(set(self.allowed) | set(self.rejected))
+            return {
+                rule: {"allowed": self.allowed.get(rule, 0), "rejected": self.rejected.get(rule, 0)}
+                for rule in rules
+            }
+
+
+rate_limit_metrics = RateLimitMetrics()
+
+
+def load_rules(raw: dict = None) -> list:
+    """Build rules from ``{"METHOD pattern": {"rate": .., "burst": .., ...}}``."""
+    raw = settings.rate_limit_rules if raw is None else raw
+    return [RateLimitRule(name, **params) for name, params in raw.items()]
+
+
+def create_bucket_store():
+    if settings.rate_limit_redis_url:
+        try:
+            return RedisBucketStore(settings.rate_limit_redis_url)
+        except ImportError:
+            print("⚠️  RATE_LIMIT_REDIS_URL is set but the redis package is not installed; using in-process buckets")
+    return StripedBucketStore()
+
+
+class RateLimitMiddleware:
+    """ASGI middleware answering 429 with ``Retry-After`` when a bucket is empty.
+
+    The first matching rule applies. Each request draws from the client's
+    bucket for that rule and, if the rule sets ``route_rate``, from a bucket
+    shared by all clients, which caps total load on the route. A request the
+    route bucket rejects gets its client token back, so clients are not
+    penalised for load they did not cause.
+    """
+
+    def __init__(self, app, rules: list = None, store=None, metrics: RateLimitMetrics = None):
+        self.app = app
+        self.rules = load_rules() if rules is None else rules
+        self.store = store or create_bucket_store()
+        self.metrics = metrics or rate_limit_metrics
+        self.trust_forwarded = settings.rate_limit_trust_forwarded
+        self._match = lru_cache(maxsize=4096)(self._match_uncached)
+
+    def _match_uncached(self, method: str, path: str):
+        for rule in self.rules:
+            if rule.matches(method, path):
+                return rule
+        return None
+
+    def _client(self, scope) -> str:
+        if self.trust_forwarded:
+            # Clients can prepend any hops they like; only the last one was added by our proxy
+            hops = [
+                hop.strip()
+                for name, value in scope.get("headers", ())
+                if name == b"x-forwarded-for"
+                for hop in value.decode("latin-1").split(",")
+            ]
+            hops = [hop for hop in hops if hop]
+            if hops:
+                return hops[-1]
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.rules:
+            return await self.app(scope, receive, send)
+        rule = self._match(scope["method"], scope["path"])
+        if rule is None:
+            return await self.app(scope, receive, send)
+
+        client_key = f"{rule.name}|{self._client(scope)}"
+        allowed, retry_after = await self.store.take_async(client_key, rule.rate, rule.burst)
+        if allowed and rule.route_rate:
+            allowed, retry_after = await self.store.take_async(f"{rule.name}|*", rule.route_rate, rule.route_burst)
+            if not allowed:
+                await self.store.refund_async(client_key, rule.burst)
+        self.metrics.record(rule.name, allowed)
+        if allowed:
+            return await self.app(scope, receive, send)
+
+        body = json.dumps({"detail": "Too many requests"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -1,17 +1,128 @@
 
-from datetime import datetime, timedelta
-from typing import Optional
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
 from jose import JWTError, jwt
-from passlib.context import CryptContext
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 class TokenData:
-    def __init__(self, user_id: int, email: str, role: str):
+    __slots__ = ("user_id", "email", "role", "expires_at")
+
+    def __init__(self, user_id: int, email: str, role: str, expires_at: Optional[float] = None):
         self.user_id = user_id
         self.email = email
         self.role = role
+        self.expires_at = expires_at  # Unix timestamp from the ``exp`` claim
+
+class TokenCache:
+    """LRU of verified tokens keyed by digest, with entries dropped at ``exp``.
+
+    Revoked token digests are remembered until their own expiry, after which
+    the token would be rejected by ``jwt.decode`` anyway. Both are per process;
+    ``revoke_token`` also records revocations in the ``revoked_tokens`` table,
+    and ``refresh_revocations`` merges that table into the revoked set once it
+    is ``revocation_ttl`` seconds old, so other workers' logouts take effect
+    without a database round trip per request.
+    """
+
+    def __init__(self, max_entries: int = None, revocation_ttl: float = None):
+        self.max_entries = max_entries or settings.token_cache_size
+        self.revocation_ttl = (settings.token_revocation_refresh_seconds
+                               if revocation_ttl is None else revocation_ttl)
+        self._entries = OrderedDict()
+        self._revoked = {}
+        self._revoked_loaded_at = None  # monotonic time of the last refresh_revocations
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revocation_loads = 0
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[TokenData]:
+        now = time.time()
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            if data.expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key: bytes, data: TokenData) -> None:
+        if data.expires_at is None:
+            return
+        with self._lock:
+            self._entries[key] = data
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def is_revoked(self, key: bytes) -> bool:
+        with self._lock:
+            return key in self._revoked
+
+    def revoke(self, key: bytes, expires_at: Optional[float]) -> None:
+        self._add_revoked({key: expires_at if expires_at is not None else float("inf")})
+
+    def _add_revoked(self, revoked: dict) -> None:
+        now = time.time()
+        with self._lock:
+            for key, expires_at in revoked.items():
+                self._entries.pop(key, None)
+                self._revoked[key] = expires_at
+            for stale in [k for k, exp in self._revoked.items() if exp <= now]:
+                del self._revoked[stale]
+
+    def revocations_stale(self) -> bool:
+        loaded_at = self._revoked_loaded_at
+        return loaded_at is None or time.monotonic() - loaded_at >= self.revocation_ttl
+
+    def refresh_revocations(self, load: Callable[[], dict]) -> None:
+        """Merge ``load()`` (digest -> expiry) into the revoked set if it is stale.
+
+        One thread loads while the others carry on with the current set;
+        only the first load, before anything is known, makes them wait.
+        """
+        if not self.revocations_stale():
+            return
+        if not self._refresh_lock.acquire(blocking=self._revoked_loaded_at is None):
+            return
+        try:
+            if not self.revocations_stale():
+                return
+            started = time.monotonic()
+            self._add_revoked(load())
+            self._revoked_loaded_at = started
+            self.revocation_loads += 1
+        finally:
+            self._refresh_lock.release()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "revoked": len(self._revoked),
+            "revocation_loads": self.revocation_loads,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+token_cache = TokenCache()
 
 def create_access_token(subject: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token."""
@@ -24,28 +135,94 @@ def create_access_token(subject: dict, expires_delta: Optional[timedelta] = None
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
-def verify_token(token: str) -> Optional[TokenData]:
-    """Verify JWT token and return token data."""
+def _decode_token(token: str) -> Optional[TokenData]:
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
-        user_id: int = payload.get("user_id")
-        email: str = payload.get("email")
-        role: str = payload.get("role")
-        
-        if user_id is None or email is None:
-            return None
-        
-        return TokenData(user_id=user_id, email=email, role=role)
     except JWTError:
         return None
+    user_id: int = payload.get("user_id")
+    email: str = payload.get("email")
+    role: str = payload.get("role")
+    if user_id is None or email is None:
+        return None
+    exp = payload.get("exp")
+    return TokenData(user_id=user_id, email=email, role=role, expires_at=float(exp) if exp is not None else None)
+
+def _load_revocations() -> dict:
+    """Digests of unexpired tokens revoked by any worker, mapped to their expiry."""
+    from app.db.base import SessionLocal  # app.db imports app.core
+    from app.models.user import RevokedToken
+    db = SessionLocal()
+    try:
+        rows = db.query(RevokedToken.digest, RevokedToken.expires_at).filter(
+            or_(RevokedToken.expires_at.is_(None), RevokedToken.expires_at >= datetime.utcnow())
+        ).all()
+    finally:
+        db.close()
+    return {
+        bytes.fromhex(digest): expires_at.replace(tzinfo=timezone.utc).timestamp() if expires_at else float("inf")
+        for digest, expires_at in rows
+    }
+
+def verify_token(token: str) -> Optional[TokenData]:
+    """Verify JWT token and return token data, using the verified-token cache.
+
+    Revocations are checked against the in-process set, which is reloaded
+    from the database every ``token_revocation_refresh_seconds``; a cache
+    hit otherwise costs no database query.
+    """
+    key = TokenCache.digest(token)
+    token_cache.refresh_revocations(_load_revocations)
+    if token_cache.is_revoked(key):
+        return None
+    data = token_cache.get(key)
+    if data is None:
+        data = _decode_token(token)
+        if data is None:
+            return None
+        token_cache.put(key, data)
+    return data
+
+def revoke_token(token: str) -> None:
+    """Reject ``token`` until it expires: here at once, in other workers on their next refresh."""
+    data = _decode_token(token)
+    if data is None:
+        # Invalid or expired tokens are already rejected; nothing to remember
+        return
+    key = TokenCache.digest(token)
+    token_cache.revoke(key, data.expires_at)
+
+    from app.db.base import SessionLocal
+    from app.models.user import RevokedToken
+    expires_at = datetime.utcfromtimestamp(data.expires_at) if data.expires_at is not None else None
+    db = SessionLocal()
+    try:
+        # Expired tokens fail jwt.decode anyway, so their rows can go
+        db.query(RevokedToken).filter(RevokedToken.expires_at < datetime.utcnow()).delete(synchronize_session=False)
+        db.add(RevokedToken(digest=key.hex(), expires_at=expires_at))
+        db.commit()
+    except IntegrityError:
+        db.rollback()  # already revoked by a concurrent logout
+    finally:
+        db.close()
 
 def get_password_hash(password: str) -> str:
-    """Hash password."""
-    return pwd_context.hash(password)
+    """Hash password in the bounded hashing pool.
+
+    Blocks the calling thread until bcrypt finishes; async code should
+    ``await password_hasher.hash(...)`` instead.
+    """
+    from app.services.password_hashing import password_hasher  # app.core is imported by the service
+    return password_hasher.hash_blocking(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify password against hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verify password against hash in the bounded hashing pool.
+
+    Blocks the calling thread like ``get_password_hash``; async code should
+    ``await password_hasher.verify(...)`` instead.
+    """
+    from app.services.password_hashing import password_hasher
+    return password_hasher.verify_blocking(plain_password, hashed_password)
 
 def is_admin(role: str) -> bool:
     """Check if user role is admin."""
@@ -0,0 +1,39 @@
+"""Export a table to Parquet or Arrow IPC."""
+
+import argparse
+from datetime import datetime
+
+from app.services.columnar_export import FORMATS, TABLES, ColumnarExporter, ColumnarExportUnavailable
+
+
+def export_columnar(table: str, output: str, fmt: str = None, columns: list = None,
+                    start: datetime = None, end: datetime = None, compression: str = None) -> int:
+    """Write ``table`` to ``output``; the format defaults to the file extension."""
+    fmt = fmt or ("arrow" if output.endswith((".arrow", ".feather")) else "parquet")
+    print(f"📦 Exporting {table} to {output} ({fmt})...")
+    exporter = ColumnarExporter(table, columns=columns, start=start, end=end, fmt=fmt, compression=compression)
+    rows = exporter.write(output)
+    print(f"✅ Exported {rows} rows")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("table", choices=sorted(TABLES))
+    parser.add_argument("output", help="destination file (.parquet or .arrow)")
+    parser.add_argument("--format", choices=sorted(FORMATS), dest="fmt")
+    parser.add_argument("--columns", help="comma-separated column projection")
+    parser.add_argument("--start", type=datetime.fromisoformat, help="inclusive ISO timestamp")
+    parser.add_argument("--end", type=datetime.fromisoformat, help="exclusive ISO timestamp")
+    parser.add_argument("--compression", help="zstd, lz4, snappy or none (default: zstd for Parquet, none for Arrow)")
+    args = parser.parse_args()
+
+    columns = [name.strip() for name in args.columns.split(",")] if args.columns else None
+    try:
+        export_columnar(args.table, args.output, args.fmt, columns, args.start, args.end, args.compression)
+    except (ValueError, ColumnarExportUnavailable) as e:
+        parser.exit(1, f"❌ {e}\n")
+
+
+if __name__ == "__main__":
+    main()
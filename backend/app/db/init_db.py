@@ -1,21 +1,43 @@
-"""Initialize database - create tables."""
+"""Initialize or upgrade the database schema.
 
-from app.db.base import engine, Base
-from app.models import (
-    AirQuality,
-    School,
-    EducationQuality,
-    User,
-    AIAnalysis,
-)
+One-shot migrate step, run once per deploy before starting the API
+workers (which only check the schema revision)::
 
+    python -m app.db.init_db            # upgrade to the latest revision
+    python -m app.db.init_db --check    # exit 1 if migrations are pending
+"""
 
-def init_db():
-    """Create all database tables."""
-    print("🗄️  Initializing database...")
-    Base.metadata.create_all(bind=engine)
-    print("✅ Database initialized successfully!")
+import argparse
+import sys
+
+from app.db.base import engine
+from app.db.migrations import current_revision, head_revision, upgrade
+
+
+def init_db(revision: str = "head"):
+    """Apply pending migrations."""
+    print("🗄️  Migrating database...")
+    before, after = upgrade(engine, revision)
+    if before == after:
+        print(f"✅ Database schema already at {after}")
+    else:
+        print(f"✅ Database schema migrated from {before or 'empty'} to {after}")
+    if revision == "head" and after != head_revision():
+        print(f"⚠️  Alembic head {after} differs from the newest revision file {head_revision()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Initialize or upgrade the database schema.")
+    parser.add_argument("--revision", default="head", help="target revision (default: head)")
+    parser.add_argument("--check", action="store_true", help="only report whether migrations are pending")
+    args = parser.parse_args()
+
+    if args.check:
+        current, head = current_revision(engine), head_revision()
+        print(f"current={current or '-'} head={head}")
+        sys.exit(0 if current == head else 1)
+    init_db(args.revision)
 
 
 if __name__ == "__main__":
-    init_db()
+    main()
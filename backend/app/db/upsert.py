@@ -0,0 +1,26 @@
+"""Dialect-specific INSERT ... ON CONFLICT for PostgreSQL and SQLite."""
+
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(db: Session):
+    """The ``insert`` construct with ``on_conflict_*`` support for the session's database."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"Upsert is not supported on {dialect}")
+    return insert
+
+
+def upsert(db: Session, model, rows: list, index_elements: list, update_columns: list, index_where=None) -> None:
+    """Multi-row INSERT ... ON CONFLICT DO UPDATE of ``update_columns``."""
+    stmt = dialect_insert(db)(model).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        index_where=index_where,
+        set_={column: stmt.excluded[column] for column in update_columns},
+    )
+    db.execute(stmt)
@@ -2,8 +2,8 @@
 
 from app.models.air_quality import AirQuality, WeatherData, EnergyData
 from app.models.education import School, Course
-from app.models.user import User, CitizenFeedback
-from app.models.ai_result import AIAnalysis, GreenAction
+from app.models.user import User, CitizenFeedback, RevokedToken
+from app.models.ai_result import AIAnalysis, GreenAction, AQIForecast, ForecastState, AnalysisWatermark, AnalysisJob
 
 __all__ = [
     "AirQuality",
@@ -13,6 +13,11 @@ __all__ = [
     "Course",
     "User",
     "CitizenFeedback",
+    "RevokedToken",
     "AIAnalysis",
     "GreenAction",
+    "AQIForecast",
+    "ForecastState",
+    "AnalysisWatermark",
+    "AnalysisJob",
 ]
@@ -1,6 +1,6 @@
 """AI analysis results model."""
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Index, JSON
 from datetime import datetime
 from app.db import Base
 
@@ -14,8 +14,20 @@ class AIAnalysis(Base):
     corr_env_edu = Column(Float)  # Correlation between environment & education
     corr_energy = Column(Float)   # Correlation between energy & education
     recommendation = Column(Text)
+    source = Column(String, default="manual", server_default="manual")  # manual, job, batch
     timestamp = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # One materialized row per ward, the target of the batch upsert
+        Index(
+            "uq_ai_analysis_batch_ward",
+            "ward_name",
+            unique=True,
+            postgresql_where=source == "batch",
+            sqlite_where=source == "batch",
+        ),
+    )
+
 class GreenAction(Base):
     """Green Actions Recommendation Model"""
     __tablename__ = "green_actions"
@@ -24,5 +36,60 @@ class GreenAction(Base):
     ward_name = Column(String, index=True)
     action = Column(Text)  # Recommended green action
     impact_score = Column(Float)  # Expected impact (0-100)
+    source = Column(String, default="manual", server_default="manual")  # manual, job, batch
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    __table_args__ = (Index("ix_green_actions_ward_source", "ward_name", "source"),)
+
+
+class AQIForecast(Base):
+    """Stored AQI forecast per ward and target hour"""
+    __tablename__ = "aqi_forecasts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ward_name = Column(String, index=True)
+    target_time = Column(DateTime)
+    horizon_hours = Column(Integer)
+    aqi = Column(Float)
+    aqi_lower = Column(Float)
+    aqi_upper = Column(Float)
+    generated_at = Column(DateTime, default=datetime.utcnow)
+
+class ForecastState(Base):
+    """Exponential smoothing state per ward, updated as readings arrive"""
+    __tablename__ = "forecast_states"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ward_name = Column(String, unique=True, index=True)
+    level = Column(Float)
+    trend = Column(Float)
+    alpha = Column(Float)
+    beta = Column(Float)
+    sigma = Column(Float)  # Std-dev of one-step-ahead errors
+    last_bucket = Column(Integer)  # Open bucket still collecting readings (buckets since epoch)
+    bucket_sum = Column(Float, default=0.0)  # Sum/count of readings in the open bucket
+    bucket_count = Column(Integer, default=0)
+    n_obs = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class AnalysisWatermark(Base):
+    """Newest input timestamp per ward covered by the materialized analysis"""
+    __tablename__ = "analysis_watermarks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    ward_name = Column(String, unique=True, index=True)
+    input_watermark = Column(DateTime)
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+class AnalysisJob(Base):
+    """Background analysis job; stored so every API worker can report it"""
+    __tablename__ = "analysis_jobs"
+
+    id = Column(String(32), primary_key=True)
+    kind = Column(String)  # correlation, clustering
+    status = Column(String)  # queued, succeeded, failed
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    persisted = Column(JSON, nullable=True)  # ai_analysis / green_actions ids written from the result
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    finished_at = Column(DateTime, nullable=True)
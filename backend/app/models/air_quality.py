@@ -1,6 +1,6 @@
 """Air Quality model for storing environmental data."""
 
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, false
 from datetime import datetime
 from app.db import Base
 
@@ -19,8 +19,15 @@ class AirQuality(Base):
     no2 = Column(Float)
     so2 = Column(Float)
     co = Column(Float)
+    is_anomaly = Column(Boolean, default=False, server_default=false(), index=True)  # Flagged by streaming detector
+    anomaly_score = Column(Float, nullable=True)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    @classmethod
+    def valid(cls):
+        """Filter clause excluding readings flagged as anomalous."""
+        return cls.is_anomaly.isnot(True)
+
 
 class WeatherData(Base):
     """Weather Data Model"""
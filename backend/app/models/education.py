@@ -18,6 +18,7 @@ class School(Base):
     avg_score = Column(Float)
     energy_saving_kw = Column(Float)
     created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class Course(Base):
     """Course/Program Model"""
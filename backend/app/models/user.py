@@ -28,3 +28,10 @@ class CitizenFeedback(Base):
     image_url = Column(String, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+
+class RevokedToken(Base):
+    """Logged-out access token, rejected by every API worker until it expires"""
+    __tablename__ = "revoked_tokens"
+
+    digest = Column(String(32), primary_key=True)  # hex blake2b-128 of the token
+    expires_at = Column(DateTime, nullable=True, index=True)
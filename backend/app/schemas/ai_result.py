@@ -1,8 +1,9 @@
 """Pydantic schemas for AI Analysis API."""
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
-from typing import Optional
+from typing import Any, Literal, Optional
+from app.core.config import settings
 
 # AI Analysis Schemas
 class AIAnalysisBase(BaseModel):
@@ -38,3 +39,43 @@ class GreenActionResponse(GreenActionBase):
 class AIInsightsResponse(BaseModel):
     ai_analysis: list[AIAnalysisResponse]
     green_actions: list[GreenActionResponse]
+
+# Analysis Job Schemas
+class AnalysisJobCreate(BaseModel):
+    kind: Literal["correlation", "clustering"]
+    ward_name: Optional[str] = None
+    n_clusters: Optional[int] = None
+
+class AnalysisJobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    persisted: Optional[dict[str, Any]] = None
+
+# Forecast Schemas
+class AQIForecastResponse(BaseModel):
+    ward_name: str
+    target_time: datetime
+    horizon_hours: int
+    aqi: float
+    aqi_lower: float
+    aqi_upper: float
+    generated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+# Scenario Simulation Schemas
+class ScenarioDefinition(BaseModel):
+    name: str
+    actions: dict[Literal["tree_planting", "solar_installation", "green_education"], float]
+    ward_names: Optional[list[str]] = None
+
+class ScenarioSimulationRequest(BaseModel):
+    # Every scenario costs n_draws x wards samples; oversized batches are rejected with 422
+    scenarios: list[ScenarioDefinition] = Field(max_length=settings.scenario_max_scenarios)
+    n_draws: Optional[int] = None
+    seed: Optional[int] = None
@@ -21,6 +21,8 @@ class AirQualityCreate(AirQualityBase):
 
 class AirQualityResponse(AirQualityBase):
     id: int
+    is_anomaly: Optional[bool] = False
+    anomaly_score: Optional[float] = None
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
@@ -48,6 +50,9 @@ class EnergyDataBase(BaseModel):
     solar_potential_kw: float
     current_usage_kw: float
 
+class EnergyDataCreate(EnergyDataBase):
+    pass
+
 class EnergyDataResponse(EnergyDataBase):
     id: int
     updated_at: datetime
@@ -13,6 +13,14 @@ class UserBase(BaseModel):
 class UserCreate(UserBase):
     password: str
 
+class LoginRequest(BaseModel):
+    email: EmailStr
+    password: str
+
+class TokenResponse(BaseModel):
+    access_token: str
+    token_type: str = "bearer"
+
 class UserResponse(UserBase):
     id: int
     avatar_url: Optional[str] = None
@@ -35,3 +43,12 @@ class FeedbackResponse(FeedbackBase):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+class FeedbackSearchHit(FeedbackResponse):
+    score: float
+
+class FeedbackSearchResponse(BaseModel):
+    total: int
+    skip: int
+    limit: int
+    items: list[FeedbackSearchHit]
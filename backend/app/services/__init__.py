@@ -1,6 +1,25 @@
-"""Services module."""
+"""Services module.
 
-from app.services.open_data_service import OpenDataService
-from app.services.ai_service import AIService
+Service classes are resolved lazily (PEP 562) so importing ``app.services``
+does not pull in httpx, NumPy, scikit-learn, SciPy or rdflib until a service
+is actually used.
+"""
 
-__all__ = ["OpenDataService", "AIService"]
+import importlib
+
+_SERVICES = {
+    "OpenDataService": "app.services.open_data_service",
+    "AIService": "app.services.ai_service",
+    "LODConverter": "app.services.lod_converter",
+    "FiwareService": "app.services.fiware_service",
+}
+
+__all__ = list(_SERVICES)
+
+
+def __getattr__(name: str):
+    if name in _SERVICES:
+        value = getattr(importlib.import_module(_SERVICES[name]), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,17 +1,63 @@
 """AI correlation analysis service."""
 
-import numpy as np
-import pandas as pd
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
-from scipy.stats import pearsonr
+from __future__ import annotations
+
+import time
+from typing import Optional
 from app.core.config import settings
-from app.core.constants import MIN_CORRELATION_THRESHOLD
+from app.core.lazy import lazy_import
+from app.core.metrics import timed_ai_call
+from app.core.constants import MIN_CORRELATION_THRESHOLD, CORRELATION_METRICS, AQI_UNHEALTHY_SENSITIVE
+from app.services.clustering import IncrementalClusterer, ward_clusterer_for
+from app.services.model_store import ModelStore, model_store
+from app.services.scenario_simulation import scenario_simulator
+from app.services.resampling import ResamplingEngine
+
+# NumPy, scikit-learn and SciPy load on first use, not at API startup
+np = lazy_import("numpy")
+sklearn_cluster = lazy_import("sklearn.cluster")
+sklearn_preprocessing = lazy_import("sklearn.preprocessing")
+scipy_special = lazy_import("scipy.special")
+scipy_stats = lazy_import("scipy.stats")
+
+# (row, col) of the metric pairs reported under the legacy correlation keys
+_LEGACY_PAIRS = {
+    "environment_education": (0, 1, "env_edu_p_value"),
+    "energy_environment": (2, 0, "energy_env_p_value"),
+}
+
+
+def _pearson_from_moments(n: np.ndarray, cov: np.ndarray) -> tuple:
+    """Pearson r and two-sided p-values from counts and covariance matrices.
+
+    ``n`` has shape (g,) and ``cov`` shape (g, k, k); both outputs are (g, k, k).
+    Groups with fewer than three samples or a constant metric yield NaN.
+    """
+    std = np.sqrt(np.clip(np.diagonal(cov, axis1=1, axis2=2), 0, None))
+    denom = std[:, :, None] * std[:, None, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = np.clip(cov / denom, -1.0, 1.0)
+        r[denom == 0] = np.nan
+        df = (n - 2).astype(float)[:, None, None]
+        r[np.broadcast_to(df < 1, r.shape)] = np.nan
+        # Same t-distribution tail as scipy.stats.pearsonr, via the incomplete beta
+        t_sq = r ** 2 * df / (1.0 - r ** 2)
+        p = scipy_special.betainc(df / 2, 0.5, df / (df + t_sq))
+    p[np.abs(r) == 1.0] = 0.0
+    return r, p
+
+
+def _nan_to_none(value) -> Optional[float]:
+    """Convert a NumPy scalar to a JSON-friendly float (NaN becomes None)."""
+    value = float(value)
+    return None if np.isnan(value) else value
+
 
 class AIService:
     """AI analysis service for environmental-educational-energy correlations."""
     
     @staticmethod
+    @timed_ai_call
     def analyze_correlation(
         air_quality_data: list,
         school_data: list,
@@ -35,12 +81,12 @@ class AIService:
             
             # Calculate correlations
             if len(aqi_scores) > 1 and len(school_scores) > 1:
-                corr_env_edu, p_value = pearsonr(aqi_scores, school_scores)
+                corr_env_edu, p_value = scipy_stats.pearsonr(aqi_scores, school_scores)
                 results["correlations"]["environment_education"] = float(corr_env_edu)
                 results["correlations"]["env_edu_p_value"] = float(p_value)
             
             if len(energy_renewable) > 1 and len(aqi_scores) > 1:
-                corr_energy_env, p_value = pearsonr(energy_renewable, aqi_scores)
+                corr_energy_env, p_value = scipy_stats.pearsonr(energy_renewable, aqi_scores)
                 results["correlations"]["energy_environment"] = float(corr_energy_env)
                 results["correlations"]["energy_env_p_value"] = float(p_value)
             
@@ -52,10 +98,10 @@ class AIService:
                 len(energy_data)
             )
             
-            # Calculate overall confidence
-            if results["correlations"]:
-                confidence = np.mean([abs(v) for v in results["correlations"].values() if isinstance(v, (int, float))])
-                results["confidence"] = float(min(confidence, 1.0))
+            # Calculate overall confidence from the coefficients only, not their p-values
+            coefficients = [abs(results["correlations"][key]) for key in _LEGACY_PAIRS if key in results["correlations"]]
+            if coefficients:
+                results["confidence"] = float(min(np.mean(coefficients), 1.0))
             
             return results
         
@@ -69,10 +115,195 @@ class AIService:
             }
     
     @staticmethod
-    def _generate_recommendations(ward: str, correlations: dict, num_schools: int, num_energy: int) -> list:
-        """Generate green action recommendations based on correlation analysis."""
+    @timed_ai_call
+    def analyze_correlation_aligned(aligned: dict, ward_name: str, forecast_peak_aqi: float = None) -> dict:
+        """Correlate spatially aligned per-location features for one ward.
+
+        ``aligned`` is the output of ``SpatialJoin.aligned_features``: every
+        school and energy site carries the AQI interpolated at its own
+        location, so each Pearson pair compares values observed at the same
+        place. Locations without a nearby station are dropped.
+        """
+        results = {
+            "ward": ward_name,
+            "correlations": {},
+            "recommendations": [],
+            "confidence": 0.0,
+            "n_pairs": {},
+        }
+
+        try:
+            pairs = {
+                "environment_education": ("env_edu_p_value", aligned["school_aqi"], aligned["school_score"]),
+                "energy_environment": ("energy_env_p_value", aligned["energy_renewable"], aligned["energy_aqi"]),
+            }
+            for key, (p_key, x, y) in pairs.items():
+                x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+                mask = np.isfinite(x) & np.isfinite(y)
+                results["n_pairs"][key] = int(mask.sum())
+                if mask.sum() > 2 and np.ptp(x[mask]) > 0 and np.ptp(y[mask]) > 0:
+                    corr, p_value = scipy_stats.pearsonr(x[mask], y[mask])
+                    results["correlations"][key] = float(corr)
+                    results["correlations"][p_key] = float(p_value)
+
+            results["recommendations"] = AIService._generate_recommendations(
+                ward_name,
+                results["correlations"],
+                len(aligned["school_score"]),
+                len(aligned["energy_renewable"]),
+                forecast_peak_aqi,
+            )
+
+            coefficients = [abs(results["correlations"][key]) for key in pairs if key in results["correlations"]]
+            if coefficients:
+                results["confidence"] = float(min(np.mean(coefficients), 1.0))
+
+            return results
+
+        except Exception as e:
+            return {**results, "error": str(e)}
+
+    @staticmethod
+    @timed_ai_call
+    def correlation_significance(aligned_by_ward: dict, n_iterations: int = None, seed: int = None) -> dict:
+        """Bootstrap CIs and permutation p-values for every ward and metric pair.
+
+        ``aligned_by_ward`` maps ward names to ``SpatialJoin`` aligned features,
+        e.g. from ``SpatialJoin.split_by_ward``.
+        """
+        pairs = {
+            "environment_education": ("school_aqi", "school_score"),
+            "energy_environment": ("energy_renewable", "energy_aqi"),
+        }
+        samples = {
+            (ward, key): (aligned[x], aligned[y])
+            for ward, aligned in aligned_by_ward.items()
+            for key, (x, y) in pairs.items()
+        }
+        try:
+            engine = ResamplingEngine(n_iterations=n_iterations, seed=seed)
+            stats = engine.analyze(samples)
+        except Exception as e:
+            return {"error": str(e), "wards": {}}
+
+        wards = {}
+        for (ward, key), values in stats.items():
+            wards.setdefault(ward, {})[key] = values
+        return {
+            "n_iterations": engine.n_iterations,
+            "seed": engine.seed,
+            "confidence_level": engine.confidence,
+            "wards": wards,
+        }
+
+    @staticmethod
+    def build_correlation_matrix(records: list) -> tuple:
+        """Build the columnar input of ``analyze_correlation_batch`` from row dicts.
+
+        Each record carries ``ward_name``, ``aqi``, ``avg_score`` and
+        ``renewable_percentage``; ``avg_score`` is scaled by 100 as in
+        ``analyze_correlation``. Returns ``(metrics, ward_ids, ward_names)``.
+        """
+        ward_names, ward_ids = np.unique(
+            np.array([r.get("ward_name", "Unknown") for r in records], dtype=object).astype(str),
+            return_inverse=True,
+        )
+        metrics = np.array(
+            [
+                (r.get("aqi", 0), r.get("avg_score", 0) * 100, r.get("renewable_percentage", 0))
+                for r in records
+            ],
+            dtype=float,
+        ).reshape(-1, len(CORRELATION_METRICS))
+        return metrics, ward_ids, ward_names.tolist()
+
+    @staticmethod
+    @timed_ai_call
+    def analyze_correlation_batch(
+        metrics: np.ndarray,
+        ward_ids: np.ndarray,
+        ward_names: list,
+        metric_names: tuple = CORRELATION_METRICS,
+    ) -> dict:
+        """Correlate every metric pair for all wards and the whole city in one pass.
+
+        ``metrics`` is an (n_samples, n_metrics) matrix whose columns follow
+        ``metric_names``; ``ward_ids`` gives the index into ``ward_names`` of each
+        row. Per-ward moments are reduced with ``np.add.reduceat`` over the rows
+        sorted by ward, so no Python code runs per ward or per pair.
+        """
+        metrics = np.asarray(metrics, dtype=float)
+        ward_ids = np.asarray(ward_ids, dtype=np.intp)
+        n_wards, k = len(ward_names), metrics.shape[1]
+
+        if metrics.shape[0] != ward_ids.shape[0]:
+            return {"error": "metrics and ward_ids must have the same length", "wards": {}, "city": {}}
+
+        # Centre on the city mean first to keep the raw-moment formula stable
+        centred = metrics - metrics.mean(axis=0) if len(metrics) else metrics
+        order = np.argsort(ward_ids, kind="stable")
+        sorted_ids = ward_ids[order]
+        x = centred[order]
+        outer = x[:, :, None] * x[:, None, :]
+
+        counts = np.bincount(sorted_ids, minlength=n_wards)
+        sums = np.zeros((n_wards, k))
+        cross = np.zeros((n_wards, k, k))
+        present = np.flatnonzero(counts)
+        if len(present):
+            starts = np.concatenate(([0], np.cumsum(counts[present])[:-1]))
+            sums[present] = np.add.reduceat(x, starts, axis=0)
+            cross[present] = np.add.reduceat(outer, starts, axis=0)
+
+        # City-wide moments are appended as one extra group
+        counts = np.append(counts, len(x))
+        sums = np.vstack([sums, x.sum(axis=0, keepdims=True)])
+        cross = np.concatenate([cross, outer.sum(axis=0, keepdims=True)])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            means = sums / counts[:, None]
+            cov = cross / counts[:, None, None] - means[:, :, None] * means[:, None, :]
+        r, p = _pearson_from_moments(counts, cov)
+
+        def summarize(g: int) -> dict:
+            correlations = {}
+            for key, (i, j, p_key) in _LEGACY_PAIRS.items():
+                if max(i, j) < k and not np.isnan(r[g, i, j]):
+                    correlations[key] = float(r[g, i, j])
+                    correlations[p_key] = float(p[g, i, j])
+            return {
+                "n_samples": int(counts[g]),
+                "metrics": list(metric_names),
+                "correlation_matrix": [[_nan_to_none(v) for v in row] for row in r[g]],
+                "p_value_matrix": [[_nan_to_none(v) for v in row] for row in p[g]],
+                "correlations": correlations,
+            }
+
+        return {
+            "wards": {name: summarize(g) for g, name in enumerate(ward_names)},
+            "city": summarize(n_wards),
+        }
+
+    @staticmethod
+    def _generate_recommendations(
+        ward: str,
+        correlations: dict,
+        num_schools: int,
+        num_energy: int,
+        forecast_peak_aqi: float = None,
+    ) -> list:
+        """Generate green action recommendations based on correlation analysis and AQI forecast."""
         recommendations = []
         
+        # Forecast alert
+        if forecast_peak_aqi is not None and forecast_peak_aqi > AQI_UNHEALTHY_SENSITIVE:
+            recommendations.append({
+                "action": "Cảnh báo ô nhiễm không khí",
+                "description": f"Dự báo AQI ở {ward} đạt {forecast_peak_aqi:.0f} trong 24 giờ tới. Hạn chế hoạt động ngoài trời tại trường học.",
+                "impact": "high",
+                "target": "environment"
+            })
+        
         # Environmental-Education correlation
         env_edu_corr = correlations.get("environment_education", 0)
         if abs(env_edu_corr) > MIN_CORRELATION_THRESHOLD:
@@ -114,8 +345,39 @@ class AIService:
         return recommendations
     
     @staticmethod
-    def cluster_wards(wards_data: list, n_clusters: int = None) -> dict:
-        """Cluster wards based on environmental and educational metrics."""
+    def _ward_features(wards_data: list) -> tuple:
+        """Ward names and the (n_wards, 4) feature matrix used for clustering."""
+        ward_names = [ward["name"] for ward in wards_data]
+        features = np.array(
+            [
+                (
+                    ward.get("aqi", 0),
+                    ward.get("avg_school_score", 0),
+                    ward.get("renewable_energy", 0),
+                    ward.get("num_schools", 0),
+                )
+                for ward in wards_data
+            ],
+            dtype=float,
+        ).reshape(-1, 4)
+        return ward_names, features
+
+    @staticmethod
+    def _group_labels(ward_names: list, labels) -> dict:
+        """Map each cluster label to the ward names assigned to it."""
+        clusters = {}
+        for ward_name, label in zip(ward_names, labels):
+            clusters.setdefault(int(label), []).append(ward_name)
+        return clusters
+
+    @staticmethod
+    @timed_ai_call
+    def cluster_wards(wards_data: list, n_clusters: int = None, use_cache: bool = True) -> dict:
+        """Cluster wards based on environmental and educational metrics.
+
+        Fitted models are looked up in ``model_store`` by a fingerprint of the
+        feature matrix and cluster count, so identical requests skip the fit.
+        """
         
         if not wards_data:
             return {"error": "No data provided", "clusters": {}}
@@ -124,38 +386,43 @@ class AIService:
         
         try:
             # Prepare features
-            features = []
-            ward_names = []
-            
-            for ward in wards_data:
-                ward_names.append(ward["name"])
-                feature = [
-                    ward.get("aqi", 0),
-                    ward.get("avg_school_score", 0),
-                    ward.get("renewable_energy", 0),
-                    ward.get("num_schools", 0),
-                ]
-                features.append(feature)
+            ward_names, features = AIService._ward_features(wards_data)
+            n_clusters = min(n_clusters, len(ward_names))
             
-            # Standardize features
-            scaler = StandardScaler()
-            features_scaled = scaler.fit_transform(features)
+            key = ModelStore.fingerprint(features, n_clusters) if use_cache else None
+            entry = model_store.get(key) if use_cache else None
+            cached = entry is not None
             
-            # Clustering
-            kmeans = KMeans(n_clusters=min(n_clusters, len(ward_names)), random_state=42)
-            labels = kmeans.fit_predict(features_scaled)
+            if entry is None:
+                started = time.perf_counter()
+                
+                # Standardize features
+                scaler = sklearn_preprocessing.StandardScaler()
+                features_scaled = scaler.fit_transform(features)
+                
+                # Clustering
+                kmeans = sklearn_cluster.KMeans(n_clusters=n_clusters, random_state=42)
+                labels = kmeans.fit_predict(features_scaled)
+                
+                entry = {
+                    "labels": labels,
+                    "centroids": scaler.inverse_transform(kmeans.cluster_centers_),
+                    "scaler": scaler,
+                    "model": kmeans,
+                    "fit_seconds": time.perf_counter() - started,
+                }
+                if use_cache:
+                    model_store.put(key, entry)
             
             # Organize results
-            clusters = {}
-            for ward_name, label in zip(ward_names, labels):
-                if label not in clusters:
-                    clusters[label] = []
-                clusters[label].append(ward_name)
+            clusters = AIService._group_labels(ward_names, entry["labels"])
             
             return {
                 "success": True,
                 "clusters": clusters,
-                "n_clusters": len(clusters)
+                "n_clusters": len(clusters),
+                "centroids": np.asarray(entry["centroids"]).tolist(),
+                "cached": cached,
             }
         
         except Exception as e:
@@ -166,6 +433,55 @@ class AIService:
             }
     
     @staticmethod
+    @timed_ai_call
+    def cluster_wards_incremental(
+        wards_data: list,
+        n_clusters: int = None,
+        clusterer: IncrementalClusterer = None,
+        refit: bool = False,
+    ) -> dict:
+        """Cluster wards with a mini-batch model that keeps its previous centroids.
+
+        Wards that are new or changed since the last call are folded in with
+        ``partial_fit``; ``refit=True`` runs a full mini-batch fit warm-started
+        from the current centroids instead. Each cluster count has its own model.
+        """
+        if not wards_data:
+            return {"error": "No data provided", "clusters": {}}
+
+        if clusterer is None or (n_clusters and n_clusters != clusterer.n_clusters):
+            clusterer = ward_clusterer_for(n_clusters)
+
+        try:
+            ward_names, features = AIService._ward_features(wards_data)
+            if refit or not clusterer.is_fitted:
+                labels = clusterer.fit(features, keys=ward_names)
+            else:
+                labels = clusterer.partial_fit(features, keys=ward_names).predict(features)
+
+            clusters = AIService._group_labels(ward_names, labels)
+            return {
+                "success": True,
+                "clusters": clusters,
+                "n_clusters": len(clusters),
+                "centroids": clusterer.centroids.tolist(),
+            }
+
+        except Exception as e:
+            return {
+                "error": str(e),
+                "success": False,
+                "clusters": {}
+            }
+
+    @staticmethod
+    def assign_ward_cluster(ward: dict, clusterer: IncrementalClusterer = None) -> int:
+        """Assign a single new ward to a cluster of an already fitted model."""
+        _, features = AIService._ward_features([{"name": None, **ward}])
+        return (clusterer or ward_clusterer_for()).predict_one(features[0])
+
+    @staticmethod
+    @timed_ai_call
     def predict_impact(action: str, current_aqi: int, current_energy: float) -> dict:
         """Predict impact of a green action."""
         
@@ -191,3 +507,18 @@ class AIService:
             "note": f"No specific data for action: {action}",
             "general_impact": "Positive environmental effect expected"
         })
+    
+    @staticmethod
+    @timed_ai_call
+    def simulate_scenarios(scenarios: list, wards_data: list, n_draws: int = None, seed: int = None) -> dict:
+        """Monte Carlo impact bands for action portfolios across all wards.
+
+        Batched counterpart of ``predict_impact``; see ``ScenarioSimulator``.
+        """
+        if not wards_data:
+            return {"error": "No data provided", "scenarios": []}
+        
+        try:
+            return scenario_simulator.simulate(scenarios, wards_data, n_draws=n_draws, seed=seed)
+        except Exception as e:
+            return {"error": str(e), "scenarios": []}
@@ -0,0 +1,40 @@
+"""Load analytics inputs for AIService from the database."""
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.models import AirQuality, School, EnergyData
+from app.services.streaming_stats import renewable_percentage
+
+
+class AnalysisInputs:
+    """Query helpers that turn ORM rows into the plain dicts AIService expects."""
+
+    @staticmethod
+    def ward_aggregates(db: Session) -> list:
+        """Per-ward feature dicts in the shape ``AIService.cluster_wards`` takes."""
+        wards = {}
+        aqi_rows = (
+            db.query(AirQuality.ward_name, func.avg(AirQuality.aqi))
+            .filter(AirQuality.valid())
+            .group_by(AirQuality.ward_name)
+        )
+        for ward_name, aqi in aqi_rows:
+            wards.setdefault(ward_name, {"name": ward_name})["aqi"] = float(aqi or 0)
+
+        school_rows = db.query(
+            School.ward_name, func.avg(School.avg_score), func.count(School.id)
+        ).group_by(School.ward_name)
+        for ward_name, avg_score, num_schools in school_rows:
+            ward = wards.setdefault(ward_name, {"name": ward_name})
+            ward["avg_school_score"] = float(avg_score or 0)
+            ward["num_schools"] = int(num_schools)
+
+        energy_rows = db.query(
+            EnergyData.ward_name, func.sum(EnergyData.solar_potential_kw), func.sum(EnergyData.current_usage_kw)
+        ).group_by(EnergyData.ward_name)
+        for ward_name, solar, usage in energy_rows:
+            ward = wards.setdefault(ward_name, {"name": ward_name})
+            ward["renewable_energy"] = renewable_percentage(solar, usage)
+            ward["energy_usage_kw"] = float(usage or 0)
+
+        return [wards[name] for name in sorted(wards, key=lambda n: (n is None, n)) if name is not None]
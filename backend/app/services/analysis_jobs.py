@@ -0,0 +1,249 @@
+"""Background analysis jobs executed in a bounded process pool."""
+
+import json
+import queue
+import threading
+import uuid
+from concurrent.futures import Future
+from datetime import datetime
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.constants import IMPACT_SCORES
+from app.core.process_pool import ProcessPool
+from app.db.base import SessionLocal
+from app.models import AIAnalysis, GreenAction, AnalysisJob
+from app.services.ai_service import AIService
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+class JobQueueFull(Exception):
+    """Raised when the number of unfinished jobs reached the configured limit."""
+
+
+def _run_correlation(payload: dict) -> dict:
+    return AIService.analyze_correlation_aligned(
+        payload["aligned"], payload["ward_name"], payload.get("forecast_peak_aqi")
+    )
+
+
+def _run_clustering(payload: dict) -> dict:
+    return AIService.cluster_wards(payload["wards"], payload.get("n_clusters"))
+
+
+JOB_RUNNERS = {
+    "correlation": _run_correlation,
+    "clustering": _run_clustering,
+}
+
+
+def _jsonable(result: dict) -> dict:
+    """Round-trip through JSON so NumPy scalars and arrays can be stored."""
+    return json.loads(json.dumps(result, default=lambda value: value.tolist()))
+
+
+def persist_correlation_result(db, result: dict, source: str = "job", commit: bool = True) -> dict:
+    """Store a correlation result as one AIAnalysis row plus its GreenAction rows."""
+    correlations = result.get("correlations", {})
+    recommendations = result.get("recommendations", [])
+    analysis = AIAnalysis(
+        ward_name=result["ward"],
+        corr_env_edu=correlations.get("environment_education", 0.0),
+        corr_energy=correlations.get("energy_environment", 0.0),
+        recommendation="; ".join(r["action"] for r in recommendations),
+        source=source,
+    )
+    actions = [
+        GreenAction(
+            ward_name=result["ward"],
+            action=f"{r['action']}: {r['description']}",
+            impact_score=IMPACT_SCORES.get(r.get("impact"), IMPACT_SCORES["medium"]),
+            source=source,
+        )
+        for r in recommendations
+    ]
+    db.add(analysis)
+    db.add_all(actions)
+    if commit:
+        db.commit()
+    else:
+        db.flush()
+    return {"ai_analysis_id": analysis.id, "green_action_ids": [a.id for a in actions]}
+
+
+class AnalysisJobManager:
+    """Submit AIService work to a process pool; job state lives in ``analysis_jobs``.
+
+    Submitting inserts the job row, so a status poll answered by any API
+    worker finds it. Finished jobs are written back (status, result and,
+    for correlations, the ``ai_analysis`` / ``green_actions`` rows) by one
+    writer thread, never on the pool's management thread. The pending
+    limit and the futures that wake event streams are per process; the
+    pool is started lazily and replaced if a worker crash breaks it.
+    """
+
+    def __init__(self, max_workers: int = None, max_pending: int = None, history: int = None):
+        self.max_workers = max_workers or settings.ai_job_workers
+        self.max_pending = max_pending or settings.ai_job_max_pending
+        self.history = history or settings.ai_job_history
+        self._pool = ProcessPool(self.max_workers)
+        self._futures = {}  # job id -> Future of this process's unfinished jobs
+        self._lock = threading.Lock()
+        self._done = queue.Queue()
+        self._writer = None
+
+    def submit(self, db: Session, kind: str, payload: dict) -> str:
+        """Record and queue a job; returns its id immediately."""
+        if kind not in JOB_RUNNERS:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            if len(self._futures) >= self.max_pending:
+                raise JobQueueFull(f"{self.max_pending} analysis jobs already pending")
+            self._futures[job_id] = None  # reserves the slot
+            self._start_writer()
+
+        try:
+            db.add(AnalysisJob(id=job_id, kind=kind, status=JOB_QUEUED, created_at=datetime.utcnow()))
+            db.commit()
+        except Exception:
+            with self._lock:
+                self._futures.pop(job_id, None)
+            raise
+
+        try:
+            future = self._pool.submit(JOB_RUNNERS[kind], payload)
+        except Exception as e:
+            future = Future()
+            future.set_exception(e)
+        with self._lock:
+            self._futures[job_id] = future
+        future.add_done_callback(lambda f, job_id=job_id: self._done.put((job_id, f)))
+        return job_id
+
+    def _start_writer(self) -> None:
+        if self._writer is None:
+            self._writer = threading.Thread(target=self._write_results, name="analysis-job-writer", daemon=True)
+            self._writer.start()
+
+    def _write_results(self) -> None:
+        while True:
+            item = self._done.get()
+            if item is None:
+                return
+            job_id, future = item
+            try:
+                self._record(job_id, future)
+            except Exception as e:
+                print(f"⚠️  Analysis job {job_id} could not be recorded: {e}")
+            finally:
+                # Only leave the pending set once the final status is stored
+                with self._lock:
+                    self._futures.pop(job_id, None)
+
+    def _record(self, job_id: str, future: Future) -> None:
+        result = error = persisted = None
+        if future.cancelled():
+            status, error = JOB_FAILED, "cancelled"
+        elif future.exception() is not None:
+            status, error = JOB_FAILED, str(future.exception()) or type(future.exception()).__name__
+        else:
+            result = _jsonable(future.result())
+            status = JOB_FAILED if "error" in result else JOB_SUCCEEDED
+            error = result.get("error")
+
+        db = SessionLocal()
+        try:
+            job = db.get(AnalysisJob, job_id)
+            if job is None:
+                return
+            if job.kind == "correlation" and status == JOB_SUCCEEDED:
+                try:
+                    persisted = persist_correlation_result(db, result, commit=False)
+                except Exception as e:
+                    db.rollback()
+                    job = db.get(AnalysisJob, job_id)
+                    error = f"result could not be stored: {e}"
+            job.status, job.result, job.error, job.persisted = status, result, error, persisted
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            self._trim(db)
+        finally:
+            db.close()
+
+    def _trim(self, db: Session) -> None:
+        """Keep the newest ``history`` finished jobs."""
+        cutoff = (
+            db.query(AnalysisJob.created_at)
+            .filter(AnalysisJob.finished_at.isnot(None))
+            .order_by(AnalysisJob.created_at.desc())
+            .offset(self.history)
+            .limit(1)
+            .scalar()
+        )
+        if cutoff is not None:
+            db.execute(delete(AnalysisJob).where(AnalysisJob.finished_at.isnot(None), AnalysisJob.created_at <= cutoff))
+            db.commit()
+
+    def get_future(self, job_id: str):
+        """The job's future if this process runs it and it is unfinished."""
+        return self._futures.get(job_id)
+
+    def status(self, db: Session, job_id: str):
+        """Serializable status of a job, or None if unknown."""
+        job = db.get(AnalysisJob, job_id)
+        if job is None:
+            return None
+        status = job.status
+        future = self._futures.get(job_id)
+        if status == JOB_QUEUED and future is not None and (future.running() or future.done()):
+            status = JOB_RUNNING
+        return {
+            "id": job.id,
+            "kind": job.kind,
+            "status": status,
+            "created_at": job.created_at,
+            "finished_at": job.finished_at,
+            "result": job.result,
+            "error": job.error,
+            "persisted": job.persisted,
+        }
+
+    def fetch_status(self, job_id: str):
+        """``status`` in its own short-lived session, for event streams."""
+        db = SessionLocal()
+        try:
+            return self.status(db, job_id)
+        finally:
+            db.close()
+
+    def shutdown(self) -> None:
+        """Stop the pool and fail this process's unfinished jobs, which no worker will finish."""
+        self._pool.shutdown()
+        with self._lock:
+            unfinished = [job_id for job_id, future in self._futures.items() if future is None or not future.done()]
+        if unfinished:
+            db = SessionLocal()
+            try:
+                db.execute(
+                    update(AnalysisJob)
+                    .where(AnalysisJob.id.in_(unfinished), AnalysisJob.finished_at.is_(None))
+                    .values(status=JOB_FAILED, error="server shut down", finished_at=datetime.utcnow())
+                )
+                db.commit()
+            except Exception as e:
+                print(f"⚠️  Could not fail unfinished analysis jobs: {e}")
+            finally:
+                db.close()
+        if self._writer is not None:
+            self._done.put(None)
+            self._writer.join(timeout=5)
+            self._writer = None
+
+
+analysis_jobs = AnalysisJobManager()
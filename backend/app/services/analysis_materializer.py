@@ -0,0 +1,150 @@
+"""Batch materialization of AI analysis into ai_analysis / green_actions."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from sqlalchemy import delete, func, insert
+from sqlalchemy.orm import Session
+from app.core.constants import IMPACT_SCORES
+from app.db.base import SessionLocal
+from app.db.upsert import upsert
+from app.models import (
+    AirQuality,
+    School,
+    EnergyData,
+    AIAnalysis,
+    GreenAction,
+    AQIForecast,
+    AnalysisWatermark,
+)
+from app.services.ai_service import AIService
+from app.services.lod_stream import settled_watermark
+from app.services.spatial_join import SpatialJoin
+
+SOURCE_BATCH = "batch"
+
+
+class AnalysisMaterializer:
+    """Recompute correlation/recommendations for wards whose inputs changed.
+
+    Each ward's input watermark is the newest update timestamp among its
+    valid air quality readings, schools and energy rows, capped by
+    ``settled_watermark`` so a row committing late with an earlier stamp
+    still lands above the stored mark. Only wards whose watermark moved past
+    the stored one are recomputed, and their results are written
+    with one multi-row upsert into ``ai_analysis`` plus one multi-row insert
+    into ``green_actions``.
+    """
+
+    @staticmethod
+    def input_watermarks(db: Session) -> dict:
+        """Newest input timestamp per ward across all analytics inputs, before settling."""
+        watermarks = {}
+        queries = (
+            db.query(AirQuality.ward_name, func.max(AirQuality.updated_at)).filter(AirQuality.valid()).group_by(AirQuality.ward_name),
+            db.query(School.ward_name, func.max(School.updated_at)).group_by(School.ward_name),
+            db.query(EnergyData.ward_name, func.max(EnergyData.updated_at)).group_by(EnergyData.ward_name),
+        )
+        for query in queries:
+            for ward_name, newest in query:
+                if ward_name is None or newest is None:
+                    continue
+                if ward_name not in watermarks or newest > watermarks[ward_name]:
+                    watermarks[ward_name] = newest
+        return watermarks
+
+    @staticmethod
+    def stale_wards(db: Session, watermarks: dict) -> list:
+        stored = dict(db.query(AnalysisWatermark.ward_name, AnalysisWatermark.input_watermark))
+        return sorted(w for w, newest in watermarks.items() if stored.get(w) is None or newest > stored[w])
+
+    @staticmethod
+    def run(db: Session, force: bool = False) -> dict:
+        """Materialize analysis for stale wards (or all wards with ``force``)."""
+        watermarks = AnalysisMaterializer.input_watermarks(db)
+        wards = sorted(watermarks) if force else AnalysisMaterializer.stale_wards(db, watermarks)
+        if not wards:
+            return {"wards": 0, "ai_analysis": 0, "green_actions": 0, "skipped": len(watermarks)}
+
+        # One spatial join for the whole city, then split per ward
+        per_ward = SpatialJoin.split_by_ward(SpatialJoin.aligned_features(db))
+        peaks = dict(
+            db.query(AQIForecast.ward_name, func.max(AQIForecast.aqi))
+            .filter(AQIForecast.ward_name.in_(wards))
+            .group_by(AQIForecast.ward_name)
+        )
+
+        # Wards with only air quality data have no school/energy points to pair
+        empty = {"school_aqi": (), "school_score": (), "energy_aqi": (), "energy_renewable": ()}
+        now = datetime.utcnow()
+        analyses, actions = [], []
+        for ward_name in wards:
+            aligned = per_ward.get(ward_name, empty)
+            result = AIService.analyze_correlation_aligned(aligned, ward_name, peaks.get(ward_name))
+            correlations = result.get("correlations", {})
+            recommendations = result.get("recommendations", [])
+            analyses.append({
+                "ward_name": ward_name,
+                "corr_env_edu": correlations.get("environment_education", 0.0),
+                "corr_energy": correlations.get("energy_environment", 0.0),
+                "recommendation": "; ".join(r["action"] for r in recommendations),
+                "source": SOURCE_BATCH,
+                "timestamp": now,
+            })
+            actions.extend(
+                {
+                    "ward_name": ward_name,
+                    "action": f"{r['action']}: {r['description']}",
+                    "impact_score": IMPACT_SCORES.get(r.get("impact"), IMPACT_SCORES["medium"]),
+                    "source": SOURCE_BATCH,
+                    "created_at": now,
+                }
+                for r in recommendations
+            )
+
+        try:
+            upsert(
+                db, AIAnalysis, analyses,
+                index_elements=["ward_name"],
+                index_where=AIAnalysis.source == SOURCE_BATCH,
+                update_columns=["corr_env_edu", "corr_energy", "recommendation", "timestamp"],
+            )
+            db.execute(
+                delete(GreenAction).where(GreenAction.source == SOURCE_BATCH, GreenAction.ward_name.in_(wards))
+            )
+            if actions:
+                db.execute(insert(GreenAction), actions)
+            upsert(
+                db, AnalysisWatermark,
+                [{"ward_name": w, "input_watermark": settled_watermark(watermarks[w]), "computed_at": now}
+                 for w in wards],
+                index_elements=["ward_name"],
+                update_columns=["input_watermark", "computed_at"],
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        return {
+            "wards": len(wards),
+            "ai_analysis": len(analyses),
+            "green_actions": len(actions),
+            "skipped": len(watermarks) - len(wards),
+        }
+
+
+def materialize(force: bool = False) -> dict:
+    """Run the batch in its own session (CLI / scheduler entry point)."""
+    db = SessionLocal()
+    try:
+        return AnalysisMaterializer.run(db, force=force)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    import sys
+
+    print("🧠 Materializing AI analysis...")
+    print(f"✅ {materialize(force='--force' in sys.argv)}")
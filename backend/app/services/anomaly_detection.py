@@ -0,0 +1,130 @@
+"""Streaming outlier detection for incoming sensor readings."""
+
+from __future__ import annotations
+
+import threading
+import time
+from app.core.config import settings
+from app.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# Scale factor making the MAD a consistent estimator of the normal std-dev
+MAD_TO_STD = 1.4826
+
+# Station coordinates are compared at this many decimals (~10 m)
+STATION_DECIMALS = 4
+
+
+def station_key(ward_name: str, lat: float, lng: float) -> tuple:
+    """Identify a station by ward and rounded coordinates (~10 m)."""
+    return (ward_name, round(lat or 0.0, STATION_DECIMALS), round(lng or 0.0, STATION_DECIMALS))
+
+
+def coordinate_range(rounded: float) -> tuple:
+    """``[low, high)`` of the raw coordinates ``station_key`` rounds to ``rounded``."""
+    half = 0.5 * 10**-STATION_DECIMALS
+    return rounded - half, rounded + half
+
+
+class RobustAnomalyDetector:
+    """Rolling median/MAD per station over fixed-size NumPy ring buffers.
+
+    All stations share one (n_stations x window) float32 array that grows by
+    doubling, so memory stays compact and each check costs O(window),
+    independent of the station's history length. Outliers are written back
+    winsorized so a spike does not drag the baseline, while a genuine
+    level shift is still absorbed over the following readings.
+
+    Each API worker only sees the readings posted to it, so a station's
+    buffer is re-seeded from the database once it is ``reseed_seconds`` old;
+    that keeps the baselines of all workers close to the stored history.
+    """
+
+    def __init__(
+        self,
+        window: int = None,
+        threshold: float = None,
+        min_samples: int = None,
+        min_scale: float = None,
+        reseed_seconds: float = None,
+    ):
+        self.window = window or settings.anomaly_window
+        self.threshold = threshold or settings.anomaly_threshold
+        self.min_samples = min_samples or settings.anomaly_min_samples
+        self.min_scale = settings.anomaly_min_scale if min_scale is None else min_scale
+        self.reseed_seconds = settings.anomaly_reseed_seconds if reseed_seconds is None else reseed_seconds
+        self._rows = {}
+        self._seeded_at = {}
+        self._buffer = None
+        self._count = None
+        self._pos = None
+        self._lock = threading.Lock()
+
+    def _row(self, key) -> int:
+        row = self._rows.get(key)
+        if row is not None:
+            return row
+
+        row = len(self._rows)
+        if self._buffer is None:
+            self._buffer = np.zeros((16, self.window), dtype=np.float32)
+            self._count = np.zeros(16, dtype=np.int32)
+            self._pos = np.zeros(16, dtype=np.int32)
+        elif row >= len(self._buffer):
+            grow = len(self._buffer)
+            self._buffer = np.concatenate([self._buffer, np.zeros((grow, self.window), dtype=np.float32)])
+            self._count = np.concatenate([self._count, np.zeros(grow, dtype=np.int32)])
+            self._pos = np.concatenate([self._pos, np.zeros(grow, dtype=np.int32)])
+        self._rows[key] = row
+        return row
+
+    def _push(self, row: int, value: float) -> None:
+        self._buffer[row, self._pos[row]] = value
+        self._pos[row] = (self._pos[row] + 1) % self.window
+        self._count[row] = min(self._count[row] + 1, self.window)
+
+    def needs_seed(self, key) -> bool:
+        """True if the station was never seeded or its seed is stale."""
+        seeded_at = self._seeded_at.get(key)
+        return seeded_at is None or time.monotonic() - seeded_at >= self.reseed_seconds
+
+    def seed(self, key, values) -> None:
+        """Replace a station's buffer with recent values (oldest first)."""
+        with self._lock:
+            row = self._row(key)
+            self._count[row] = self._pos[row] = 0
+            for value in list(values)[-self.window:]:
+                self._push(row, float(value))
+            self._seeded_at[key] = time.monotonic()
+
+    def check(self, key, value: float) -> tuple:
+        """Score ``value`` against the station baseline, then record it.
+
+        Returns ``(score, is_anomaly)`` where score is the robust z-score
+        ``|x - median| / (1.4826 * MAD)``; it is 0.0 while warming up.
+        """
+        value = float(value)
+        with self._lock:
+            row = self._row(key)
+            n = int(self._count[row])
+            if n < self.min_samples:
+                self._push(row, value)
+                return 0.0, False
+
+            window = self._buffer[row, :n]
+            median = float(np.median(window))
+            scale = max(MAD_TO_STD * float(np.median(np.abs(window - median))), self.min_scale)
+            score = abs(value - median) / scale
+            is_anomaly = score > self.threshold
+
+            limit = self.threshold * scale
+            self._push(row, min(max(value, median - limit), median + limit))
+            return score, is_anomaly
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"stations": len(self._rows), "window": self.window, "threshold": self.threshold}
+
+
+aqi_anomalies = RobustAnomalyDetector()
@@ -0,0 +1,230 @@
+"""Interpolated AQI raster surfaces and cached map tiles."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.constants import (
+    AQI_GOOD,
+    AQI_MODERATE,
+    AQI_UNHEALTHY_SENSITIVE,
+    AQI_UNHEALTHY,
+    AQI_VERY_UNHEALTHY,
+)
+from app.core.lazy import lazy_import
+from app.services.spatial_join import SpatialJoin, StationIndex
+
+np = lazy_import("numpy")
+
+TILE_SIZE = 256
+KM_PER_DEGREE = 111.32
+
+# US EPA AQI palette (upper bound, RGBA)
+AQI_COLORS = (
+    (AQI_GOOD, (0, 228, 0, 170)),
+    (AQI_MODERATE, (255, 255, 0, 170)),
+    (AQI_UNHEALTHY_SENSITIVE, (255, 126, 0, 170)),
+    (AQI_UNHEALTHY, (255, 0, 0, 170)),
+    (AQI_VERY_UNHEALTHY, (143, 63, 151, 170)),
+    (math.inf, (126, 0, 35, 170)),
+)
+
+
+def tile_bounds(z: int, x: int, y: int) -> tuple:
+    """(lat_min, lat_max, lng_min, lng_max) of a Web Mercator tile."""
+    n = 2 ** z
+    lng_min, lng_max = x / n * 360 - 180, (x + 1) / n * 360 - 180
+    lat_max = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    lat_min = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return lat_min, lat_max, lng_min, lng_max
+
+
+def tile_pixel_centres(z: int, x: int, y: int, size: int = TILE_SIZE) -> tuple:
+    """Latitudes (top to bottom) and longitudes of a tile's pixel centres."""
+    n = 2 ** z
+    offsets = (np.arange(size) + 0.5) / size
+    lng = (x + offsets) / n * 360 - 180
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * (y + offsets) / n))))
+    return lat, lng
+
+
+def encode_png(rgba: np.ndarray) -> bytes:
+    """Encode an (h, w, 4) uint8 array as a PNG without an imaging library."""
+    height, width = rgba.shape[:2]
+    raw = np.concatenate([np.zeros((height, 1), dtype=np.uint8), rgba.reshape(height, -1)], axis=1)
+
+    def chunk(tag: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + tag + data + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF)
+
+    header = struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)
+    return b"".join([
+        b"\x89PNG\r\n\x1a\n",
+        chunk(b"IHDR", header),
+        chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)),
+        chunk(b"IEND", b""),
+    ])
+
+
+def colorize(values: np.ndarray) -> np.ndarray:
+    """Map AQI values to RGBA using the EPA palette; NaN becomes transparent."""
+    bounds = np.array([upper for upper, _ in AQI_COLORS])
+    palette = np.array([color for _, color in AQI_COLORS] + [(0, 0, 0, 0)], dtype=np.uint8)
+    idx = np.searchsorted(bounds, np.nan_to_num(values, nan=0.0), side="left")
+    idx[np.isnan(values)] = len(AQI_COLORS)
+    return palette[idx]
+
+
+class AQIRaster:
+    """Inverse-distance weighted AQI surfaces from the latest station readings."""
+
+    @staticmethod
+    def latest_stations(db: Session) -> np.ndarray:
+        """Latest reading per station location as an (n, 3) lat/lng/aqi array."""
+        return SpatialJoin.latest_stations(db)
+
+    @staticmethod
+    def interpolate(stations: np.ndarray, lat: np.ndarray, lng: np.ndarray) -> np.ndarray:
+        """IDW estimate on the lat x lng grid; cells beyond the radius are NaN."""
+        grid_lat, grid_lng = np.meshgrid(lat, lng, indexing="ij")
+        index = StationIndex(stations[:, 0], stations[:, 1], stations[:, 2])
+        values = index.query(
+            grid_lat.ravel(),
+            grid_lng.ravel(),
+            k=settings.aqi_raster_neighbors,
+            max_distance_km=settings.aqi_raster_max_distance_km,
+            power=settings.aqi_raster_power,
+        )
+        return values.reshape(grid_lat.shape)
+
+    @staticmethod
+    def grid(stations: np.ndarray, lat_min: float, lat_max: float, lng_min: float, lng_max: float, resolution: int) -> dict:
+        """Regular lat/lng raster over a ward or city bounding box."""
+        lat = np.linspace(lat_max, lat_min, resolution)
+        lng = np.linspace(lng_min, lng_max, resolution)
+        values = AQIRaster.interpolate(stations, lat, lng)
+        return {
+            "lat": lat.round(6).tolist(),
+            "lng": lng.round(6).tolist(),
+            "aqi": [[None if np.isnan(v) else round(float(v), 1) for v in row] for row in values],
+        }
+
+
+class AQITileCache:
+    """LRU of rendered tiles, each tagged with a fingerprint of its input stations.
+
+    A tile only depends on stations within the IDW radius of its bounds. On
+    each request that subset is hashed; if it matches the cached tile's
+    fingerprint the cached bytes are served, otherwise the tile is rendered
+    again. Station readings are reloaded at most every
+    ``aqi_raster_refresh_seconds`` or after ``invalidate``; readings ingested
+    by this worker are applied in place with ``observe``, so only the tiles
+    around the changed station render again.
+    """
+
+    def __init__(self, max_tiles: int = None, refresh_seconds: float = None):
+        self.max_tiles = max_tiles or settings.aqi_tile_cache_size
+        self.refresh_seconds = settings.aqi_raster_refresh_seconds if refresh_seconds is None else refresh_seconds
+        self._tiles = OrderedDict()
+        self._stations = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def invalidate(self) -> None:
+        """Force the station snapshot to reload on the next tile request."""
+        self._loaded_at = 0.0
+
+    def observe(self, lat: float, lng: float, aqi: float) -> None:
+        """Apply a new reading to the loaded station snapshot without reloading it."""
+        if lat is None or lng is None or aqi is None:
+            return
+        with self._lock:
+            stations = self._stations
+            if stations is None:
+                return  # nothing loaded yet; the first request reads the database
+            # Copy on write: requests may be rendering from the current array
+            match = np.flatnonzero((stations[:, 0] == lat) & (stations[:, 1] == lng))
+            if len(match):
+                stations = stations.copy()
+                stations[match[0], 2] = aqi
+            else:
+                stations = np.vstack([stations, [[lat, lng, aqi]]])
+            self._stations = stations
+
+    def stations(self, db: Session) -> np.ndarray:
+        if self._stations is None or time.monotonic() - self._loaded_at >= self.refresh_seconds:
+            stations = AQIRaster.latest_stations(db)
+            with self._lock:
+                self._stations = stations
+                self._loaded_at = time.monotonic()
+        return self._stations
+
+    @staticmethod
+    def _stations_near(stations: np.ndarray, bounds: tuple) -> np.ndarray:
+        lat_min, lat_max, lng_min, lng_max = bounds
+        margin_lat = settings.aqi_raster_max_distance_km / KM_PER_DEGREE
+        cos_lat = max(math.cos(math.radians(max(abs(lat_min), abs(lat_max)))), 1e-6)
+        margin_lng = margin_lat / cos_lat
+        mask = (
+            (stations[:, 0] >= lat_min - margin_lat) & (stations[:, 0] <= lat_max + margin_lat)
+            & (stations[:, 1] >= lng_min - margin_lng) & (stations[:, 1] <= lng_max + margin_lng)
+        )
+        return stations[mask]
+
+    def get_tile(self, db: Session, z: int, x: int, y: int, fmt: str = "png") -> tuple:
+        """Return ``(content, fingerprint)`` for a tile, rendering only if its inputs changed."""
+        nearby = self._stations_near(self.stations(db), tile_bounds(z, x, y))
+        nearby = nearby[np.lexsort((nearby[:, 1], nearby[:, 0]))]
+        fingerprint = hashlib.sha1(nearby.tobytes()).hexdigest()
+        key = (z, x, y, fmt)
+
+        with self._lock:
+            cached = self._tiles.get(key)
+            if cached is not None and cached[1] == fingerprint:
+                self._tiles.move_to_end(key)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        content = self._render(nearby, z, x, y, fmt)
+        with self._lock:
+            self._tiles[key] = (content, fingerprint)
+            self._tiles.move_to_end(key)
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+        return content, fingerprint
+
+    @staticmethod
+    def _render(stations: np.ndarray, z: int, x: int, y: int, fmt: str) -> bytes:
+        lat, lng = tile_pixel_centres(z, x, y)
+        if len(stations):
+            values = AQIRaster.interpolate(stations, lat, lng)
+        else:
+            values = np.full((len(lat), len(lng)), np.nan)
+
+        if fmt == "png":
+            return encode_png(colorize(values))
+        rounded = np.where(np.isnan(values), None, np.round(values, 1)).tolist()
+        return json.dumps({"z": z, "x": x, "y": y, "size": TILE_SIZE, "aqi": rounded}).encode()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "tiles": len(self._tiles),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+aqi_tiles = AQITileCache()
@@ -0,0 +1,144 @@
+"""Incremental clustering for wards, schools and grid cells."""
+
+from __future__ import annotations
+
+import threading
+from app.core.config import settings
+from app.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+sklearn_cluster = lazy_import("sklearn.cluster")
+sklearn_preprocessing = lazy_import("sklearn.preprocessing")
+
+
+class IncrementalClusterer:
+    """Mini-batch k-means that can absorb new data without refitting from scratch.
+
+    Features are standardized with a running ``StandardScaler``. When new data
+    shifts the scaler statistics, the existing centroids are carried over into
+    the new scaled space so the model keeps warm-starting from them.
+
+    Rows passed with ``keys`` are remembered by key, so ``partial_fit`` only
+    feeds rows that are new or whose features changed; re-sending the full
+    table does not keep pulling the centroids towards the same points.
+    """
+
+    def __init__(self, n_clusters: int = None, batch_size: int = 1024, random_state: int = 42):
+        self.n_clusters = n_clusters or settings.ai_cluster_count
+        self.batch_size = batch_size
+        self.random_state = random_state
+        self.scaler = None
+        self.model = None
+        self._seen = {}  # key -> feature row last folded in
+        self._lock = threading.Lock()
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.model is not None
+
+    @property
+    def centroids(self) -> np.ndarray:
+        """Cluster centres in the original (unscaled) feature space."""
+        with self._lock:
+            if self.model is None:
+                return np.empty((0, 0))
+            return self.scaler.inverse_transform(self.model.cluster_centers_)
+
+    def _new_model(self, n_clusters: int, init) -> sklearn_cluster.MiniBatchKMeans:
+        return sklearn_cluster.MiniBatchKMeans(
+            n_clusters=n_clusters,
+            init=init,
+            n_init=1 if not isinstance(init, str) else 3,
+            batch_size=self.batch_size,
+            random_state=self.random_state,
+        )
+
+    def _require_rows(self, n_rows: int) -> None:
+        if n_rows < self.n_clusters:
+            raise ValueError(f"Need at least {self.n_clusters} rows to fit {self.n_clusters} clusters, got {n_rows}")
+
+    def _changed(self, X: np.ndarray, keys) -> np.ndarray:
+        """Mask of rows whose key is new or whose features differ from the last fold."""
+        if keys is None:
+            return np.ones(len(X), dtype=bool)
+        return np.array(
+            [key not in self._seen or not np.array_equal(self._seen[key], row) for key, row in zip(keys, X)],
+            dtype=bool,
+        )
+
+    def _remember(self, X: np.ndarray, keys) -> None:
+        if keys is not None:
+            self._seen.update((key, row.copy()) for key, row in zip(keys, X))
+
+    def fit(self, X: np.ndarray, keys=None) -> np.ndarray:
+        """Fit on ``X``, warm-starting from the previous centroids if any; returns labels."""
+        X = np.asarray(X, dtype=float)
+        self._require_rows(len(X))
+        with self._lock:
+            previous = None
+            if self.model is not None:
+                previous = self.scaler.inverse_transform(self.model.cluster_centers_)
+
+            self.scaler = sklearn_preprocessing.StandardScaler().fit(X)
+            X_scaled = self.scaler.transform(X)
+            init = self.scaler.transform(previous) if previous is not None else "k-means++"
+            self.model = self._new_model(self.n_clusters, init).fit(X_scaled)
+            self._seen = {}
+            self._remember(X, keys)
+            return self.model.labels_.copy()
+
+    def partial_fit(self, X: np.ndarray, keys=None) -> "IncrementalClusterer":
+        """Update the scaler and centroids with the new or changed rows of ``X``."""
+        X = np.asarray(X, dtype=float)
+        with self._lock:
+            X_new = X[self._changed(X, keys)]
+            if self.model is None:
+                self._require_rows(len(X_new))
+                self.scaler = sklearn_preprocessing.StandardScaler().partial_fit(X_new)
+                self.model = self._new_model(self.n_clusters, "k-means++")
+                self.model.partial_fit(self.scaler.transform(X_new))
+                self._remember(X, keys)
+                return self
+            if not len(X_new):
+                return self
+
+            centres = self.scaler.inverse_transform(self.model.cluster_centers_)
+            self.scaler.partial_fit(X_new)
+            self.model.cluster_centers_ = self.scaler.transform(centres)
+            self.model.partial_fit(self.scaler.transform(X_new))
+            self._remember(X, keys)
+            return self
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        """Assign rows to the nearest centroid with plain NumPy (no sklearn validation)."""
+        with self._lock:
+            if self.model is None:
+                raise ValueError("Clusterer has not been fitted")
+            mean, scale = self.scaler.mean_, self.scaler.scale_
+            centres = self.model.cluster_centers_
+
+        X_scaled = (np.atleast_2d(np.asarray(X, dtype=float)) - mean) / scale
+        distances = (
+            np.einsum("ij,ij->i", X_scaled, X_scaled)[:, None]
+            - 2 * X_scaled @ centres.T
+            + np.einsum("ij,ij->i", centres, centres)[None, :]
+        )
+        return distances.argmin(axis=1)
+
+    def predict_one(self, x) -> int:
+        """Cluster label of a single new entity."""
+        return int(self.predict(np.asarray(x, dtype=float)[None, :])[0])
+
+
+_ward_clusterers = {}
+_ward_clusterers_lock = threading.Lock()
+
+
+def ward_clusterer_for(n_clusters: int = None) -> IncrementalClusterer:
+    """The process-wide ward clusterer for ``n_clusters``; each k keeps its own model."""
+    n_clusters = n_clusters or settings.ai_cluster_count
+    with _ward_clusterers_lock:
+        clusterer = _ward_clusterers.get(n_clusters)
+        if clusterer is None:
+            clusterer = _ward_clusterers[n_clusters] = IncrementalClusterer(n_clusters=n_clusters)
+        return clusterer
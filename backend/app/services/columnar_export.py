@@ -0,0 +1,184 @@
+"""Columnar (Parquet / Arrow IPC) export of environmental and education tables."""
+
+from __future__ import annotations
+
+import importlib.util
+from datetime import datetime
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, and_
+
+from app.core.config import settings
+from app.core.lazy import lazy_import
+from app.models import AirQuality, WeatherData, EnergyData, School
+from app.services.lod_stream import stream_rows
+
+# pyarrow is optional: only the export paths need it
+pa = lazy_import("pyarrow")
+pq = lazy_import("pyarrow.parquet")
+
+# table -> (model, column used for start/end filters)
+TABLES = {
+    "air-quality": (AirQuality, "updated_at"),
+    "weather": (WeatherData, "updated_at"),
+    "energy": (EnergyData, "updated_at"),
+    "schools": (School, "created_at"),
+}
+
+FORMATS = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+}
+
+COMPRESSIONS = {
+    "parquet": {"zstd", "snappy", "gzip", "brotli", "lz4", "none"},
+    "arrow": {"zstd", "lz4", "none"},
+}
+
+
+class ColumnarExportUnavailable(RuntimeError):
+    """Raised when pyarrow is not installed."""
+
+
+def pyarrow_available() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def _arrow_type(column):
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, Date):
+        return pa.date32()
+    return pa.string()
+
+
+class _ChunkSink:
+    """Write-only file object that hands out what was written since the last drain."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+        self.closed = False
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def writable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return False
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class ColumnarExporter:
+    """Read a table in projected, time-filtered chunks and write Parquet or Arrow IPC.
+
+    Only one cursor batch is held in memory at a time; each batch becomes a
+    Parquet row group or an Arrow record batch.
+    """
+
+    def __init__(self, table: str, columns: list = None, start: datetime = None, end: datetime = None,
+                 fmt: str = "parquet", compression: str = None, batch_size: int = None):
+        if table not in TABLES:
+            raise ValueError(f"Unknown table: {table}")
+        if fmt not in FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        model, timestamp = TABLES[table]
+        available = {column.name: column for column in model.__table__.columns}
+        names = columns or list(available)
+        unknown = [name for name in names if name not in available]
+        if unknown:
+            raise ValueError(f"Unknown columns for {table}: {', '.join(unknown)}")
+
+        self.model = model
+        self.columns = [getattr(model, name) for name in names]
+        self.timestamp = getattr(model, timestamp)
+        self.start = start
+        self.end = end
+        self.fmt = fmt
+        default = settings.columnar_compression if fmt == "parquet" else settings.columnar_arrow_compression
+        self.compression = (compression or default).lower()
+        if self.compression not in COMPRESSIONS[fmt]:
+            raise ValueError(f"Unsupported {fmt} compression: {self.compression}")
+        self.batch_size = batch_size or settings.columnar_batch_size
+        self._names = names
+        self._types = [available[name] for name in names]
+
+    def schema(self):
+        return pa.schema([pa.field(name, _arrow_type(column)) for name, column in zip(self._names, self._types)])
+
+    def _where(self):
+        clauses = []
+        if self.start is not None:
+            clauses.append(self.timestamp >= self.start)
+        if self.end is not None:
+            clauses.append(self.timestamp < self.end)
+        return and_(*clauses) if clauses else None
+
+    def _batches(self, schema):
+        for rows in stream_rows(self.columns, self.model.id, self._where(), self.batch_size):
+            arrays = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def _open_writer(self, sink, schema):
+        if self.fmt == "parquet":
+            return pq.ParquetWriter(sink, schema, compression=self.compression)
+        # Uncompressed Arrow files can be memory-mapped and read zero-copy
+        options = pa.ipc.IpcWriteOptions(compression=None if self.compression == "none" else self.compression)
+        return pa.ipc.new_file(sink, schema, options=options)
+
+    def _check(self):
+        if not pyarrow_available():
+            raise ColumnarExportUnavailable("pyarrow is not installed")
+
+    def write(self, path: str) -> int:
+        """Write the export to ``path``; returns the number of rows written."""
+        self._check()
+        schema = self.schema()
+        rows = 0
+        writer = self._open_writer(path, schema)
+        try:
+            for batch in self._batches(schema):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        finally:
+            writer.close()
+        return rows
+
+    def iter_chunks(self):
+        """Yield the encoded file incrementally, one chunk per cursor batch."""
+        self._check()
+        schema = self.schema()
+        sink = _ChunkSink()
+        writer = self._open_writer(pa.PythonFile(sink, mode="w"), schema)
+        try:
+            for batch in self._batches(schema):
+                writer.write_batch(batch)
+                data = sink.drain()
+                if data:
+                    yield data
+        finally:
+            writer.close()
+        yield sink.drain()
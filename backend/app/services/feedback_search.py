@@ -0,0 +1,172 @@
+"""Accent-insensitive full-text search over citizen feedback."""
+
+import heapq
+import math
+import re
+import threading
+import unicodedata
+
+from sqlalchemy import text
+
+from app.models import CitizenFeedback
+from app.services.lod_stream import stream_rows
+
+_TOKEN_RE = re.compile(r"\w+")
+
+# Must match the expression of ix_citizen_feedback_fts (migration 0005) to use the index
+_POSTGRES_VECTOR = "to_tsvector('simple', f_unaccent(coalesce(ward_name, '') || ' ' || coalesce(message, '')))"
+_POSTGRES_WHERE = f"{_POSTGRES_VECTOR} @@ websearch_to_tsquery('simple', f_unaccent(:q))"
+_POSTGRES_WARD = "lower(f_unaccent(ward_name)) = lower(f_unaccent(:ward))"
+
+
+def fold_vietnamese(value: str) -> str:
+    """Lowercase and strip diacritics, including đ -> d (``Quận Hải Châu`` -> ``quan hai chau``)."""
+    decomposed = unicodedata.normalize("NFD", value.lower().replace("đ", "d"))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(value: str) -> list:
+    return _TOKEN_RE.findall(fold_vietnamese(value or ""))
+
+
+def search_index_available(engine) -> bool:
+    """True if the Postgres unaccent/GIN search index from migration 0005 is in place."""
+    if engine.dialect.name != "postgresql":
+        return False
+    try:
+        with engine.connect() as conn:
+            return bool(conn.execute(text(
+                "SELECT to_regclass('ix_citizen_feedback_fts') IS NOT NULL "
+                "AND to_regprocedure('f_unaccent(text)') IS NOT NULL"
+            )).scalar())
+    except Exception as e:
+        print(f"⚠️  Feedback search index check failed, falling back to in-process index: {e}")
+        return False
+
+
+class FeedbackInvertedIndex:
+    """In-process BM25 inverted index used when Postgres full-text search is unavailable.
+
+    Built from the table on first search, then topped up with rows whose id
+    is above the highest indexed id, so inserts made by other workers are
+    picked up without a rebuild. Feedback is never edited in place.
+    """
+
+    k1 = 1.2
+    b = 0.75
+
+    def __init__(self):
+        self._postings = {}
+        self._lengths = {}
+        self._wards = {}
+        self._total_length = 0
+        self.max_id = 0
+        self._lock = threading.Lock()
+
+    def add(self, feedback_id: int, ward_name: str, message: str) -> None:
+        tokens = tokenize(ward_name) + tokenize(message)
+        with self._lock:
+            if feedback_id in self._lengths:
+                return
+            for token in tokens:
+                postings = self._postings.setdefault(token, {})
+                postings[feedback_id] = postings.get(feedback_id, 0) + 1
+            self._lengths[feedback_id] = len(tokens)
+            self._wards[feedback_id] = fold_vietnamese(ward_name or "")
+            self._total_length += len(tokens)
+            self.max_id = max(self.max_id, feedback_id)
+
+    def refresh(self) -> None:
+        """Index rows added since the last refresh."""
+        columns = [CitizenFeedback.id, CitizenFeedback.ward_name, CitizenFeedback.message]
+        for rows in stream_rows(columns, CitizenFeedback.id, CitizenFeedback.id > self.max_id):
+            for row in rows:
+                self.add(*row)
+
+    def search(self, query: str, ward_name: str = None, skip: int = 0, limit: int = 20) -> tuple:
+        """Return ``(total, [(feedback_id, score), ...])`` ranked by BM25, AND semantics."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return 0, []
+        ward = fold_vietnamese(ward_name) if ward_name else None
+
+        with self._lock:
+            postings = [self._postings.get(term) for term in terms]
+            if not all(postings):
+                return 0, []
+            postings.sort(key=len)
+            candidates = set(postings[0])
+            for other in postings[1:]:
+                candidates.intersection_update(other)
+            if ward is not None:
+                candidates = {doc for doc in candidates if self._wards[doc] == ward}
+
+            n_docs = len(self._lengths)
+            avg_length = self._total_length / n_docs if n_docs else 1.0
+            # BM25 with the length normalisation folded into two constants
+            k1_plus_1 = self.k1 + 1
+            base = self.k1 * (1 - self.b)
+            per_token = self.k1 * self.b / avg_length
+            lengths = self._lengths
+            weighted = [
+                (math.log(1 + (n_docs - len(p) + 0.5) / (len(p) + 0.5)) * k1_plus_1, p) for p in postings
+            ]
+            scored = []
+            for doc in candidates:
+                norm = base + per_token * lengths[doc]
+                score = 0.0
+                for weight, p in weighted:
+                    tf = p[doc]
+                    score += weight * tf / (tf + norm)
+                scored.append((score, doc))
+
+        # Ties go to the higher (newer) id, like the Postgres created_at ordering
+        top = heapq.nlargest(skip + limit, scored)
+        return len(scored), [(doc, score) for score, doc in top[skip:]]
+
+
+feedback_index = FeedbackInvertedIndex()
+
+
+class FeedbackSearch:
+    """Search feedback with Postgres full-text search or the in-process index."""
+
+    _postgres_ready = None
+
+    @classmethod
+    def uses_postgres(cls, db) -> bool:
+        if cls._postgres_ready is None:
+            cls._postgres_ready = search_index_available(db.get_bind())
+        return cls._postgres_ready
+
+    @staticmethod
+    def _search_postgres(db, query: str, ward_name: str, skip: int, limit: int) -> tuple:
+        where = _POSTGRES_WHERE + (f" AND {_POSTGRES_WARD}" if ward_name else "")
+        params = {"q": query, "ward": ward_name, "skip": skip, "limit": limit}
+        total = db.execute(text(f"SELECT count(*) FROM citizen_feedback WHERE {where}"), params).scalar()
+        rows = db.execute(text(
+            f"SELECT id, ts_rank_cd({_POSTGRES_VECTOR}, websearch_to_tsquery('simple', f_unaccent(:q))) AS score "
+            f"FROM citizen_feedback WHERE {where} "
+            "ORDER BY score DESC, created_at DESC OFFSET :skip LIMIT :limit"
+        ), params).all()
+        return total, [(row.id, float(row.score)) for row in rows]
+
+    @classmethod
+    def search(cls, db, query: str, ward_name: str = None, skip: int = 0, limit: int = 20) -> dict:
+        """Ranked page of matching feedback rows with their scores."""
+        if cls.uses_postgres(db):
+            total, hits = cls._search_postgres(db, query, ward_name, skip, limit)
+        else:
+            feedback_index.refresh()
+            total, hits = feedback_index.search(query, ward_name, skip, limit)
+
+        rows = {}
+        if hits:
+            ids = [feedback_id for feedback_id, _ in hits]
+            rows = {row.id: row for row in db.query(CitizenFeedback).filter(CitizenFeedback.id.in_(ids))}
+        items = [
+            {"feedback": rows[feedback_id], "score": score}
+            for feedback_id, score in hits
+            if feedback_id in rows
+        ]
+        return {"total": total, "skip": skip, "limit": limit, "items": items}
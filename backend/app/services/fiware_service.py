@@ -4,6 +4,7 @@ import httpx
 import json
 from datetime import datetime
 from app.core.config import settings
+from app.core.metrics import track_upstream
 from app.core.constants import (
     ENTITY_TYPE_AIR_QUALITY,
     ENTITY_TYPE_WEATHER,
@@ -80,6 +81,7 @@ class FiwareService:
         return await FiwareService.publish_entity(entity)
     
     @staticmethod
+    @track_upstream("fiware")
     async def publish_entity(entity: dict):
         """Publish entity to Orion-LD."""
         async with httpx.AsyncClient() as client:
@@ -103,6 +105,7 @@ class FiwareService:
                 }
     
     @staticmethod
+    @track_upstream("fiware")
     async def get_entities(entity_type: str = None, ward_name: str = None):
         """Get NGSI-LD entities from Orion-LD."""
         async with httpx.AsyncClient() as client:
@@ -134,6 +137,7 @@ class FiwareService:
                 }
     
     @staticmethod
+    @track_upstream("fiware")
     async def delete_entity(entity_id: str):
         """Delete entity from Orion-LD."""
         async with httpx.AsyncClient() as client:
@@ -0,0 +1,298 @@
+"""Per-ward AQI forecasting with damped Holt exponential smoothing."""
+
+from __future__ import annotations
+
+import math
+from datetime import datetime, timedelta
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.lazy import lazy_import
+from app.db.upsert import dialect_insert
+from app.models import AirQuality, AQIForecast, ForecastState
+
+np = lazy_import("numpy")
+
+EPOCH = datetime(1970, 1, 1)
+
+# Smoothing parameter grid searched jointly for all wards
+ALPHA_GRID = (0.1, 0.2, 0.3, 0.5, 0.7, 0.9)
+BETA_GRID = (0.0, 0.05, 0.1, 0.2)
+
+# Weight of the newest squared error in the incrementally updated sigma
+SIGMA_DECAY = 0.05
+
+
+def to_bucket(ts: datetime, hours: int = None) -> int:
+    """Index of the ``hours``-wide bucket containing ``ts``."""
+    hours = hours or settings.forecast_bucket_hours
+    return int((ts - EPOCH).total_seconds() // (3600 * hours))
+
+
+def bucket_start(bucket: int, hours: int = None) -> datetime:
+    hours = hours or settings.forecast_bucket_hours
+    return EPOCH + timedelta(hours=bucket * hours)
+
+
+def _damped_sum(phi: float, steps: int) -> float:
+    """phi + phi^2 + ... + phi^steps."""
+    if steps <= 0:
+        return 0.0
+    if phi == 1.0:
+        return float(steps)
+    return phi * (1 - phi ** steps) / (1 - phi)
+
+
+class AQIForecaster:
+    """Fit, persist and incrementally refresh per-ward AQI forecasts.
+
+    Readings are averaged into hourly buckets. ``refit_all`` searches the
+    smoothing parameters for every ward at once on a wards x buckets matrix;
+    ``observe`` then folds each closed bucket into the stored state in O(1)
+    and rewrites only that ward's forecast rows. Requests read the stored
+    ``aqi_forecasts`` rows and never fit anything.
+    """
+
+    @staticmethod
+    def history_matrix(db: Session, days: int = None) -> tuple:
+        """Ward names, first bucket index and (wards x buckets) sum/count matrices."""
+        days = days or settings.forecast_history_days
+        since = datetime.utcnow() - timedelta(days=days)
+        rows = (
+            db.query(AirQuality.ward_name, AirQuality.updated_at, AirQuality.aqi)
+            .filter(
+                AirQuality.updated_at >= since,
+                AirQuality.aqi.isnot(None),
+                AirQuality.ward_name.isnot(None),
+                AirQuality.valid(),
+            )
+            .all()
+        )
+        if not rows:
+            return [], 0, np.zeros((0, 0)), np.zeros((0, 0))
+
+        names, times, values = zip(*rows)
+        ward_names, ward_idx = np.unique(np.array(names, dtype=str), return_inverse=True)
+        hours = settings.forecast_bucket_hours
+        buckets = np.array([to_bucket(t, hours) for t in times])
+        first = int(buckets.min())
+        shape = (len(ward_names), int(buckets.max()) - first + 1)
+
+        sums = np.zeros(shape)
+        counts = np.zeros(shape)
+        np.add.at(sums, (ward_idx, buckets - first), np.asarray(values, dtype=float))
+        np.add.at(counts, (ward_idx, buckets - first), 1)
+        return ward_names.tolist(), first, sums, counts
+
+    @staticmethod
+    def fit(Y: np.ndarray, stop: np.ndarray = None, phi: float = None) -> dict:
+        """Damped Holt fit for every ward (row of ``Y``, NaN = no data) at once.
+
+        All (alpha, beta) candidates are run side by side as a (wards x
+        candidates) state, so the only Python loop is over time buckets.
+        Ward ``w`` only consumes its first ``stop[w]`` buckets.
+        """
+        phi = settings.forecast_damping if phi is None else phi
+        alpha, beta = (a.ravel() for a in np.meshgrid(ALPHA_GRID, BETA_GRID, indexing="ij"))
+        n_wards, n_steps = Y.shape
+        shape = (n_wards, len(alpha))
+        stop = np.full(n_wards, n_steps) if stop is None else np.asarray(stop)
+
+        level = np.full(shape, np.nan)
+        trend = np.zeros(shape)
+        sse = np.zeros(shape)
+        n_errors = np.zeros(n_wards)
+
+        for t in range(n_steps):
+            live = (t < stop)[:, None]
+            y = Y[:, t][:, None]
+            observed = np.isfinite(y) & live
+            started = np.isfinite(level)
+            pred = level + phi * trend
+            scored = observed & started
+            err = np.where(scored, y - pred, 0.0)
+            sse += err ** 2
+            n_errors += scored[:, 0]
+
+            # Buckets without data still advance the damped trend
+            advance = started & live
+            level = np.where(observed & ~started, y, np.where(advance, pred + alpha * err, level))
+            trend = np.where(advance, phi * trend + alpha * beta * err, trend)
+
+        best = sse.argmin(axis=1)
+        rows = np.arange(n_wards)
+        return {
+            "level": level[rows, best],
+            "trend": trend[rows, best],
+            "alpha": alpha[best],
+            "beta": beta[best],
+            "sigma": np.sqrt(sse[rows, best] / np.maximum(n_errors - 2, 1)),
+            "n_obs": (np.isfinite(Y) & (np.arange(n_steps) < stop[:, None])).sum(axis=1),
+        }
+
+    @staticmethod
+    def forecast_rows(ward_name: str, state: dict, origin_bucket: int, generated_at: datetime) -> list:
+        """Forecast rows for buckets ``origin_bucket`` .. ``origin_bucket + horizon - 1``."""
+        hours = settings.forecast_bucket_hours
+        phi = settings.forecast_damping
+        level, trend = state["level"], state["trend"]
+        sigma, alpha = state["sigma"] or 0.0, state["alpha"]
+        rows = []
+        for h in range(1, settings.forecast_horizon_hours // hours + 1):
+            value = max(0.0, level + _damped_sum(phi, h) * trend)
+            spread = 1.96 * sigma * math.sqrt(1 + (h - 1) * alpha ** 2)
+            rows.append({
+                "ward_name": ward_name,
+                "target_time": bucket_start(origin_bucket + h - 1, hours),
+                "horizon_hours": h * hours,
+                "aqi": value,
+                "aqi_lower": max(0.0, value - spread),
+                "aqi_upper": value + spread,
+                "generated_at": generated_at,
+            })
+        return rows
+
+    @staticmethod
+    def refit_all(db: Session) -> dict:
+        """Refit every ward from stored history and replace all states and forecasts."""
+        ward_names, first, sums, counts = AQIForecaster.history_matrix(db)
+        if not ward_names:
+            return {"wards": 0, "forecasts": 0}
+
+        # The newest bucket of each ward stays open and is folded once it
+        # closes; the fit stops right before it so forecasts start there
+        open_idx = counts.shape[1] - 1 - np.argmax(counts[:, ::-1] > 0, axis=1)
+        rows = np.arange(len(ward_names))
+        open_sum, open_count = sums[rows, open_idx], counts[rows, open_idx]
+        sums[rows, open_idx] = 0
+        counts[rows, open_idx] = 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            Y = np.where(counts > 0, sums / counts, np.nan)
+
+        fitted = AQIForecaster.fit(Y, stop=open_idx)
+        now = datetime.utcnow()
+        states, forecasts = [], []
+        for w, ward_name in enumerate(ward_names):
+            # Wards with a single bucket start from its mean on the next fold
+            has_level = bool(np.isfinite(fitted["level"][w]))
+            open_bucket = first + int(open_idx[w])
+            state = {
+                "ward_name": ward_name,
+                "level": float(fitted["level"][w]) if has_level else None,
+                "trend": float(fitted["trend"][w]) if has_level else 0.0,
+                "alpha": float(fitted["alpha"][w]),
+                "beta": float(fitted["beta"][w]),
+                "sigma": float(fitted["sigma"][w]) if int(fitted["n_obs"][w]) > 1 else None,
+                "last_bucket": open_bucket,
+                "bucket_sum": float(open_sum[w]),
+                "bucket_count": int(open_count[w]),
+                "n_obs": int(fitted["n_obs"][w]),
+                "updated_at": now,
+            }
+            states.append(state)
+            if has_level:
+                forecasts.extend(AQIForecaster.forecast_rows(ward_name, state, open_bucket, now))
+
+        db.execute(delete(ForecastState))
+        db.execute(delete(AQIForecast))
+        db.execute(insert(ForecastState), states)
+        if forecasts:
+            db.execute(insert(AQIForecast), forecasts)
+        db.commit()
+        return {"wards": len(states), "forecasts": len(forecasts)}
+
+    @staticmethod
+    def _fold(state: ForecastState, y: float, empty_steps: int) -> None:
+        """One damped Holt step with observation ``y``, then ``empty_steps`` without data."""
+        phi = settings.forecast_damping
+        if state.level is None:
+            state.level, state.trend = y, 0.0
+        else:
+            pred = state.level + phi * state.trend
+            err = y - pred
+            state.level = pred + state.alpha * err
+            state.trend = phi * state.trend + state.alpha * state.beta * err
+            prior = err ** 2 if state.sigma is None else state.sigma ** 2
+            state.sigma = math.sqrt((1 - SIGMA_DECAY) * prior + SIGMA_DECAY * err ** 2)
+        if empty_steps > 0:
+            state.level += _damped_sum(phi, empty_steps) * state.trend
+            state.trend *= phi ** empty_steps
+        state.n_obs = (state.n_obs or 0) + 1
+
+    @staticmethod
+    def _lock_state(db: Session, ward_name: str, bucket: int) -> ForecastState:
+        """The ward's state row, created if missing and locked until commit.
+
+        The insert is a no-op on conflict, so wards receiving their first
+        readings concurrently still get one row. On SQLite it also takes the
+        write lock, which serializes the read-modify-write the same way
+        ``FOR UPDATE`` does on PostgreSQL.
+        """
+        db.execute(
+            dialect_insert(db)(ForecastState)
+            .values(
+                ward_name=ward_name, level=None, trend=0.0, alpha=0.5, beta=0.1, sigma=None,
+                last_bucket=bucket, bucket_sum=0.0, bucket_count=0, n_obs=0, updated_at=datetime.utcnow(),
+            )
+            .on_conflict_do_nothing(index_elements=["ward_name"])
+        )
+        return (
+            db.query(ForecastState)
+            .filter(ForecastState.ward_name == ward_name)
+            .with_for_update()
+            .populate_existing()
+            .one()
+        )
+
+    @staticmethod
+    def observe(db: Session, ward_name: str, aqi: float, observed_at: datetime = None) -> bool:
+        """Add one reading; refresh the ward's forecasts if it closed a bucket.
+
+        Returns True when the forecasts were rewritten. Readings older than the
+        open bucket are left for the next ``refit_all``.
+        """
+        if ward_name is None or aqi is None:
+            return False
+        bucket = to_bucket(observed_at or datetime.utcnow())
+        state = AQIForecaster._lock_state(db, ward_name, bucket)
+
+        refreshed = False
+        if bucket > state.last_bucket:
+            if state.bucket_count:
+                AQIForecaster._fold(state, state.bucket_sum / state.bucket_count, bucket - state.last_bucket - 1)
+                refreshed = True
+            state.last_bucket, state.bucket_sum, state.bucket_count = bucket, 0.0, 0
+        if bucket == state.last_bucket:
+            state.bucket_sum = (state.bucket_sum or 0.0) + float(aqi)
+            state.bucket_count = (state.bucket_count or 0) + 1
+
+        if refreshed:
+            values = {c: getattr(state, c) for c in ("level", "trend", "alpha", "sigma")}
+            db.execute(delete(AQIForecast).where(AQIForecast.ward_name == ward_name))
+            db.execute(insert(AQIForecast), AQIForecaster.forecast_rows(ward_name, values, bucket, datetime.utcnow()))
+        db.commit()
+        return refreshed
+
+    @staticmethod
+    def observe_reading(db: Session, ward_name: str, aqi: float, observed_at: datetime) -> None:
+        """``observe`` after a reading was committed; failures are logged, not raised.
+
+        Runs in the ingesting request's session, so an ingest holds a single
+        pooled connection instead of handing a second one to a background task.
+        """
+        try:
+            AQIForecaster.observe(db, ward_name, aqi, observed_at)
+        except Exception as e:
+            db.rollback()
+            print(f"⚠️  Forecast update failed for {ward_name}: {e}")
+
+    @staticmethod
+    def peak(db: Session, ward_name: str):
+        """Highest stored forecast AQI for a ward, or None."""
+        row = (
+            db.query(AQIForecast.aqi)
+            .filter(AQIForecast.ward_name == ward_name)
+            .order_by(AQIForecast.aqi.desc())
+            .first()
+        )
+        return row[0] if row else None
@@ -1,17 +1,34 @@
 """Linked Open Data (LOD) converter service."""
 
 import json
-from rdflib import Graph, Namespace, Literal, URIRef
 from datetime import datetime
+from app.core.lazy import lazy_import
+
+# rdflib is only needed for Graph-based serialization; load it on first use
+rdflib = lazy_import("rdflib")
+
+
+class _LazyNamespace:
+    """Class attribute that builds an ``rdflib.Namespace`` on first access."""
+
+    def __init__(self, uri: str):
+        self.uri = uri
+        self._namespace = None
+
+    def __get__(self, instance, owner):
+        if self._namespace is None:
+            self._namespace = rdflib.Namespace(self.uri)
+        return self._namespace
+
 
 class LODConverter:
     """Convert data to Linked Open Data formats (JSON-LD, RDF)."""
     
-    SOSA = Namespace("http://www.w3.org/ns/sosa/")
-    SSN = Namespace("http://www.w3.org/ns/ssn/")
-    NGSI = Namespace("https://uri.etsi.org/ngsi-ld/")
-    QUDT = Namespace("http://qudt.org/schema/qudt/")
-    WGS84 = Namespace("http://www.w3.org/2003/01/geo/wgs84_pos#")
+    SOSA = _LazyNamespace("http://www.w3.org/ns/sosa/")
+    SSN = _LazyNamespace("http://www.w3.org/ns/ssn/")
+    NGSI = _LazyNamespace("https://uri.etsi.org/ngsi-ld/")
+    QUDT = _LazyNamespace("http://qudt.org/schema/qudt/")
+    WGS84 = _LazyNamespace("http://www.w3.org/2003/01/geo/wgs84_pos#")
     
     @staticmethod
     def air_quality_to_json_ld(data: dict) -> dict:
@@ -43,7 +60,7 @@ class LODConverter:
     @staticmethod
     def to_rdf(data: dict, data_type: str = "AirQuality") -> str:
         """Convert data to RDF/Turtle format."""
-        g = Graph()
+        g = rdflib.Graph()
         
         # Define namespaces
         g.bind("sosa", LODConverter.SOSA)
@@ -53,19 +70,19 @@ class LODConverter:
         g.bind("wgs84", LODConverter.WGS84)
         
         # Create resource URI
-        resource_uri = URIRef(f"http://example.org/{data_type}/{data.get('id', 'default')}")
+        resource_uri = rdflib.URIRef(f"http://example.org/{data_type}/{data.get('id', 'default')}")
         
         # Add observation triples
-        g.add((resource_uri, LODConverter.SOSA.observedProperty, Literal(data.get("ward_name"))))
+        g.add((resource_uri, LODConverter.SOSA.observedProperty, rdflib.Literal(data.get("ward_name"))))
         
         if data_type == "AirQuality":
-            g.add((resource_uri, URIRef("http://example.org/aqi"), Literal(data.get("aqi"))))
-            g.add((resource_uri, URIRef("http://example.org/pm25"), Literal(data.get("pm25"))))
+            g.add((resource_uri, rdflib.URIRef("http://example.org/aqi"), rdflib.Literal(data.get("aqi"))))
+            g.add((resource_uri, rdflib.URIRef("http://example.org/pm25"), rdflib.Literal(data.get("pm25"))))
         
         # Add location
         if "latitude" in data and "longitude" in data:
-            g.add((resource_uri, LODConverter.WGS84.lat, Literal(data["latitude"])))
-            g.add((resource_uri, LODConverter.WGS84.long, Literal(data["longitude"])))
+            g.add((resource_uri, LODConverter.WGS84.lat, rdflib.Literal(data["latitude"])))
+            g.add((resource_uri, LODConverter.WGS84.long, rdflib.Literal(data["longitude"])))
         
         return g.serialize(format="turtle")
     
@@ -90,21 +107,21 @@ class LODConverter:
     @staticmethod
     def to_rdf_xml(data: dict) -> str:
         """Convert data to RDF/XML format."""
-        g = Graph()
+        g = rdflib.Graph()
         
         # Define namespaces
         g.bind("sosa", LODConverter.SOSA)
         g.bind("wgs84", LODConverter.WGS84)
         
         # Create resource URI
-        resource_uri = URIRef(f"http://example.org/data/{data.get('id', 'default')}")
-        g.add((resource_uri, URIRef("http://www.w3.org/1999/02/22-rdf-syntax-ns#type"), LODConverter.SOSA.Observation))
+        resource_uri = rdflib.URIRef(f"http://example.org/data/{data.get('id', 'default')}")
+        g.add((resource_uri, rdflib.URIRef("http://www.w3.org/1999/02/22-rdf-syntax-ns#type"), LODConverter.SOSA.Observation))
         
         # Add properties
         for key, value in data.items():
             if isinstance(value, (int, float)):
-                g.add((resource_uri, URIRef(f"http://example.org/{key}"), Literal(value)))
+                g.add((resource_uri, rdflib.URIRef(f"http://example.org/{key}"), rdflib.Literal(value)))
             else:
-                g.add((resource_uri, URIRef(f"http://example.org/{key}"), Literal(str(value))))
+                g.add((resource_uri, rdflib.URIRef(f"http://example.org/{key}"), rdflib.Literal(str(value))))
         
         return g.serialize(format="xml")
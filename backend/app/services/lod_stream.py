@@ -0,0 +1,324 @@
+"""Streaming Linked Open Data export (N-Triples / Turtle / NDJSON JSON-LD).
+
+Unlike ``LODConverter.to_rdf`` this never builds an ``rdflib.Graph``: rows are
+read from a server-side cursor and formatted with precomputed IRI and literal
+templates, so memory stays flat regardless of table size.
+"""
+
+import json
+import math
+import zlib
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import and_, func, or_, select
+
+from app.core.config import settings
+from app.db import SessionLocal
+from app.models import AirQuality, School, EnergyData
+
+RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+XSD = "http://www.w3.org/2001/XMLSchema#"
+
+PREFIXES = {
+    "sosa": "http://www.w3.org/ns/sosa/",
+    "wgs84": "http://www.w3.org/2003/01/geo/wgs84_pos#",
+    "schema": "http://schema.org/",
+    "xsd": XSD,
+}
+
+MEDIA_TYPES = {
+    "nt": "application/n-triples",
+    "ttl": "text/turtle",
+    "ndjson": "application/x-ndjson",
+}
+
+# N-Triples/Turtle string escapes (ECHAR plus \u escapes for other controls)
+_ESCAPES = {i: f"\\u{i:04X}" for i in range(0x20)}
+_ESCAPES.update({
+    ord("\\"): "\\\\",
+    ord('"'): '\\"',
+    ord("\n"): "\\n",
+    ord("\r"): "\\r",
+    ord("\t"): "\\t",
+    ord("\b"): "\\b",
+    ord("\f"): "\\f",
+})
+
+
+def escape_literal(value: str) -> str:
+    """Escape a lexical form for use inside a double-quoted RDF literal."""
+    return value.translate(_ESCAPES)
+
+
+def _format_double(value) -> str:
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "INF" if value > 0 else "-INF"
+    return repr(float(value))
+
+
+# column kind -> (lexical formatter, xsd datatype or None for plain strings)
+_LITERALS = {
+    "string": (lambda v: escape_literal(str(v)), None),
+    "double": (_format_double, "double"),
+    "integer": (lambda v: str(int(v)), "integer"),
+    "datetime": (lambda v: v.isoformat() if isinstance(v, (datetime, date)) else escape_literal(str(v)), "dateTime"),
+}
+
+
+class LODDataset:
+    """Export description of one table: class, predicates and literal kinds."""
+
+    def __init__(self, name: str, model, rdf_class: str, timestamp: str, fields: list):
+        self.name = name
+        self.model = model
+        self.rdf_class = rdf_class
+        # Column used for ``since`` filters and incremental sync watermarks
+        self.timestamp = getattr(model, timestamp)
+        # (column name, predicate prefix, predicate local name, literal kind)
+        self.fields = fields
+
+    @property
+    def columns(self) -> list:
+        return [self.model.id] + [getattr(self.model, column) for column, _, _, _ in self.fields]
+
+    def subject_base(self) -> str:
+        return f"{settings.lod_base_uri.rstrip('/')}/{self.name}/"
+
+
+DATASETS = {
+    "air-quality": LODDataset("AirQuality", AirQuality, "sosa:Observation", "updated_at", [
+        ("ward_name", "sosa", "observedProperty", "string"),
+        ("aqi", "ex", "aqi", "double"),
+        ("pm25", "ex", "pm25", "double"),
+        ("pm10", "ex", "pm10", "double"),
+        ("no2", "ex", "no2", "double"),
+        ("so2", "ex", "so2", "double"),
+        ("co", "ex", "co", "double"),
+        ("lat", "wgs84", "lat", "double"),
+        ("lng", "wgs84", "long", "double"),
+        ("updated_at", "sosa", "resultTime", "datetime"),
+    ]),
+    "schools": LODDataset("School", School, "schema:School", "created_at", [
+        ("school_name", "schema", "name", "string"),
+        ("ward_name", "ex", "ward_name", "string"),
+        ("green_programs_count", "ex", "green_programs_count", "integer"),
+        ("avg_score", "ex", "avg_score", "double"),
+        ("energy_saving_kw", "ex", "energy_saving_kw", "double"),
+        ("lat", "wgs84", "lat", "double"),
+        ("lng", "wgs84", "long", "double"),
+        ("created_at", "schema", "dateCreated", "datetime"),
+    ]),
+    "energy": LODDataset("EnergyData", EnergyData, "sosa:Observation", "updated_at", [
+        ("ward_name", "sosa", "observedProperty", "string"),
+        ("solar_potential_kw", "ex", "solar_potential_kw", "double"),
+        ("current_usage_kw", "ex", "current_usage_kw", "double"),
+        ("lat", "wgs84", "lat", "double"),
+        ("lng", "wgs84", "long", "double"),
+        ("updated_at", "sosa", "resultTime", "datetime"),
+    ]),
+}
+
+
+def namespace_prefixes() -> dict:
+    return {**PREFIXES, "ex": settings.lod_base_uri}
+
+
+def _expand(curie: str) -> str:
+    prefix, local = curie.split(":", 1)
+    return namespace_prefixes()[prefix] + local
+
+
+def jsonld_context() -> dict:
+    """Shared JSON-LD context covering every exported dataset."""
+    prefixes = namespace_prefixes()
+    context = dict(prefixes)
+    for dataset in DATASETS.values():
+        for _, prefix, local, kind in dataset.fields:
+            datatype = _LITERALS[kind][1]
+            term = {"@id": f"{prefix}:{local}"}
+            if datatype:
+                term["@type"] = f"xsd:{datatype}"
+            context[local] = term
+    return {"@context": context}
+
+
+def settled_watermark(latest: datetime):
+    """Cap ``latest`` so that every row stamped at or below it has committed.
+
+    Timestamps are assigned before commit, so a row stamped just below the
+    newest timestamp may still be in flight when it is read. The watermark
+    therefore trails now by ``lod_commit_lag_seconds``, and newer rows are
+    left for the next pull.
+    """
+    if latest is None:
+        return None
+    return min(latest, datetime.utcnow() - timedelta(seconds=settings.lod_commit_lag_seconds))
+
+
+def watermark(dataset: LODDataset):
+    """Upper bound of a pull, handed to clients as their next ``since``."""
+    db = SessionLocal()
+    try:
+        latest = db.query(func.max(dataset.timestamp)).scalar()
+    finally:
+        db.close()
+    return settled_watermark(latest)
+
+
+def time_window(dataset: LODDataset, since: datetime = None, until: datetime = None):
+    """Filter for ``since <= timestamp <= until``, or None for everything.
+
+    Both ends are inclusive: rows sharing the boundary timestamp are sent
+    again on the next pull, and consumers merge them by subject IRI.
+    Rows without a timestamp are only part of full exports.
+    """
+    clauses = []
+    if since is not None:
+        clauses.append(dataset.timestamp >= since)
+    if until is not None:
+        upper = dataset.timestamp <= until
+        clauses.append(upper if since is not None else or_(upper, dataset.timestamp.is_(None)))
+    return and_(*clauses) if clauses else None
+
+
+def accepts_gzip(accept_encoding: str) -> bool:
+    """Whether an Accept-Encoding header allows gzip; ``q=0`` refuses a coding."""
+    qualities = {}
+    for part in accept_encoding.split(","):
+        coding, *params = (item.strip() for item in part.split(";"))
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    for coding in ("gzip", "x-gzip", "*"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return False
+
+
+def gzip_chunks(chunks, level: int = 6):
+    """Gzip an iterable of byte chunks on the fly."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_rows(columns: list, order_by, where=None, batch_size: int = None):
+    """Yield lists of row tuples from a server-side cursor in its own session.
+
+    The session is opened here rather than taken from ``get_db`` because a
+    streaming response outlives the request-scoped dependency.
+    """
+    batch_size = batch_size or settings.lod_stream_batch_size
+    stmt = select(*columns).order_by(order_by)
+    if where is not None:
+        stmt = stmt.where(where)
+    db = SessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+        for partition in result.partitions():
+            yield partition
+    finally:
+        db.close()
+
+
+class LODStreamExporter:
+    """Render a dataset as N-Triples, Turtle or NDJSON JSON-LD, one chunk per cursor batch."""
+
+    def __init__(self, dataset: LODDataset, fmt: str = "nt", since: datetime = None, context_url: str = None,
+                 until: datetime = None):
+        if fmt not in MEDIA_TYPES:
+            raise ValueError(f"Unsupported format: {fmt}")
+        self.dataset = dataset
+        self.fmt = fmt
+        self.since = since
+        self.until = until
+        self.context_url = context_url
+        self._templates = self._build_templates()
+
+    def _build_templates(self) -> list:
+        """Per-field (predicate, formatter, literal suffix), or (term, kind) for NDJSON."""
+        templates = []
+        for _, prefix, local, kind in self.dataset.fields:
+            formatter, datatype = _LITERALS[kind]
+            if self.fmt == "ndjson":
+                templates.append((local, kind))
+                continue
+            if self.fmt == "nt":
+                predicate = f"<{_expand(f'{prefix}:{local}')}>"
+                suffix = f'"^^<{XSD}{datatype}>' if datatype else '"'
+            else:
+                predicate = f"{prefix}:{local}"
+                suffix = f'"^^xsd:{datatype}' if datatype else '"'
+            templates.append((predicate, formatter, suffix))
+        return templates
+
+    def header(self) -> str:
+        if self.fmt != "ttl":
+            return ""
+        lines = [f"@prefix {name}: <{uri}> ." for name, uri in namespace_prefixes().items()]
+        lines.append(f"@prefix d: <{self.dataset.subject_base()}> .")
+        return "\n".join(lines) + "\n\n"
+
+    def render_rows(self, rows) -> str:
+        """Format a batch of ``(id, *fields)`` tuples."""
+        templates = self._templates
+        out = []
+        append = out.append
+        if self.fmt == "ndjson":
+            base = self.dataset.subject_base()
+            context = self.context_url
+            rdf_class = self.dataset.rdf_class
+            dumps = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+            for row in rows:
+                entity = {"@context": context, "@id": f"{base}{row[0]}", "@type": rdf_class}
+                for (term, kind), value in zip(templates, row[1:]):
+                    if value is None:
+                        continue
+                    if kind == "double":
+                        if math.isnan(value) or math.isinf(value):
+                            continue
+                    elif kind == "datetime" and isinstance(value, (datetime, date)):
+                        value = value.isoformat()
+                    entity[term] = value
+                append(dumps(entity))
+                append("\n")
+        elif self.fmt == "nt":
+            base = self.dataset.subject_base()
+            type_line = f" <{RDF_TYPE}> <{_expand(self.dataset.rdf_class)}> .\n"
+            for row in rows:
+                subject = f"<{base}{row[0]}>"
+                append(subject + type_line)
+                for (predicate, formatter, suffix), value in zip(templates, row[1:]):
+                    if value is not None:
+                        append(f'{subject} {predicate} "{formatter(value)}{suffix} .\n')
+        else:
+            type_line = f" a {self.dataset.rdf_class}"
+            for row in rows:
+                append(f"d:{row[0]}{type_line}")
+                for (predicate, formatter, suffix), value in zip(templates, row[1:]):
+                    if value is not None:
+                        append(f' ;\n    {predicate} "{formatter(value)}{suffix}')
+                append(" .\n\n")
+        return "".join(out)
+
+    def iter_chunks(self, batch_size: int = None):
+        """Yield encoded chunks: the header, then one chunk per cursor batch."""
+        header = self.header()
+        if header:
+            yield header.encode("utf-8")
+        where = time_window(self.dataset, self.since, self.until)
+        for rows in stream_rows(self.dataset.columns, self.dataset.model.id, where, batch_size):
+            yield self.render_rows(rows).encode("utf-8")
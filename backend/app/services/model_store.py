@@ -0,0 +1,145 @@
+"""On-disk cache of fitted clustering models keyed by input fingerprint."""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from app.core.config import settings
+from app.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+sklearn = lazy_import("sklearn")
+
+# Bump when the cached entry layout or the fitting procedure changes
+MODEL_STORE_VERSION = "1"
+
+
+class ModelStore:
+    """Size-bounded store of fitted scaler/KMeans results.
+
+    Entries live in a small in-process LRU and as pickle files in a shared
+    directory, so they survive restarts and are visible to every uvicorn
+    worker. Files are written atomically and the least recently used ones
+    (by mtime) are evicted once ``max_entries`` is exceeded.
+    """
+
+    def __init__(self, directory: str = None, max_entries: int = None, memory_entries: int = None):
+        self.directory = directory or settings.ai_model_store_dir
+        self.max_entries = max_entries or settings.ai_model_store_max_entries
+        self.memory_entries = memory_entries or settings.ai_model_store_memory_entries
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.fit_seconds_saved = 0.0
+
+    @staticmethod
+    def fingerprint(features: np.ndarray, n_clusters: int, kind: str = "kmeans") -> str:
+        """Stable digest of the feature matrix, cluster count, model kind and scikit-learn version.
+
+        Pickled estimators are only loadable by the scikit-learn release
+        that wrote them, so an upgrade starts from fresh keys.
+        """
+        features = np.ascontiguousarray(features, dtype=np.float64)
+        digest = hashlib.sha256()
+        digest.update(f"{MODEL_STORE_VERSION}:{sklearn.__version__}:{kind}:{n_clusters}:{features.shape}".encode())
+        digest.update(features.tobytes())
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pkl")
+
+    def _remember(self, key: str, entry: dict) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, key: str):
+        """Return the cached entry for ``key`` or None, updating hit statistics."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+
+        if entry is None:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    entry = pickle.load(f)
+                os.utime(path)
+            except OSError:
+                entry = None
+            except (pickle.UnpicklingError, EOFError, AttributeError, ImportError, ValueError) as e:
+                # Truncated file, or pickled by code/library versions that are gone
+                print(f"⚠️  Discarding unreadable model store entry {key}: {e}")
+                entry = None
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self._remember(key, entry)
+            self.hits += 1
+            self.fit_seconds_saved += entry.get("fit_seconds", 0.0)
+        return entry
+
+    def put(self, key: str, entry: dict) -> None:
+        """Store a fitted entry in memory and on disk, then evict old files."""
+        with self._lock:
+            self._remember(key, entry)
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self._path(key)}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self._path(key))
+            self._evict()
+        except OSError as e:
+            print(f"⚠️  Model store write failed: {e}")
+
+    def _evict(self) -> None:
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pkl"):
+                path = os.path.join(self.directory, name)
+                try:
+                    files.append((os.path.getmtime(path), path))
+                except OSError:
+                    continue
+        for _, path in sorted(files)[: max(0, len(files) - self.max_entries)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith(".pkl"):
+                    os.remove(os.path.join(self.directory, name))
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "fit_seconds_saved": round(self.fit_seconds_saved, 6),
+                "memory_entries": len(self._memory),
+                "max_entries": self.max_entries,
+            }
+
+
+model_store = ModelStore()
@@ -4,11 +4,13 @@ import httpx
 import asyncio
 from datetime import datetime, timedelta
 from app.core.config import settings
+from app.core.metrics import track_upstream
 
 class OpenDataService:
     """Service for fetching open data from external sources."""
     
     @staticmethod
+    @track_upstream("openaq")
     async def fetch_openaq_data(city: str = "Hanoi") -> dict:
         """Fetch air quality data from OpenAQ API."""
         try:
@@ -45,6 +47,7 @@ class OpenDataService:
             }
     
     @staticmethod
+    @track_upstream("openweather")
     async def fetch_openweather_data(city: str = "Hanoi") -> dict:
         """Fetch weather data from OpenWeather API."""
         try:
@@ -88,6 +91,7 @@ class OpenDataService:
             }
     
     @staticmethod
+    @track_upstream("osm")
     async def fetch_osm_schools(bbox: tuple = None) -> dict:
         """Fetch schools from OpenStreetMap Overpass API."""
         try:
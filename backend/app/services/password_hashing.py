@@ -0,0 +1,141 @@
+"""Bounded process-pool bcrypt hashing for signup and login."""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+
+import bcrypt
+
+from app.core.config import settings
+from app.core.process_pool import ProcessPool
+
+# bcrypt only uses the first 72 bytes of a password; newer releases raise instead
+BCRYPT_MAX_BYTES = 72
+BCRYPT_PREFIX = "$2b$"
+
+
+class HashingBusy(Exception):
+    """Raised when too many hash/verify calls are already queued."""
+
+
+def _encode(password: str) -> bytes:
+    return password.encode("utf-8")[:BCRYPT_MAX_BYTES]
+
+
+def _hash(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(_encode(password), bcrypt.gensalt(rounds=rounds)).decode()
+
+
+def _verify(password: str, hashed: str) -> bool:
+    try:
+        return bcrypt.checkpw(_encode(password), hashed.encode())
+    except ValueError:
+        # Not a bcrypt hash (e.g. empty or legacy value)
+        return False
+
+
+def hash_rounds(hashed: str):
+    """Cost factor encoded in a ``$2x$NN$...`` bcrypt hash, or None."""
+    parts = hashed.split("$") if hashed else []
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+class PasswordHasher:
+    """Run bcrypt in a small process pool with a bound on queued work.
+
+    bcrypt costs ~100+ ms of CPU per call at the default cost. Running it in
+    worker processes keeps API threads and the event loop free, and the
+    ``max_pending`` bound turns overload into a fast ``HashingBusy`` instead of
+    an ever-growing queue. With ``workers=0`` hashing runs in the caller.
+    The pool is replaced if a crashed worker breaks it.
+    """
+
+    def __init__(self, workers: int = None, max_pending: int = None, rounds: int = None):
+        self.workers = settings.password_hash_workers if workers is None else workers
+        self.max_pending = max_pending or settings.password_hash_max_pending
+        self.rounds = rounds or settings.bcrypt_rounds
+        self._pool = ProcessPool(self.workers)
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._dummy_hash = None
+
+    def _release(self, _future=None) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def _submit(self, fn, *args) -> Future:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HashingBusy(f"{self.max_pending} password hashes already pending")
+            self._pending += 1
+
+        if not self.workers:
+            future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+            self._release()
+            return future
+
+        try:
+            future = self._pool.submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True if ``hashed`` was made with another scheme or cost than configured."""
+        return not hashed or not hashed.startswith(BCRYPT_PREFIX) or hash_rounds(hashed) != self.rounds
+
+    def hash_blocking(self, password: str) -> str:
+        """Hash and wait for the result.
+
+        Blocks the calling thread for the whole bcrypt run plus any queueing;
+        only for scripts and sync code. Never call it on the event loop.
+        """
+        return self._submit(_hash, password, self.rounds).result()
+
+    def verify_blocking(self, password: str, hashed: str) -> bool:
+        """Verify and wait for the result; blocks like ``hash_blocking``."""
+        return self._submit(_verify, password, hashed).result()
+
+    async def hash(self, password: str) -> str:
+        return await asyncio.wrap_future(self._submit(_hash, password, self.rounds))
+
+    async def verify(self, password: str, hashed: str) -> tuple:
+        """Check ``password``; returns ``(ok, new_hash)``.
+
+        ``new_hash`` is set when the password matched but the stored hash
+        uses outdated parameters, so callers can transparently upgrade it.
+        """
+        ok = await asyncio.wrap_future(self._submit(_verify, password, hashed))
+        if ok and self.needs_rehash(hashed):
+            return True, await self.hash(password)
+        return ok, None
+
+    async def verify_dummy(self, password: str) -> bool:
+        """Spend the same work as a real verify, for unknown accounts."""
+        if self._dummy_hash is None:
+            self._dummy_hash = await self.hash("dummy-password")
+        await asyncio.wrap_future(self._submit(_verify, password, self._dummy_hash))
+        return False
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "rounds": self.rounds,
+            "pending": self._pending,
+            "max_pending": self.max_pending,
+            "pool_restarts": self._pool.restarts,
+        }
+
+    def shutdown(self) -> None:
+        self._pool.shutdown()
+
+
+password_hasher = PasswordHasher()
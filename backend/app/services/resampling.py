@@ -0,0 +1,102 @@
+"""Vectorized bootstrap and permutation significance for correlations."""
+
+from __future__ import annotations
+
+import warnings
+
+from app.core.config import settings
+from app.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# Upper bound on resampled values held at once (groups x iterations x n)
+MAX_RESAMPLE_CELLS = 8_000_000
+
+
+def pearson_rows(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Pearson r along the last axis; constant rows give NaN."""
+    xc = x - x.mean(axis=-1, keepdims=True)
+    yc = y - y.mean(axis=-1, keepdims=True)
+    denom = np.sqrt((xc * xc).sum(axis=-1) * (yc * yc).sum(axis=-1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(denom > 0, (xc * yc).sum(axis=-1) / denom, np.nan)
+
+
+class ResamplingEngine:
+    """Bootstrap CIs and permutation p-values for many (x, y) samples at once.
+
+    Samples of equal size are stacked into a (groups, n) matrix and share
+    one (iterations, n) index matrix per resampling scheme, so the only
+    Python-level loops are over distinct sample sizes and memory chunks,
+    never over iterations.
+    """
+
+    def __init__(self, n_iterations: int = None, seed: int = None, confidence: float = None):
+        self.n_iterations = n_iterations or settings.resampling_iterations
+        self.seed = settings.resampling_seed if seed is None else seed
+        self.confidence = confidence or settings.resampling_confidence
+
+    def _chunks(self, groups: int, n: int):
+        per_chunk = max(1, MAX_RESAMPLE_CELLS // max(1, groups * n))
+        for start in range(0, self.n_iterations, per_chunk):
+            yield min(per_chunk, self.n_iterations - start)
+
+    def _bootstrap(self, rng, X: np.ndarray, Y: np.ndarray) -> np.ndarray:
+        """(groups, iterations) bootstrap distribution of r."""
+        n = X.shape[1]
+        draws = []
+        for size in self._chunks(len(X), n):
+            idx = rng.integers(0, n, size=(size, n))
+            draws.append(pearson_rows(X[:, idx], Y[:, idx]))
+        return np.concatenate(draws, axis=1)
+
+    def _permutation_exceed(self, rng, X: np.ndarray, Y: np.ndarray, observed: np.ndarray) -> np.ndarray:
+        """Per group, how many permuted |r| reach the observed |r|."""
+        n = X.shape[1]
+        exceed = np.zeros(len(X))
+        for size in self._chunks(len(X), n):
+            # argsort of uniform noise gives one independent permutation per row
+            perm = rng.random((size, n)).argsort(axis=1)
+            r_perm = pearson_rows(X[:, None, :], Y[:, perm])
+            exceed += (np.abs(r_perm) >= np.abs(observed)[:, None] - 1e-12).sum(axis=1)
+        return exceed
+
+    def analyze(self, samples: dict) -> dict:
+        """Significance for each ``key -> (x, y)`` sample; non-finite pairs are dropped."""
+        rng = np.random.default_rng(self.seed)
+        tail = (1 - self.confidence) / 2 * 100
+        results = {}
+
+        by_size = {}
+        for key, (x, y) in samples.items():
+            x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+            mask = np.isfinite(x) & np.isfinite(y)
+            by_size.setdefault(int(mask.sum()), []).append((key, x[mask], y[mask]))
+
+        for n, group in sorted(by_size.items()):
+            keys = [key for key, _, _ in group]
+            if n < 4:
+                for key in keys:
+                    results[key] = {"n": n, "r": None, "ci_low": None, "ci_high": None, "p_permutation": None}
+                continue
+
+            X = np.stack([x for _, x, _ in group])
+            Y = np.stack([y for _, _, y in group])
+            observed = pearson_rows(X, Y)
+            boot = self._bootstrap(rng, X, Y)
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                low, high = np.nanpercentile(boot, [tail, 100 - tail], axis=1)
+            p_values = (self._permutation_exceed(rng, X, Y, observed) + 1) / (self.n_iterations + 1)
+
+            for g, key in enumerate(keys):
+                valid = np.isfinite(observed[g])
+                results[key] = {
+                    "n": n,
+                    "r": float(observed[g]) if valid else None,
+                    "ci_low": float(low[g]) if valid and np.isfinite(low[g]) else None,
+                    "ci_high": float(high[g]) if valid and np.isfinite(high[g]) else None,
+                    "p_permutation": float(p_values[g]) if valid else None,
+                }
+
+        return results
@@ -0,0 +1,510 @@
+"""Persistent, incrementally synced triple store behind the SPARQL endpoint."""
+
+from __future__ import annotations
+
+import fcntl
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime
+
+from app.core.config import settings
+from app.core.lazy import lazy_import
+from app.services.lod_stream import (
+    DATASETS,
+    LODStreamExporter,
+    namespace_prefixes,
+    stream_rows,
+    time_window,
+    watermark,
+)
+
+rdflib = lazy_import("rdflib")
+sparql_processor = lazy_import("rdflib.plugins.sparql.processor")
+sparql_algebra = lazy_import("rdflib.plugins.sparql.algebra")
+
+SNAPSHOT_FILE = "snapshot.nt"
+SEGMENT_SUFFIX = ".segment.nt"
+JOURNAL_LOCK = "journal.lock"
+LEADER_LOCK = "leader.lock"
+_WATERMARK_TAG = "# watermark "
+_BASE_TAG = "# base "
+
+RESULT_MEDIA_TYPES = {
+    "SELECT": "application/sparql-results+json",
+    "ASK": "application/sparql-results+json",
+    "CONSTRUCT": "text/turtle",
+    "DESCRIBE": "text/turtle",
+}
+
+
+class SPARQLQueryError(ValueError):
+    """Raised for queries the store cannot parse, evaluate or will not run."""
+
+
+def prepare_query(text: str):
+    """Parse a query, rejecting anything that would make rdflib fetch remote data.
+
+    ``SERVICE <url>`` makes rdflib call the URL from the server, which turns
+    the public endpoint into a proxy; ``FROM`` / ``FROM NAMED`` name graphs
+    this single-graph store does not have.
+    """
+    try:
+        prepared = sparql_processor.prepareQuery(text, initNs=namespace_prefixes())
+    except Exception as e:
+        raise SPARQLQueryError(str(e)) from e
+    if prepared.algebra.get("datasetClause"):
+        raise SPARQLQueryError("FROM / FROM NAMED are not supported")
+
+    services = []
+
+    def visit(node):
+        if getattr(node, "name", None) == "ServiceGraphPattern":
+            services.append(node)
+
+    sparql_algebra.traverse(prepared.algebra, visitPre=visit)
+    if services:
+        raise SPARQLQueryError("SERVICE (federated queries) is not supported")
+    return prepared
+
+
+class _ReadWriteLock:
+    """Any number of readers or one writer; a waiting writer holds back new readers."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writing or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
+
+def _segment_seq(name: str) -> int:
+    return int(name.split("-", 1)[0])
+
+
+class LODTripleStore:
+    """rdflib graph over the LOD datasets, kept in sync from the database.
+
+    The data lives in a journal directory: an N-Triples snapshot plus
+    append-only segments, one per dataset per sync. Every file records the
+    dataset watermarks it covers; the snapshot also records the sequence
+    number of the last segment folded into it (``# base``).
+
+    Writing the journal (``sync``, ``rebuild``, compaction) streams rows from
+    the database straight to disk, never builds a graph, and is serialized
+    across processes by an ``flock`` on ``journal.lock``. Only the worker
+    holding ``leader.lock`` syncs periodically (``start``); the others keep
+    trying for the lock, so one takes over if the leader exits.
+
+    Each process loads the graph on its first query and from then on parses
+    only segments it has not seen, merging them into the live graph under
+    a write lock that queries take for reading. Readers never lock the
+    journal: they re-check the snapshot's ``# base`` after reading, and
+    start over if a compaction ran meanwhile. The whole graph is only
+    re-read on first use, after ``rebuild``, or when a compaction folded
+    segments this process never applied.
+
+    Rows deleted from the database are only dropped by ``rebuild``.
+    """
+
+    def __init__(self, directory: str = None, sync_interval: float = None, cache_size: int = None,
+                 compact_segments: int = None, refresh_interval: float = None):
+        self.directory = directory or settings.sparql_store_dir
+        self.sync_interval = settings.sparql_sync_interval_seconds if sync_interval is None else sync_interval
+        self.refresh_interval = settings.sparql_refresh_seconds if refresh_interval is None else refresh_interval
+        self.cache_size = cache_size or settings.sparql_cache_size
+        self.compact_segments = compact_segments or settings.sparql_compact_segments
+        self.graph = None
+        self.version = 0
+        self._base = None
+        self._applied = set()
+        self._watermarks = {}
+        self._checked = 0.0
+        self._cache = OrderedDict()
+        # _lock serializes journal replays in this process; _graph_lock keeps
+        # queries off the graph while segments are merged into it; _state_lock
+        # guards the result cache and counters and is only held briefly
+        self._lock = threading.Lock()
+        self._graph_lock = _ReadWriteLock()
+        self._state_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._leader = None
+        self.hits = 0
+        self.misses = 0
+
+    # -- journal files -----------------------------------------------------
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _lock_file(self, name: str, blocking: bool):
+        """Open ``name`` in the journal directory and ``flock`` it; None if another process holds it."""
+        os.makedirs(self.directory, exist_ok=True)
+        f = open(self._path(name), "a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            f.close()
+            return None
+        return f
+
+    def _segments(self) -> list:
+        """``(seq, name)`` of every segment file, oldest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        return sorted((_segment_seq(name), name) for name in os.listdir(self.directory)
+                      if name.endswith(SEGMENT_SUFFIX))
+
+    def _read_header(self, name: str):
+        """Watermarks and base sequence number from a journal file's comment header."""
+        marks, base = {}, None
+        with open(self._path(name), encoding="utf-8") as f:
+            for line in f:
+                if not line.startswith("#"):
+                    break
+                if line.startswith(_WATERMARK_TAG):
+                    key, value = line[len(_WATERMARK_TAG):].split()
+                    marks[key] = datetime.fromisoformat(value)
+                elif line.startswith(_BASE_TAG):
+                    base = int(line[len(_BASE_TAG):])
+        return marks, base
+
+    def _snapshot_header(self):
+        try:
+            return self._read_header(SNAPSHOT_FILE)
+        except FileNotFoundError:
+            return {}, None
+
+    @staticmethod
+    def _advance(marks: dict, newer: dict) -> None:
+        for key, value in newer.items():
+            if key not in marks or value > marks[key]:
+                marks[key] = value
+
+    # -- writing the journal -----------------------------------------------
+
+    def _write_file(self, name: str, header: dict, base: int = None, windows=()) -> int:
+        """Stream ``(dataset, where)`` windows to ``name`` as N-Triples; returns triples written.
+
+        Nothing is written when the windows hold no rows.
+        """
+        path = self._path(name)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        triples = 0
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for key, value in header.items():
+                f.write(f"{_WATERMARK_TAG}{key} {value.isoformat()}\n")
+            if base is not None:
+                f.write(f"{_BASE_TAG}{base}\n")
+            for dataset, where in windows:
+                exporter = LODStreamExporter(dataset, "nt")
+                for rows in stream_rows(dataset.columns, dataset.model.id, where):
+                    chunk = exporter.render_rows(rows)
+                    triples += chunk.count("\n")
+                    f.write(chunk)
+        if triples or base is not None:
+            os.replace(tmp_path, path)
+        else:
+            os.remove(tmp_path)
+        return triples
+
+    def _next_seq(self, segments: list) -> int:
+        base = self._snapshot_header()[1] or 0
+        return max([base] + [seq for seq, _ in segments]) + 1
+
+    def _compact(self, segments: list) -> None:
+        """Fold the snapshot and ``segments`` into a new snapshot; called under the journal lock.
+
+        Works on the N-Triples text, so the writer never loads rdflib. A
+        subject's lines in a newer file replace its earlier description.
+        """
+        marks, _ = self._snapshot_header()
+        descriptions = {}
+        names = ([SNAPSHOT_FILE] if os.path.exists(self._path(SNAPSHOT_FILE)) else []) + [n for _, n in segments]
+        for name in names:
+            current = {}
+            with open(self._path(name), encoding="utf-8") as f:
+                for line in f:
+                    if line.startswith("#") or not line.strip():
+                        continue
+                    current.setdefault(line.split(" ", 1)[0], []).append(line)
+            self._advance(marks, self._read_header(name)[0])
+            descriptions.update(current)
+
+        path = self._path(SNAPSHOT_FILE)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for key, value in marks.items():
+                f.write(f"{_WATERMARK_TAG}{key} {value.isoformat()}\n")
+            f.write(f"{_BASE_TAG}{segments[-1][0]}\n")
+            for lines in descriptions.values():
+                f.writelines(lines)
+        os.replace(tmp_path, path)
+        for _, name in segments:
+            try:
+                os.remove(self._path(name))
+            except OSError:
+                pass
+
+    def sync(self) -> int:
+        """Journal rows changed since the last watermarks; returns triples written."""
+        with self._lock_file(JOURNAL_LOCK, blocking=True):
+            segments = self._segments()
+            marks, _ = self._snapshot_header()
+            for _, name in segments:
+                self._advance(marks, self._read_header(name)[0])
+            seq = self._next_seq(segments)
+            written = 0
+            for key, dataset in DATASETS.items():
+                latest = watermark(dataset)
+                since = marks.get(key)
+                if latest is None or latest == since:
+                    continue
+                # Boundary rows are re-read; merging replaces subjects, so that is idempotent
+                name = f"{seq:012d}-{key}{SEGMENT_SUFFIX}"
+                triples = self._write_file(name, {key: latest}, windows=[(dataset, time_window(dataset, since, latest))])
+                if triples:
+                    written += triples
+                    segments.append((seq, name))
+                    seq += 1
+            if len(segments) > self.compact_segments:
+                try:
+                    self._compact(segments)
+                except OSError as e:
+                    print(f"⚠️  LOD store compaction failed: {e}")
+        if self.graph is not None:
+            self.refresh(force=True)
+        return written
+
+    def rebuild(self) -> int:
+        """Materialize everything into a new snapshot and drop the old journal.
+
+        Every process re-reads the new snapshot on its next query; until
+        then the current graph keeps serving.
+        """
+        with self._lock_file(JOURNAL_LOCK, blocking=True):
+            segments = self._segments()
+            marks, windows = {}, []
+            for key, dataset in DATASETS.items():
+                latest = watermark(dataset)
+                if latest is not None:
+                    marks[key] = latest
+                windows.append((dataset, time_window(dataset, None, latest)))
+            triples = self._write_file(SNAPSHOT_FILE, marks, base=self._next_seq(segments), windows=windows)
+            for _, name in segments:
+                os.remove(self._path(name))
+        if self.graph is not None:
+            self.refresh(force=True)
+        return triples
+
+    def start(self) -> None:
+        """Run the periodic sync thread (0 disables); only the elected leader writes.
+
+        Starting imports nothing and reads no data: followers just retry the
+        leader lock every ``sync_interval``.
+        """
+        if self.sync_interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="lod-store-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        if self._leader is not None:
+            self._leader.close()
+            self._leader = None
+
+    def _run(self) -> None:
+        while True:
+            try:
+                if self._leader is None:
+                    self._leader = self._lock_file(LEADER_LOCK, blocking=False)
+                if self._leader is not None:
+                    self.sync()
+            except Exception as e:
+                print(f"⚠️  LOD store sync failed: {e}")
+            if self._stop.wait(self.sync_interval):
+                return
+
+    # -- reading the journal -----------------------------------------------
+
+    @staticmethod
+    def _new_graph():
+        graph = rdflib.Graph()
+        for prefix, uri in namespace_prefixes().items():
+            graph.bind(prefix, uri)
+        return graph
+
+    @staticmethod
+    def _merge(graph, batch) -> None:
+        """Replace every subject in ``batch`` with its new description."""
+        for subject in set(batch.subjects()):
+            graph.remove((subject, None, None))
+        for triple in batch:
+            graph.add(triple)
+
+    def _publish(self, graph=None) -> None:
+        """Swap in ``graph`` (or mark the live graph changed); called under the graph write lock."""
+        with self._state_lock:
+            if graph is not None:
+                self.graph = graph
+            self.version += 1
+            self._cache.clear()
+
+    def _replay(self) -> int:
+        """Bring the graph up to date with the journal; returns segments applied.
+
+        Called with ``_lock`` held. New segments are parsed from their files
+        and merged into the live graph; a full reload goes into a new graph
+        that is swapped in when ready.
+        """
+        while True:
+            marks, base = self._snapshot_header()
+            reload = self.graph is None or (base != self._base and base not in self._applied)
+            graph = self._new_graph() if reload else self.graph
+            applied = set() if reload else {seq for seq in self._applied if base is None or seq > base}
+            if reload and base is not None:
+                graph.parse(self._path(SNAPSHOT_FILE), format="nt")
+            batches = []
+            try:
+                for seq, name in self._segments():
+                    if seq in applied or (base is not None and seq <= base):
+                        continue
+                    batch = rdflib.Graph()
+                    batch.parse(self._path(name), format="nt")
+                    batches.append((seq, batch, self._read_header(name)[0]))
+            except FileNotFoundError:
+                continue  # compacted while reading; start over from the new snapshot
+            if self._snapshot_header()[1] != base:
+                continue
+
+            if reload:
+                for seq, batch, segment_marks in batches:
+                    self._merge(graph, batch)
+                    applied.add(seq)
+                    self._advance(marks, segment_marks)
+                with self._graph_lock.write():
+                    self._publish(graph)
+                self._watermarks = marks
+            elif batches:
+                with self._graph_lock.write():
+                    for seq, batch, segment_marks in batches:
+                        self._merge(graph, batch)
+                        applied.add(seq)
+                        self._advance(self._watermarks, segment_marks)
+                    self._publish()
+            self._base, self._applied = base, applied
+            return len(batches)
+
+    def refresh(self, force: bool = False) -> int:
+        """Apply journal files written since the last check; returns segments applied.
+
+        Checks at most every ``refresh_interval`` seconds unless ``force``.
+        """
+        if not force and self.graph is not None and time.monotonic() - self._checked < self.refresh_interval:
+            return 0
+        with self._lock:
+            if not force and self.graph is not None and time.monotonic() - self._checked < self.refresh_interval:
+                return 0
+            self._checked = time.monotonic()
+            try:
+                return self._replay()
+            except (OSError, ValueError) as e:
+                print(f"⚠️  LOD store journal could not be read: {e}")
+                if self.graph is None:
+                    with self._graph_lock.write():
+                        self._publish(self._new_graph())
+                return 0
+
+    # -- queries -----------------------------------------------------------
+
+    def query(self, text: str) -> tuple:
+        """Run a SPARQL query; returns ``(media_type, body bytes)``.
+
+        Results are cached per store version and exact query text, so
+        repeated federated queries are served without re-evaluation until
+        new segments change the data.
+        """
+        self.refresh()
+        with self._graph_lock.read():
+            with self._state_lock:
+                version = self.version
+                cached = self._cache.get((version, text))
+                if cached is not None:
+                    self._cache.move_to_end((version, text))
+                    self.hits += 1
+                    return cached
+                self.misses += 1
+
+            prepared = prepare_query(text)
+            try:
+                result = self.graph.query(prepared)
+                media_type = RESULT_MEDIA_TYPES[result.type]
+                if result.graph is not None:
+                    for prefix, uri in namespace_prefixes().items():
+                        result.graph.bind(prefix, uri)
+                body = result.serialize(format="json" if media_type.endswith("json") else "turtle")
+            except Exception as e:
+                raise SPARQLQueryError(str(e)) from e
+
+            entry = (media_type, body)
+            with self._state_lock:
+                self._cache[(version, text)] = entry
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return entry
+
+    def stats(self) -> dict:
+        with self._graph_lock.read(), self._state_lock:
+            total = self.hits + self.misses
+            return {
+                "loaded": self.graph is not None,
+                "leader": self._leader is not None,
+                "triples": len(self.graph) if self.graph is not None else 0,
+                "version": self.version,
+                "segments_applied": len(self._applied),
+                "watermarks": {key: value.isoformat() for key, value in self._watermarks.items()},
+                "cache_entries": len(self._cache),
+                "cache_hits": self.hits,
+                "cache_misses": self.misses,
+                "cache_hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+lod_store = LODTripleStore()
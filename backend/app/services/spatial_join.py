@@ -0,0 +1,165 @@
+"""Spatial join of air quality stations onto schools and energy sites."""
+
+from __future__ import annotations
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.lazy import lazy_import
+from app.models import AirQuality, School, EnergyData
+
+np = lazy_import("numpy")
+scipy_spatial = lazy_import("scipy.spatial")
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_unit_xyz(lat, lng) -> np.ndarray:
+    """Project WGS84 degrees onto the unit sphere as an (n, 3) array."""
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lng = np.radians(np.asarray(lng, dtype=float))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lng), cos_lat * np.sin(lng), np.sin(lat)))
+
+
+def chord_to_km(chord: np.ndarray) -> np.ndarray:
+    """Great-circle distance in km from a chord length on the unit sphere."""
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chord / 2, 0, 1))
+
+
+def km_to_chord(km: float) -> float:
+    return float(2 * np.sin(km / (2 * EARTH_RADIUS_KM)))
+
+
+class StationIndex:
+    """KD-tree over station coordinates on the unit sphere.
+
+    Euclidean chord distance is monotonic in great-circle distance, so a
+    plain ``cKDTree`` answers haversine nearest-neighbour queries exactly.
+    """
+
+    def __init__(self, lat, lng, values):
+        xyz = to_unit_xyz(lat, lng)
+        values = np.asarray(values, dtype=float)
+        valid = np.isfinite(xyz).all(axis=1) & np.isfinite(values)
+        self.values = values[valid]
+        self.tree = scipy_spatial.cKDTree(xyz[valid]) if valid.any() else None
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def query(self, lat, lng, k: int = None, max_distance_km: float = None, power: float = 2.0) -> np.ndarray:
+        """Nearest (k=1) or inverse-distance weighted (k>1) station value per point.
+
+        Points with no station within ``max_distance_km`` get NaN.
+        """
+        k = k or settings.spatial_join_k
+        max_distance_km = settings.spatial_join_max_distance_km if max_distance_km is None else max_distance_km
+        xyz = to_unit_xyz(lat, lng)
+        result = np.full(len(xyz), np.nan)
+        if self.tree is None or len(xyz) == 0:
+            return result
+
+        k = min(k, len(self))
+        upper = km_to_chord(max_distance_km) if max_distance_km else np.inf
+        chord, idx = self.tree.query(xyz, k=k, distance_upper_bound=upper)
+        if k == 1:
+            chord, idx = chord[:, None], idx[:, None]
+
+        found = np.isfinite(chord)
+        # Missing neighbours come back with idx == len(values); clamp before take
+        station_values = self.values[np.minimum(idx, len(self) - 1)]
+        distance = chord_to_km(np.where(found, chord, 0))
+
+        with np.errstate(divide="ignore"):
+            weights = np.where(found, 1.0 / np.power(distance, power), 0.0)
+        exact = found & (distance == 0)
+        weights = np.where(exact.any(axis=1, keepdims=True), exact.astype(float), weights)
+
+        total = weights.sum(axis=1)
+        has_any = total > 0
+        result[has_any] = (weights[has_any] * station_values[has_any]).sum(axis=1) / total[has_any]
+        return result
+
+
+class SpatialJoin:
+    """Build per-location feature vectors aligned on school and energy points."""
+
+    @staticmethod
+    def latest_stations(db: Session) -> np.ndarray:
+        """Latest valid reading per station location as an (n, 3) lat/lng/aqi array.
+
+        Stations are identified by their coordinates. Indexing every stored
+        reading instead would make older readings at the same place count as
+        extra neighbours in the IDW average.
+        """
+        latest_ids = (
+            db.query(func.max(AirQuality.id))
+            .filter(AirQuality.aqi.isnot(None), AirQuality.valid())
+            .group_by(AirQuality.lat, AirQuality.lng)
+        )
+        rows = db.query(AirQuality.lat, AirQuality.lng, AirQuality.aqi).filter(AirQuality.id.in_(latest_ids)).all()
+        return np.array(rows, dtype=float).reshape(-1, 3)
+
+    @staticmethod
+    def aligned_features(db: Session, ward_name: str = None, k: int = None, max_distance_km: float = None) -> dict:
+        """Attach station AQI to every school and energy site in one bulk pass.
+
+        All stations city-wide are indexed, since the nearest station to a
+        school may sit in a neighbouring ward; only the target points are
+        filtered by ``ward_name``. Schools without an ``avg_score`` keep NaN,
+        which the correlation and resampling code mask out.
+        """
+        stations = SpatialJoin.latest_stations(db)
+        index = StationIndex(stations[:, 0], stations[:, 1], stations[:, 2])
+
+        school_query = db.query(School.ward_name, School.lat, School.lng, School.avg_score)
+        energy_query = db.query(
+            EnergyData.ward_name, EnergyData.lat, EnergyData.lng, EnergyData.solar_potential_kw, EnergyData.current_usage_kw
+        )
+        if ward_name is not None:
+            school_query = school_query.filter(School.ward_name == ward_name)
+            energy_query = energy_query.filter(EnergyData.ward_name == ward_name)
+
+        school_rows = school_query.all()
+        energy_rows = energy_query.all()
+        schools = np.array([row[1:] for row in school_rows], dtype=float).reshape(-1, 3)
+        energy = np.array([row[1:] for row in energy_rows], dtype=float).reshape(-1, 4)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            renewable = np.where(
+                energy[:, 3] > 0, np.minimum(100.0, 100.0 * np.nan_to_num(energy[:, 2]) / energy[:, 3]), 0.0
+            )
+
+        return {
+            "n_stations": len(index),
+            "school_aqi": index.query(schools[:, 0], schools[:, 1], k, max_distance_km),
+            "school_score": schools[:, 2] * 100,
+            "energy_aqi": index.query(energy[:, 0], energy[:, 1], k, max_distance_km),
+            "energy_renewable": renewable,
+            "school_ward": np.array([row[0] for row in school_rows], dtype=object),
+            "energy_ward": np.array([row[0] for row in energy_rows], dtype=object),
+        }
+
+    @staticmethod
+    def split_by_ward(aligned: dict) -> dict:
+        """Split city-wide aligned features into one aligned dict per ward."""
+        per_ward = {}
+        for prefix, columns in (("school", ("school_aqi", "school_score")), ("energy", ("energy_aqi", "energy_renewable"))):
+            wards = np.array(["" if w is None else str(w) for w in aligned[f"{prefix}_ward"]], dtype=str)
+            if not len(wards):
+                continue
+            names, inverse = np.unique(wards, return_inverse=True)
+            order = np.argsort(inverse, kind="stable")
+            bounds = np.cumsum(np.bincount(inverse, minlength=len(names)))[:-1]
+            for name, idx in zip(names, np.split(order, bounds)):
+                if not name:
+                    continue
+                ward = per_ward.setdefault(name, {
+                    "n_stations": aligned["n_stations"],
+                    "school_aqi": np.empty(0), "school_score": np.empty(0),
+                    "energy_aqi": np.empty(0), "energy_renewable": np.empty(0),
+                })
+                for column in columns:
+                    ward[column] = aligned[column][idx]
+        return per_ward
@@ -0,0 +1,298 @@
+"""Online correlation statistics updated as readings arrive."""
+
+from __future__ import annotations
+
+import fcntl
+import glob
+import json
+import os
+import threading
+import time
+from app.core.config import settings
+from app.core.constants import CORRELATION_METRICS
+from app.core.lazy import lazy_import
+from app.services.ai_service import _LEGACY_PAIRS, _pearson_from_moments
+
+np = lazy_import("numpy")
+
+
+def renewable_percentage(solar_potential_kw: float, current_usage_kw: float) -> float:
+    """Share of current usage coverable by solar potential, capped at 100%."""
+    if not current_usage_kw or current_usage_kw <= 0:
+        return 0.0
+    return float(min(100.0, 100.0 * (solar_potential_kw or 0) / current_usage_kw))
+
+
+class CorrelationAccumulator:
+    """Welford running mean and co-moment matrix over a fixed set of metrics."""
+
+    __slots__ = ("n", "mean", "comoment")
+
+    def __init__(self, k: int = len(CORRELATION_METRICS)):
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+
+    def update(self, x: np.ndarray) -> None:
+        """Fold one joint observation into the running moments in O(k^2)."""
+        self.n += 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.comoment += np.outer(delta, x - self.mean)
+
+    def merge(self, other: "CorrelationAccumulator") -> None:
+        """Combine with another accumulator (Chan et al. parallel update)."""
+        if other.n == 0:
+            return
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.comoment += other.comoment + np.outer(delta, delta) * self.n * other.n / n
+        self.mean += delta * other.n / n
+        self.n = n
+
+    def copy(self) -> "CorrelationAccumulator":
+        acc = CorrelationAccumulator(len(self.mean))
+        acc.n, acc.mean, acc.comoment = self.n, self.mean.copy(), self.comoment.copy()
+        return acc
+
+    def covariance(self) -> np.ndarray:
+        """Population covariance matrix of the observations seen so far."""
+        return self.comoment / self.n if self.n else np.full_like(self.comoment, np.nan)
+
+    def to_dict(self) -> dict:
+        return {"n": self.n, "mean": self.mean.tolist(), "comoment": self.comoment.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CorrelationAccumulator":
+        acc = cls(len(data["mean"]))
+        acc.n = int(data["n"])
+        acc.mean = np.asarray(data["mean"], dtype=float)
+        acc.comoment = np.asarray(data["comoment"], dtype=float)
+        return acc
+
+
+class StreamingCorrelationStore:
+    """Per-ward correlation accumulators fed by the reading ingest path.
+
+    Each ward keeps the latest value of every metric in ``CORRELATION_METRICS``.
+    Whenever a reading changes one of them and all are known, the ward's
+    current metric vector is folded into its accumulator. Correlations and
+    confidence are then read in O(1) without touching stored readings.
+
+    Every worker snapshots only the observations it made itself, to its own
+    ``<snapshot>.<worker_id>.json`` file, and holds an ``flock`` on it while
+    alive. On first use a worker merges the files of workers that are gone
+    into the shared base snapshot, so no observation is counted twice and
+    concurrent workers never overwrite each other. The restore happens on
+    first use rather than at startup, so workers that never touch
+    correlations do not load NumPy.
+    """
+
+    def __init__(
+        self,
+        snapshot_path: str = None,
+        snapshot_interval: float = None,
+        metrics: tuple = CORRELATION_METRICS,
+        worker_id: str = None,
+    ):
+        self.metrics = metrics
+        self.snapshot_path = snapshot_path or settings.ai_stream_snapshot_path
+        self.snapshot_interval = (
+            settings.ai_stream_snapshot_interval_seconds if snapshot_interval is None else snapshot_interval
+        )
+        self.worker_id = worker_id or str(os.getpid())
+        self._index = {name: i for i, name in enumerate(metrics)}
+        self._latest = {}
+        self._base = {}  # restored accumulators, owned by the base snapshot
+        self._accumulators = {}  # this worker's observations, owned by its own file
+        self._lock = threading.Lock()
+        self._claim = None
+        self._last_snapshot = time.monotonic()
+        self._loaded = False
+
+    def _worker_path(self, worker_id: str) -> str:
+        root, ext = os.path.splitext(self.snapshot_path)
+        return f"{root}.{worker_id}{ext or '.json'}"
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            # Restore before publishing _loaded, so no caller sees the empty state
+            try:
+                state = self._compact()
+                if state is not None:
+                    self._apply(state)
+                self._claim = self._lock_file(f"{self._worker_path(self.worker_id)}.lock", blocking=True)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️  Correlation snapshot could not be restored: {e}")
+            self._loaded = True
+
+    @staticmethod
+    def _lock_file(path: str, blocking: bool):
+        """Open ``path`` and ``flock`` it; returns the file, or None if another process holds it."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        f = open(path, "a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            f.close()
+            return None
+        return f
+
+    def _compact(self):
+        """Merge the snapshots of finished workers into the base snapshot and return it."""
+        with self._lock_file(f"{self.snapshot_path}.lock", blocking=True):
+            base = self._read_snapshot(self.snapshot_path)
+            merged = []
+            root, ext = os.path.splitext(self.snapshot_path)
+            for path in sorted(glob.glob(f"{glob.escape(root)}.*{ext or '.json'}"), key=os.path.getmtime):
+                owner = self._lock_file(f"{path}.lock", blocking=False)
+                if owner is None:
+                    continue  # its worker is still running
+                with owner:
+                    state = self._read_snapshot(path)
+                if state is not None:
+                    base = self._merge_states(base, state)
+                merged.append(path)
+            if merged and base is not None:
+                self._write(self.snapshot_path, base)
+            # Only after the base holds their observations
+            for path in merged:
+                for stale in (path, f"{path}.lock"):
+                    try:
+                        os.remove(stale)
+                    except FileNotFoundError:
+                        pass
+        return base
+
+    @staticmethod
+    def _merge_states(base, state: dict) -> dict:
+        if base is None:
+            return state
+        accumulators = {w: CorrelationAccumulator.from_dict(acc) for w, acc in base["accumulators"].items()}
+        for w, data in state["accumulators"].items():
+            acc = accumulators.setdefault(w, CorrelationAccumulator(len(data["mean"])))
+            acc.merge(CorrelationAccumulator.from_dict(data))
+        return {
+            "metrics": base["metrics"],
+            "latest": {**base["latest"], **state["latest"]},
+            "accumulators": {w: acc.to_dict() for w, acc in accumulators.items()},
+        }
+
+    def _merged(self, ward_name: str):
+        # Caller holds self._lock
+        base, own = self._base.get(ward_name), self._accumulators.get(ward_name)
+        if base is None or own is None:
+            return base or own
+        acc = base.copy()
+        acc.merge(own)
+        return acc
+
+    def observe(self, ward_name: str, metric: str, value: float) -> None:
+        """Record a new value of ``metric`` for ``ward_name``."""
+        if value is None or ward_name is None:
+            return
+        self._ensure_loaded()
+        with self._lock:
+            latest = self._latest.get(ward_name)
+            if latest is None:
+                latest = self._latest[ward_name] = np.full(len(self.metrics), np.nan)
+            latest[self._index[metric]] = float(value)
+            if not np.isnan(latest).any():
+                acc = self._accumulators.get(ward_name)
+                if acc is None:
+                    acc = self._accumulators[ward_name] = CorrelationAccumulator(len(self.metrics))
+                acc.update(latest)
+        self.maybe_snapshot()
+
+    def correlations(self, ward_name: str) -> dict:
+        """Current correlations, p-values and confidence for one ward."""
+        self._ensure_loaded()
+        with self._lock:
+            acc = self._merged(ward_name)
+            n = acc.n if acc else 0
+            cov = acc.covariance() if acc else None
+
+        result = {"ward": ward_name, "n_samples": n, "correlations": {}, "confidence": 0.0}
+        if n < 3:
+            return result
+
+        r, p = _pearson_from_moments(np.array([n]), cov[None])
+        for key, (i, j, p_key) in _LEGACY_PAIRS.items():
+            if not np.isnan(r[0, i, j]):
+                result["correlations"][key] = float(r[0, i, j])
+                result["correlations"][p_key] = float(p[0, i, j])
+
+        coefficients = [abs(result["correlations"][key]) for key in _LEGACY_PAIRS if key in result["correlations"]]
+        if coefficients:
+            result["confidence"] = float(min(np.mean(coefficients), 1.0))
+        return result
+
+    def wards(self) -> list:
+        self._ensure_loaded()
+        with self._lock:
+            return sorted(set(self._base) | set(self._accumulators))
+
+    def snapshot(self) -> None:
+        """Write this worker's accumulators and latest values atomically to its own file."""
+        if not self._loaded:
+            # Nothing was restored or observed; keep the existing snapshot
+            return
+        with self._lock:
+            state = {
+                "metrics": list(self.metrics),
+                "latest": {w: [None if np.isnan(v) else float(v) for v in vals] for w, vals in self._latest.items()},
+                "accumulators": {w: acc.to_dict() for w, acc in self._accumulators.items()},
+            }
+            self._last_snapshot = time.monotonic()
+        self._write(self._worker_path(self.worker_id), state)
+
+    @staticmethod
+    def _write(path: str, state: dict) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+
+    def maybe_snapshot(self) -> None:
+        """Snapshot if the configured interval has elapsed since the last one."""
+        if self.snapshot_interval and time.monotonic() - self._last_snapshot >= self.snapshot_interval:
+            try:
+                self.snapshot()
+            except OSError as e:
+                print(f"⚠️  Correlation snapshot failed: {e}")
+
+    def close(self) -> None:
+        """Final snapshot, then release this worker's file for the next compaction."""
+        try:
+            self.snapshot()
+        finally:
+            with self._lock:
+                claim, self._claim = self._claim, None
+            if claim is not None:
+                claim.close()
+
+    def _read_snapshot(self, path: str):
+        """Parsed snapshot at ``path``, or None if missing or for other metrics."""
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            state = json.load(f)
+        if tuple(state.get("metrics", ())) != tuple(self.metrics):
+            return None
+        return state
+
+    def _apply(self, state: dict) -> None:
+        # Caller holds self._lock
+        self._latest = {
+            w: np.array([np.nan if v is None else v for v in vals], dtype=float) for w, vals in state["latest"].items()
+        }
+        self._base = {w: CorrelationAccumulator.from_dict(acc) for w, acc in state["accumulators"].items()}
+        self._accumulators = {}
+
+
+correlation_stream = StreamingCorrelationStore()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Benchmark: per-ward AIService.analyze_correlation loop vs the batch engine.
+
+Run from ``backend/``::
+
+    python -m benchmarks.bench_ai_correlation --wards 300 --samples 40
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from app.services.ai_service import AIService
+
+
+def make_dataset(n_wards: int, samples: int, seed: int = 42) -> list:
+    """Synthetic per-ward readings with a mild AQI/score dependency."""
+    rng = np.random.default_rng(seed)
+    records = []
+    for w in range(n_wards):
+        aqi = rng.normal(90, 25, samples)
+        score = 0.8 - 0.002 * aqi + rng.normal(0, 0.05, samples)
+        renewable = rng.uniform(0, 40, samples)
+        for a, s, r in zip(aqi, score, renewable):
+            records.append({
+                "ward_name": f"Ward {w:04d}",
+                "aqi": float(a),
+                "avg_score": float(s),
+                "renewable_percentage": float(r),
+            })
+    return records
+
+
+def run_loop(records: list) -> float:
+    """Current approach: one analyze_correlation call per ward."""
+    by_ward = {}
+    for r in records:
+        by_ward.setdefault(r["ward_name"], []).append(r)
+    start = time.perf_counter()
+    for ward, rows in by_ward.items():
+        AIService.analyze_correlation(rows, rows, rows, ward)
+    return time.perf_counter() - start
+
+
+def run_batch(records: list) -> float:
+    """Vectorized approach: one analyze_correlation_batch call for the city."""
+    start = time.perf_counter()
+    metrics, ward_ids, ward_names = AIService.build_correlation_matrix(records)
+    AIService.analyze_correlation_batch(metrics, ward_ids, ward_names)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--wards", type=int, default=300)
+    parser.add_argument("--samples", type=int, default=40, help="readings per ward")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    records = make_dataset(args.wards, args.samples)
+    loop = min(run_loop(records) for _ in range(args.repeat))
+    batch = min(run_batch(records) for _ in range(args.repeat))
+
+    print(f"wards={args.wards} samples/ward={args.samples} rows={len(records)}")
+    print(f"  per-ward loop : {loop * 1000:8.1f} ms")
+    print(f"  batch engine  : {batch * 1000:8.1f} ms")
+    print(f"  speedup       : {loop / batch:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Benchmark: per-record rdflib Graph export vs the streaming LOD exporter.
+
+Runs against a throwaway SQLite database unless ``DATABASE_URL`` is set.
+Run from ``backend/``::
+
+    python -m benchmarks.bench_lod_export --rows 20000
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+if "DATABASE_URL" not in os.environ:
+    os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/bench_lod.db"
+
+from app.db import Base, SessionLocal, engine  # noqa: E402
+from app.models import AirQuality  # noqa: E402
+from app.services.lod_converter import LODConverter  # noqa: E402
+from app.services.lod_stream import DATASETS, LODStreamExporter  # noqa: E402
+
+
+def seed(rows: int, seed: int = 42):
+    """Fill air_quality with synthetic readings."""
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(seed)
+    db = SessionLocal()
+    try:
+        db.query(AirQuality).delete()
+        db.bulk_insert_mappings(AirQuality, [
+            {
+                "ward_name": f"Ward {i % 50:02d}",
+                "lat": 16.0 + rng.random() * 0.1,
+                "lng": 108.2 + rng.random() * 0.1,
+                "aqi": rng.uniform(20, 200),
+                "pm25": rng.uniform(5, 80),
+                "pm10": rng.uniform(10, 120),
+                "no2": rng.uniform(0, 50),
+                "so2": rng.uniform(0, 20),
+                "co": rng.uniform(0, 5),
+            }
+            for i in range(rows)
+        ])
+        db.commit()
+    finally:
+        db.close()
+
+
+def run_graph() -> int:
+    """Current approach: load every row, build and serialize one Graph per record."""
+    db = SessionLocal()
+    try:
+        size = 0
+        for row in db.query(AirQuality).all():
+            data = {
+                "id": row.id, "ward_name": row.ward_name, "aqi": row.aqi, "pm25": row.pm25,
+                "latitude": row.lat, "longitude": row.lng,
+            }
+            size += len(LODConverter.to_rdf(data).encode("utf-8"))
+        return size
+    finally:
+        db.close()
+
+
+def run_stream(fmt: str) -> int:
+    """Streaming approach: server-side cursor and precomputed templates."""
+    return sum(len(chunk) for chunk in LODStreamExporter(DATASETS["air-quality"], fmt).iter_chunks())
+
+
+def measure(fn, *args) -> tuple:
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = fn(*args)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    args = parser.parse_args()
+
+    seed(args.rows)
+    graph = measure(run_graph)
+    nt = measure(run_stream, "nt")
+    ttl = measure(run_stream, "ttl")
+
+    print(f"rows={args.rows}")
+    for label, (elapsed, peak, size) in (("rdflib Graph", graph), ("stream .nt", nt), ("stream .ttl", ttl)):
+        print(f"  {label:13s}: {elapsed * 1000:9.1f} ms  peak {peak / 1e6:7.1f} MB  output {size / 1e6:6.1f} MB")
+    print(f"  speedup (.ttl): {graph[0] / ttl[0]:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Benchmark: inline bcrypt in the API threadpool vs the bounded hashing pool.
+
+Simulates concurrent signups (hash) and logins (verify) and reports
+throughput plus the worst event-loop stall seen while they run.
+Run from ``backend/``::
+
+    python -m benchmarks.bench_password_hashing --requests 64 --concurrency 16 --rounds 12
+"""
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from app.services.password_hashing import PasswordHasher, HashingBusy
+
+
+async def _loop_lag(stop: asyncio.Event) -> float:
+    """Largest delay of a 5 ms ticker while the workload runs."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        worst = max(worst, time.perf_counter() - start - 0.005)
+    return worst
+
+
+async def _run(make_call, n_requests: int, concurrency: int) -> tuple:
+    semaphore = asyncio.Semaphore(concurrency)
+    rejected = 0
+
+    async def one(i):
+        nonlocal rejected
+        async with semaphore:
+            try:
+                await make_call(i)
+            except HashingBusy:
+                rejected += 1
+
+    stop = asyncio.Event()
+    lag = asyncio.create_task(_loop_lag(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n_requests)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await lag, rejected
+
+
+async def bench(args):
+    passwords = [f"password-{i}" for i in range(args.requests)]
+    stored = bcrypt.hashpw(b"password-0", bcrypt.gensalt(rounds=args.rounds)).decode()
+
+    # Current approach: bcrypt inline in a (starlette-sized) threadpool
+    threads = ThreadPoolExecutor(max_workers=40)
+    loop = asyncio.get_running_loop()
+    inline_hash = lambda i: loop.run_in_executor(
+        threads, lambda: bcrypt.hashpw(passwords[i].encode(), bcrypt.gensalt(rounds=args.rounds)))
+    inline_verify = lambda i: loop.run_in_executor(threads, lambda: bcrypt.checkpw(b"password-0", stored.encode()))
+
+    hasher = PasswordHasher(workers=args.workers, max_pending=args.max_pending, rounds=args.rounds)
+    await hasher.hash("warm-up")  # start worker processes outside the timing
+    pool_hash = lambda i: hasher.hash(passwords[i])
+    pool_verify = lambda i: hasher.verify("password-0", stored)
+
+    print(f"requests={args.requests} concurrency={args.concurrency} rounds={args.rounds} workers={args.workers}")
+    for label, call in (
+        ("signup inline", inline_hash),
+        ("signup pool  ", pool_hash),
+        ("login inline ", inline_verify),
+        ("login pool   ", pool_verify),
+    ):
+        elapsed, lag, rejected = await _run(call, args.requests, args.concurrency)
+        print(f"  {label}: {args.requests / elapsed:7.1f} req/s  max loop stall {lag * 1000:6.1f} ms  rejected {rejected}")
+
+    threads.shutdown()
+    hasher.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-pending", type=int, default=64)
+    args = parser.parse_args()
+    asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""Import-time profile of the API entry point.
+
+Runs ``python -X importtime -c "import main"`` in a fresh interpreter and
+reports the slowest top-level packages and whether any heavy analytics/LOD
+dependency was imported during boot. Run from ``backend/``::
+
+    python -m benchmarks.import_profile --top 15 --check
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+# Dependencies that must only load on first use, never at worker boot
+HEAVY_MODULES = ("numpy", "pandas", "sklearn", "scipy", "rdflib", "pyarrow")
+
+
+def profile(target: str = "main") -> list:
+    """Return ``(module, self_us, cumulative_us)`` rows for importing ``target``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    if proc.returncode != 0:
+        sys.stderr.write(proc.stderr)
+        raise SystemExit(f"import {target} failed")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time profile of the API entry point")
+    parser.add_argument("--target", default="main", help="module to import (default: main)")
+    parser.add_argument("--top", type=int, default=15, help="number of packages to list")
+    parser.add_argument("--check", action="store_true", help="exit 1 if a heavy module is imported")
+    args = parser.parse_args()
+
+    rows = profile(args.target)
+    per_package = defaultdict(int)
+    for name, self_us, _ in rows:
+        per_package[name.split(".")[0]] += self_us
+    total_us = sum(per_package.values())
+    heavy = sorted({name.split(".")[0] for name, _, _ in rows if name.split(".")[0] in HEAVY_MODULES})
+
+    print(f"import {args.target}: {total_us / 1000:.1f} ms across {len(rows)} modules")
+    print(f"{'package':<28}{'self ms':>10}{'share':>8}")
+    for package, self_us in sorted(per_package.items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"{package:<28}{self_us / 1000:>10.1f}{100 * self_us / total_us:>7.1f}%")
+
+    if heavy:
+        print(f"\n⚠️  heavy modules imported at boot: {', '.join(heavy)}")
+    else:
+        print(f"\n✅ none of {', '.join(HEAVY_MODULES)} imported at boot")
+
+    if args.check and heavy:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
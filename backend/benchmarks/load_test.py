@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""Load test every route in ``app/api/endpoints`` against a seeded database.
+
+By default requests go straight to the ASGI app in-process (no network,
+no server to start); ``--base-url`` targets a running server instead.
+Routes without a scenario are reported so new endpoints are not silently
+left out. Run from ``backend/`` after ``benchmarks.seed``::
+
+    DATABASE_URL=sqlite:///./bench.db RATE_LIMIT_ENABLED=false python -m benchmarks.load_test --requests 200
+"""
+
+import argparse
+import asyncio
+import importlib
+import itertools
+import json
+import sys
+import time
+
+import httpx
+import numpy as np
+
+from benchmarks.seed import BENCH_EMAIL, BENCH_PASSWORD, ward_names
+
+ROUTER_MODULES = ("environment", "education", "user", "ai", "lod", "export")
+# main.py mounts api_router under this prefix, on top of each router's own "/api"
+MOUNT_PREFIX = "/api"
+# Above the default connection pool (pool_size 5 + max_overflow 10), so a route
+# holding more than one connection per request times out here, not in production
+DEFAULT_CONCURRENCY = 32
+
+
+class Scenario:
+    """One route exercised with fixed or per-request generated arguments."""
+
+    __slots__ = ("router", "method", "path", "url", "params", "body", "form", "headers", "expect", "requests")
+
+    def __init__(self, router: str, method: str, path: str, url: str = None, params=None, body=None, form=None,
+                 headers=None, expect: int = 200, requests: int = None):
+        self.router = router
+        self.method = method
+        self.path = path
+        self.url = url or path
+        self.params = params
+        self.body = body
+        self.form = form
+        self.headers = headers
+        self.expect = expect
+        self.requests = requests
+
+    @property
+    def name(self) -> str:
+        return f"{self.method} {self.path}"
+
+    def build(self, i: int) -> dict:
+        """httpx request arguments for the ``i``-th request; callables get ``i``."""
+        kwargs = {}
+        for key, value in (("params", self.params), ("json", self.body), ("data", self.form), ("headers", self.headers)):
+            if value is not None:
+                kwargs[key] = value(i) if callable(value) else value
+        return kwargs
+
+
+def _token_headers(i: int) -> dict:
+    from app.core.security import create_access_token
+
+    # Distinct claim per request so logout never revokes a token another request uses
+    token = create_access_token({"user_id": 1, "email": BENCH_EMAIL, "role": "citizen", "bench": i})
+    return {"Authorization": f"Bearer {token}"}
+
+
+def build_scenarios(ward: str, job_id: str) -> list:
+    """Scenarios for every route; ``ward`` and ``job_id`` come from the seeded data."""
+    from app.core.config import settings
+
+    signup_ids = itertools.count()
+    point = {"lat": 21.02, "lng": 105.83}
+    ward_filter = {"ward_name": ward}
+    sparql = "SELECT ?s WHERE { ?s a ?type } LIMIT 10"
+    return [
+        # environment
+        Scenario("environment", "GET", "/api/air-quality", params={"limit": 100}),
+        Scenario("environment", "POST", "/api/air-quality", body=lambda i: {
+            "ward_name": ward, **point, "aqi": 80 + i % 40, "pm25": 30.0, "pm10": 50.0,
+            "no2": 20.0, "so2": 5.0, "co": 0.8}),
+        Scenario("environment", "GET", "/api/air-quality/anomalies", params=ward_filter),
+        Scenario("environment", "GET", "/api/air-quality/grid", params={
+            "lat_min": 20.95, "lat_max": 21.10, "lng_min": 105.75, "lng_max": 105.90, "resolution": 64}),
+        Scenario("environment", "GET", "/api/air-quality/tiles/{z}/{x}/{y}.{fmt}",
+                 url="/api/air-quality/tiles/12/3248/1803.png"),
+        Scenario("environment", "GET", "/api/weather"),
+        Scenario("environment", "GET", "/api/energy"),
+        Scenario("environment", "POST", "/api/energy", body={
+            "ward_name": ward, **point, "solar_potential_kw": 120.0, "current_usage_kw": 900.0}),
+        # education
+        Scenario("education", "GET", "/api/schools"),
+        Scenario("education", "POST", "/api/schools", body=lambda i: {
+            "school_name": f"Load test school {i}", "ward_name": ward, **point, "avg_score": 0.7}),
+        Scenario("education", "GET", "/api/courses"),
+        Scenario("education", "POST", "/api/courses", body={
+            "school_id": 1, "title": "Load test course", "description": "-", "type": "Solar",
+            "students": 30, "start_date": "2024-01-01", "end_date": "2024-03-01"}),
+        # user
+        Scenario("user", "GET", "/api/users"),
+        Scenario("user", "POST", "/api/users", body=lambda i: {
+            "full_name": "Load Test", "email": f"load-{time.time_ns()}-{next(signup_ids)}@example.org",
+            "role": "citizen", "password": BENCH_PASSWORD}),
+        Scenario("user", "POST", "/api/users/login", body={"email": BENCH_EMAIL, "password": BENCH_PASSWORD}),
+        Scenario("user", "GET", "/api/users/me", headers=_token_headers),
+        Scenario("user", "POST", "/api/users/logout", headers=_token_headers, expect=204),
+        Scenario("user", "GET", "/api/feedback"),
+        Scenario("user", "GET", "/api/feedback/search", params={"q": "khong khi o nhiem"}),
+        Scenario("user", "POST", "/api/feedback", body={
+            "user_id": 1, "ward_name": ward, "message": "Không khí hôm nay rất ô nhiễm"}),
+        # ai
+        Scenario("ai", "GET", "/api/ai/analysis"),
+        Scenario("ai", "POST", "/api/ai/analysis", body={
+            "ward_name": ward, "corr_env_edu": -0.4, "corr_energy": 0.2, "recommendation": "load test"}),
+        Scenario("ai", "GET", "/api/ai/recommendations"),
+        Scenario("ai", "POST", "/api/ai/recommendations", body={
+            "ward_name": ward, "action": "load test", "impact_score": 50.0}),
+        Scenario("ai", "GET", "/api/ai/correlations/live"),
+        Scenario("ai", "GET", "/api/ai/models/stats"),
+        # Past ai_job_max_pending unfinished jobs the route answers 503 by design; stay below it
+        Scenario("ai", "POST", "/api/ai/jobs", body={"kind": "correlation", "ward_name": ward}, expect=202,
+                 requests=settings.ai_job_max_pending // 2),
+        Scenario("ai", "GET", "/api/ai/jobs/{job_id}", url=f"/api/ai/jobs/{job_id}"),
+        Scenario("ai", "GET", "/api/ai/jobs/{job_id}/events", url=f"/api/ai/jobs/{job_id}/events"),
+        Scenario("ai", "POST", "/api/ai/scenarios", body={
+            "scenarios": [{"name": "trees", "actions": {"tree_planting": 1000}}], "n_draws": 1000, "seed": 1}),
+        Scenario("ai", "GET", "/api/ai/forecasts", params=ward_filter),
+        Scenario("ai", "POST", "/api/ai/forecasts/refresh", requests=5),
+        Scenario("ai", "POST", "/api/ai/materialize", params={"force": "true"}, requests=5),
+        Scenario("ai", "GET", "/api/ai/significance", params={**ward_filter, "iterations": 500}),
+        # lod
+        Scenario("lod", "GET", "/api/lod/context.jsonld"),
+        Scenario("lod", "GET", "/api/lod/sparql", params={"query": sparql}),
+        Scenario("lod", "POST", "/api/lod/sparql", form={"query": sparql}),
+        Scenario("lod", "GET", "/api/lod/sparql/stats"),
+        Scenario("lod", "POST", "/api/lod/sparql/sync", requests=5),
+        Scenario("lod", "GET", "/api/lod/{dataset}.{fmt}", url="/api/lod/schools.nt", requests=5),
+        # export
+        Scenario("export", "GET", "/api/export/{table}.{fmt}", url="/api/export/air-quality.parquet", requests=5),
+    ]
+
+
+def uncovered_routes(scenarios: list) -> list:
+    """``METHOD path`` of endpoint routes that no scenario exercises."""
+    covered = {scenario.name for scenario in scenarios}
+    missing = []
+    for module_name in ROUTER_MODULES:
+        module = importlib.import_module(f"app.api.endpoints.{module_name}")
+        for route in module.router.routes:
+            for method in sorted(route.methods - {"HEAD", "OPTIONS"}):
+                if f"{method} {route.path}" not in covered:
+                    missing.append(f"{method} {route.path}")
+    return missing
+
+
+def summarize(latencies: list, elapsed: float, errors: int, statuses: dict) -> dict:
+    ms = np.array(latencies) * 1000 if latencies else np.zeros(1)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p95_ms": round(float(np.percentile(ms, 95)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def failing_routes(routes: list) -> list:
+    """Routes that answered anything but their expected status (timeouts included)."""
+    return [route["route"] for route in routes if route["errors"]]
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, n_requests: int, concurrency: int) -> dict:
+    """Fire ``n_requests`` at one route with bounded concurrency after one warm-up call."""
+    url = MOUNT_PREFIX + scenario.url
+    await client.request(scenario.method, url, **scenario.build(-1))
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = {}
+
+    async def one(i):
+        async with semaphore:
+            kwargs = scenario.build(i)
+            start = time.perf_counter()
+            try:
+                response = await client.request(scenario.method, url, **kwargs)
+                code = response.status_code
+            except httpx.HTTPError:
+                code = 0
+            latencies.append(time.perf_counter() - start)
+            statuses[code] = statuses.get(code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(n_requests)))
+    elapsed = time.perf_counter() - start
+    errors = sum(count for code, count in statuses.items() if code != scenario.expect)
+    return {"router": scenario.router, "route": scenario.name, **summarize(latencies, elapsed, errors, statuses)}
+
+
+async def _prepare_job(client: httpx.AsyncClient, ward: str, timeout: float = 60.0) -> str:
+    """Submit a correlation job and wait for it, so job routes have a finished id to read."""
+    response = await client.post(f"{MOUNT_PREFIX}/api/ai/jobs", json={"kind": "correlation", "ward_name": ward})
+    job_id = response.json()["id"]
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = (await client.get(f"{MOUNT_PREFIX}/api/ai/jobs/{job_id}")).json()
+        if status.get("finished_at"):
+            break
+        await asyncio.sleep(0.1)
+    return job_id
+
+
+async def run(n_requests: int = 100, concurrency: int = DEFAULT_CONCURRENCY, base_url: str = None, only: str = None) -> dict:
+    """Run every scenario; returns ``{"routes": [...], "uncovered": [...]}``."""
+    ward = ward_names(1)[0]
+
+    async def run_all(client):
+        job_id = await _prepare_job(client, ward)
+        scenarios = build_scenarios(ward, job_id)
+        results = []
+        for scenario in scenarios:
+            if only and only not in scenario.name:
+                continue
+            count = min(n_requests, scenario.requests) if scenario.requests else n_requests
+            result = await run_scenario(client, scenario, count, concurrency)
+            print(f"  {result['route']:<45} {result['rps']:8.1f} req/s  p50 {result['p50_ms']:8.2f} ms  "
+                  f"p95 {result['p95_ms']:8.2f} ms  errors {result['errors']}")
+            results.append(result)
+        return {"routes": results, "uncovered": uncovered_routes(scenarios)}
+
+    if base_url:
+        async with httpx.AsyncClient(base_url=base_url, timeout=120.0) as client:
+            return await run_all(client)
+
+    from main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120.0) as client:
+            return await run_all(client)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100, help="requests per route")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="in-flight requests per route")
+    parser.add_argument("--base-url", help="target a running server instead of the in-process app")
+    parser.add_argument("--only", help="only run routes whose 'METHOD path' contains this")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.requests, args.concurrency, args.base_url, args.only))
+    if results["uncovered"]:
+        print(f"⚠️  Routes without a load-test scenario: {', '.join(results['uncovered'])}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    failing = failing_routes(results["routes"])
+    if failing:
+        print(f"⚠️  Routes with unexpected responses: {', '.join(failing)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""Micro-benchmarks for AIService, LODConverter and OpenDataService.
+
+Inputs are synthetic and fixed-seed; no database is needed. OpenDataService
+upstreams (OpenAQ, OpenWeather, Overpass) are answered by an in-memory
+``httpx.MockTransport``, so fetch timings measure our own parsing and
+orchestration rather than the network. Run from ``backend/``::
+
+    python -m benchmarks.micro --min-time 0.5
+"""
+
+import argparse
+import asyncio
+import functools
+import json
+import time
+import types
+
+import httpx
+import numpy as np
+
+from app.services import open_data_service
+from app.services.ai_service import AIService
+from app.services.lod_converter import LODConverter
+from app.services.open_data_service import OpenDataService
+
+
+def measure(fn, min_time: float = 0.2, repeat: int = 5) -> dict:
+    """Per-call timings: calls per round are scaled so each round lasts ~``min_time / repeat``."""
+    fn()
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time / repeat or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / repeat / 10 else 2
+
+    rounds = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        rounds.append((time.perf_counter() - start) / number)
+    rounds_us = np.array(rounds) * 1e6
+    return {
+        "calls_per_round": number,
+        "rounds": repeat,
+        "min_us": round(float(rounds_us.min()), 3),
+        "median_us": round(float(np.median(rounds_us)), 3),
+        "max_us": round(float(rounds_us.max()), 3),
+    }
+
+
+# -- synthetic inputs --------------------------------------------------------
+
+
+def _readings(rng, n: int) -> list:
+    return [
+        {"id": i, "ward_name": f"Phường {i % 30:03d}", "aqi": float(a), "pm25": float(a * 0.4), "pm10": float(a * 0.7),
+         "latitude": 21.0 + i * 1e-5, "longitude": 105.8 + i * 1e-5, "measurement_time": "2024-05-01T08:00:00"}
+        for i, a in enumerate(rng.normal(90, 25, n))
+    ]
+
+
+def _correlation_rows(rng, n: int) -> list:
+    aqi = rng.normal(90, 25, n)
+    score = 0.8 - 0.002 * aqi + rng.normal(0, 0.05, n)
+    renewable = rng.uniform(0, 40, n)
+    return [
+        {"ward_name": f"Phường {i % 120:03d}", "aqi": float(a), "avg_score": float(s), "renewable_percentage": float(r)}
+        for i, (a, s, r) in enumerate(zip(aqi, score, renewable))
+    ]
+
+
+def _wards(rng, n: int) -> list:
+    return [
+        {"name": f"Phường {i:03d}", "aqi": float(rng.normal(90, 25)), "avg_school_score": float(rng.uniform(0.5, 0.9)),
+         "renewable_energy": float(rng.uniform(0, 40)), "num_schools": int(rng.integers(1, 40)),
+         "energy_usage_kw": float(rng.uniform(500, 5000))}
+        for i in range(n)
+    ]
+
+
+def _aligned_by_ward(rng, n_wards: int, samples: int) -> dict:
+    per_ward = {}
+    for w in range(n_wards):
+        school_aqi = rng.normal(90, 25, samples)
+        energy_aqi = rng.normal(90, 25, samples)
+        per_ward[f"Phường {w:03d}"] = {
+            "school_aqi": school_aqi,
+            "school_score": 0.8 - 0.002 * school_aqi + rng.normal(0, 0.05, samples),
+            "energy_aqi": energy_aqi,
+            "energy_renewable": rng.uniform(0, 40, samples),
+        }
+    return per_ward
+
+
+# -- stubbed upstreams -------------------------------------------------------
+
+
+def _upstream_payloads(rng) -> dict:
+    locations = [
+        {"id": i, "city": "Hanoi", "aqi": float(a), "coordinates": {"latitude": 21.0, "longitude": 105.8},
+         "measurements": [{"parameter": "pm25", "value": float(a * 0.4)}]}
+        for i, a in enumerate(rng.normal(90, 25, 100))
+    ]
+    weather = {"main": {"temp": 29.5, "humidity": 78, "pressure": 1008}, "wind": {"speed": 3.1},
+               "coord": {"lat": 21.03, "lon": 105.85}, "name": "Hanoi",
+               "weather": [{"main": "Haze", "description": "haze"}]}
+    schools = {"elements": [
+        {"type": "node", "id": i, "lat": 21.0 + i * 1e-4, "lon": 105.8 + i * 1e-4,
+         "tags": {"amenity": "school", "name": f"Trường {i}"}}
+        for i in range(500)
+    ]}
+    return {"locations": {"results": locations}, "weather": weather, "interpreter": schools}
+
+
+def stub_upstreams(payloads: dict) -> None:
+    """Point OpenDataService's httpx clients at canned responses keyed by the last path segment."""
+    bodies = {key: json.dumps(value).encode() for key, value in payloads.items()}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        body = bodies.get(request.url.path.rstrip("/").rsplit("/", 1)[-1])
+        if body is None:
+            return httpx.Response(404)
+        return httpx.Response(200, content=body, headers={"content-type": "application/json"})
+
+    transport = httpx.MockTransport(handler)
+    open_data_service.httpx = types.SimpleNamespace(
+        AsyncClient=functools.partial(httpx.AsyncClient, transport=transport),
+    )
+
+
+# -- benchmarks --------------------------------------------------------------
+
+
+def build_benchmarks(seed: int = 42) -> dict:
+    """Name -> zero-argument callable."""
+    rng = np.random.default_rng(seed)
+    readings = _readings(rng, 200)
+    reading = readings[0]
+    rows = _correlation_rows(rng, 12_000)
+    ward_rows = rows[:40]
+    wards = _wards(rng, 120)
+    aligned = _aligned_by_ward(rng, 20, 40)
+    scenarios = [{"name": "trees", "actions": {"tree_planting": 1000.0}},
+                 {"name": "solar", "actions": {"solar_installation": 50.0, "green_education": 10.0}}]
+    payloads = _upstream_payloads(rng)
+    stub_upstreams(payloads)
+    location = payloads["locations"]["results"][0]
+    loop = asyncio.new_event_loop()
+
+    def fetch_all():
+        return loop.run_until_complete(OpenDataService.fetch_all_data("Hanoi"))
+
+    return {
+        "AIService.analyze_correlation": lambda: AIService.analyze_correlation(ward_rows, ward_rows, ward_rows, "Phường 000"),
+        "AIService.analyze_correlation_batch[12k rows]": lambda: AIService.analyze_correlation_batch(
+            *AIService.build_correlation_matrix(rows)),
+        "AIService.cluster_wards[120, uncached]": lambda: AIService.cluster_wards(wards, use_cache=False),
+        "AIService.predict_impact": lambda: AIService.predict_impact("tree_planting", 120, 500.0),
+        "AIService.simulate_scenarios[2k draws]": lambda: AIService.simulate_scenarios(scenarios, wards, 2000, 1),
+        "AIService.correlation_significance[20 wards, 500 it]": lambda: AIService.correlation_significance(
+            aligned, 500, 1),
+        "LODConverter.air_quality_to_json_ld": lambda: LODConverter.air_quality_to_json_ld(reading),
+        "LODConverter.to_jsonld": lambda: LODConverter.to_jsonld(reading),
+        "LODConverter.to_rdf": lambda: LODConverter.to_rdf(reading),
+        "LODConverter.to_rdf_xml": lambda: LODConverter.to_rdf_xml(reading),
+        "LODConverter.to_jsonld[200 readings]": lambda: [LODConverter.to_jsonld(r) for r in readings],
+        "OpenDataService.transform_openaq_to_schema": lambda: OpenDataService.transform_openaq_to_schema(location),
+        "OpenDataService.transform_openweather_to_schema": lambda: OpenDataService.transform_openweather_to_schema(
+            payloads["weather"], "Hanoi"),
+        "OpenDataService.fetch_all_data[stubbed]": fetch_all,
+    }
+
+
+def run(min_time: float = 0.2, only: str = None) -> list:
+    results = []
+    for name, fn in build_benchmarks().items():
+        if only and only not in name:
+            continue
+        stats = measure(fn, min_time)
+        print(f"  {name:<55} median {stats['median_us']:12.1f} µs  min {stats['min_us']:12.1f} µs")
+        results.append({"name": name, **stats})
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds spent measuring each benchmark")
+    parser.add_argument("--only", help="only run benchmarks whose name contains this")
+    parser.add_argument("--output", help="write results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.min_time, args.only)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""Full benchmark suite: seed, load test every router, micro-benchmark services.
+
+Writes one JSON document with run metadata so results from different
+commits or machines can be diffed; ``--compare`` checks a run against a
+baseline. The exit status is non-zero on regressions or when any route
+answers with an unexpected status, including pool timeouts. The database defaults to a
+local SQLite file and never to ``DATABASE_URL``, so the suite cannot seed
+a real database by accident. Run from ``backend/``::
+
+    python -m benchmarks.run_suite --scale medium --output bench-results.json
+    python -m benchmarks.run_suite --skip-seed --compare bench-results.json --threshold 0.15
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+DEFAULT_DATABASE_URL = "sqlite:///./bench.db"
+
+
+def _git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def metadata(args) -> dict:
+    from sqlalchemy.engine import make_url
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_revision": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "database": make_url(args.database_url).get_backend_name(),
+        "scale": args.scale,
+        "requests_per_route": args.requests,
+        "concurrency": args.concurrency,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list:
+    """Regressions beyond ``threshold`` (relative) on route p95 and micro-benchmark medians."""
+    regressions = []
+    pairs = (
+        ("load", "route", "p95_ms"),
+        ("micro", "name", "median_us"),
+    )
+    for section, key, metric in pairs:
+        before = {entry[key]: entry[metric] for entry in baseline.get(section, [])}
+        for entry in current.get(section, []):
+            old = before.get(entry[key])
+            if old and entry[metric] > old * (1 + threshold):
+                regressions.append({
+                    "section": section, "name": entry[key], "metric": metric,
+                    "baseline": old, "current": entry[metric], "change": round(entry[metric] / old - 1, 3),
+                })
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=DEFAULT_DATABASE_URL)
+    parser.add_argument("--scale", default="small", help="seed preset: small, medium or large")
+    parser.add_argument("--skip-seed", action="store_true", help="reuse an already seeded database")
+    parser.add_argument("--requests", type=int, default=100, help="requests per route")
+    parser.add_argument("--concurrency", type=int, help="in-flight requests per route (default: load_test.DEFAULT_CONCURRENCY)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per micro-benchmark")
+    parser.add_argument("--skip-load", action="store_true")
+    parser.add_argument("--skip-micro", action="store_true")
+    parser.add_argument("--output", default="bench-results.json")
+    parser.add_argument("--compare", help="baseline results JSON")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    # Settings are read at import time, so configure the environment before any app import
+    os.environ["DATABASE_URL"] = args.database_url
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("SPARQL_STORE_DIR", "bench-data/lod_store")
+
+    from app.db.base import engine
+    from benchmarks import load_test, micro, seed
+
+    args.concurrency = args.concurrency or load_test.DEFAULT_CONCURRENCY
+    results = {"meta": metadata(args)}
+    if not args.skip_seed:
+        print(f"Seeding ({args.scale})...")
+        results["seed"] = seed.seed(engine, args.scale, reset=True)
+    if not args.skip_load:
+        print("Load testing routes...")
+        load = asyncio.run(load_test.run(args.requests, args.concurrency))
+        results["load"] = load["routes"]
+        results["uncovered_routes"] = load["uncovered"]
+        results["failing_routes"] = load_test.failing_routes(load["routes"])
+        if load["uncovered"]:
+            print(f"⚠️  Routes without a load-test scenario: {', '.join(load['uncovered'])}")
+    if not args.skip_micro:
+        print("Micro-benchmarks...")
+        results["micro"] = micro.run(args.min_time)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            results["regressions"] = compare(results, json.load(f), args.threshold)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"Results written to {args.output}")
+
+    for regression in results.get("regressions", []):
+        print(f"⚠️  {regression['name']}: {regression['metric']} {regression['baseline']} -> "
+              f"{regression['current']} ({regression['change']:+.0%})")
+    if results.get("failing_routes"):
+        print(f"⚠️  Routes with unexpected responses: {', '.join(results['failing_routes'])}")
+    if results.get("regressions") or results.get("failing_routes"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
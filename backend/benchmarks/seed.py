@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""Seed a benchmark database with synthetic but realistically sized data.
+
+Rows are generated with a fixed seed so runs are comparable, and inserted
+with bulk ``executemany`` batches. Run from ``backend/``::
+
+    DATABASE_URL=sqlite:///./bench.db python -m benchmarks.seed --scale medium --reset
+"""
+
+import argparse
+import time
+from datetime import date, datetime, timedelta
+
+import numpy as np
+from sqlalchemy import text
+
+# Row counts per table for each preset
+SCALES = {
+    "small": {"wards": 30, "readings": 20_000, "schools": 2_000, "energy": 2_000, "weather": 5_000,
+              "users": 500, "feedback": 5_000, "courses": 4_000},
+    "medium": {"wards": 120, "readings": 500_000, "schools": 20_000, "energy": 20_000, "weather": 100_000,
+               "users": 5_000, "feedback": 50_000, "courses": 40_000},
+    "large": {"wards": 300, "readings": 3_000_000, "schools": 50_000, "energy": 50_000, "weather": 500_000,
+              "users": 20_000, "feedback": 300_000, "courses": 100_000},
+}
+
+BATCH_SIZE = 10_000
+HISTORY_DAYS = 90
+# Hanoi bounding box
+LAT_RANGE = (20.95, 21.10)
+LNG_RANGE = (105.75, 105.90)
+
+BENCH_PASSWORD = "bench-password"
+BENCH_EMAIL = "bench-user-0@example.org"
+
+_FEEDBACK_TEMPLATES = (
+    "Không khí ở {ward} rất ô nhiễm vào buổi sáng",
+    "Cần thêm cây xanh gần trường học tại {ward}",
+    "Rác thải chưa được thu gom đúng giờ ở {ward}",
+    "Đề xuất lắp pin mặt trời cho nhà văn hóa {ward}",
+    "Tiếng ồn giao thông ở {ward} quá lớn",
+    "Khói bụi công trình xây dựng gần {ward}",
+)
+_COURSE_TYPES = ("Recycling", "Solar", "TreePlanting", "WaterSaving")
+
+
+def ward_names(n: int) -> list:
+    return [f"Phường {i:03d}" for i in range(n)]
+
+
+def _insert(conn, table, rows) -> int:
+    count = 0
+    for start in range(0, len(rows), BATCH_SIZE):
+        batch = rows[start:start + BATCH_SIZE]
+        conn.execute(table.insert(), batch)
+        count += len(batch)
+    return count
+
+
+def _coordinates(rng, n: int) -> tuple:
+    return rng.uniform(*LAT_RANGE, n).round(6), rng.uniform(*LNG_RANGE, n).round(6)
+
+
+def _timestamps(rng, n: int, now: datetime) -> list:
+    offsets = np.sort(rng.uniform(0, HISTORY_DAYS * 86400, n))[::-1]
+    return [now - timedelta(seconds=float(s)) for s in offsets]
+
+
+def _air_quality(rng, n: int, wards: list, now: datetime) -> list:
+    # A fixed set of stations per ward, each reporting repeatedly
+    n_stations = max(len(wards) * 4, 1)
+    station_ward = rng.integers(0, len(wards), n_stations)
+    station_lat, station_lng = _coordinates(rng, n_stations)
+    station_base = rng.normal(90, 30, n_stations).clip(15, 250)
+    station = rng.integers(0, n_stations, n)
+    aqi = (station_base[station] + rng.normal(0, 15, n)).clip(5, 500)
+    pm25 = aqi * rng.uniform(0.35, 0.5, n)
+    times = _timestamps(rng, n, now)
+    return [
+        {
+            "ward_name": wards[station_ward[s]], "lat": float(station_lat[s]), "lng": float(station_lng[s]),
+            "aqi": float(a), "pm25": float(p), "pm10": float(p * 1.6), "no2": float(a * 0.3),
+            "so2": float(a * 0.08), "co": float(a * 0.01), "is_anomaly": False, "updated_at": t,
+        }
+        for s, a, p, t in zip(station.tolist(), aqi.tolist(), pm25.tolist(), times)
+    ]
+
+
+def _schools(rng, n: int, wards: list, now: datetime) -> list:
+    ward = rng.integers(0, len(wards), n)
+    lat, lng = _coordinates(rng, n)
+    score = rng.normal(0.72, 0.1, n).clip(0.2, 1.0)
+    programs = rng.integers(0, 12, n)
+    saving = rng.uniform(0, 80, n)
+    times = _timestamps(rng, n, now)
+    return [
+        {
+            "school_name": f"Trường {i:06d} {wards[w]}", "ward_name": wards[w], "lat": float(la), "lng": float(ln),
+            "green_programs_count": int(p), "avg_score": float(s), "energy_saving_kw": float(e), "created_at": t,
+        }
+        for i, (w, la, ln, s, p, e, t) in enumerate(zip(
+            ward.tolist(), lat.tolist(), lng.tolist(), score.tolist(), programs.tolist(), saving.tolist(), times))
+    ]
+
+
+def _energy(rng, n: int, wards: list, now: datetime) -> list:
+    ward = rng.integers(0, len(wards), n)
+    lat, lng = _coordinates(rng, n)
+    usage = rng.uniform(50, 2000, n)
+    solar = usage * rng.uniform(0, 0.4, n)
+    times = _timestamps(rng, n, now)
+    return [
+        {"ward_name": wards[w], "lat": float(la), "lng": float(ln),
+         "solar_potential_kw": float(s), "current_usage_kw": float(u), "updated_at": t}
+        for w, la, ln, s, u, t in zip(ward.tolist(), lat.tolist(), lng.tolist(), solar.tolist(), usage.tolist(), times)
+    ]
+
+
+def _weather(rng, n: int, wards: list, now: datetime) -> list:
+    ward = rng.integers(0, len(wards), n)
+    lat, lng = _coordinates(rng, n)
+    temperature = rng.normal(27, 5, n)
+    humidity = rng.uniform(45, 95, n)
+    wind = rng.gamma(2.0, 1.5, n)
+    times = _timestamps(rng, n, now)
+    return [
+        {"ward_name": wards[w], "lat": float(la), "lng": float(ln), "temperature": float(te),
+         "humidity": float(h), "wind_speed": float(wi), "updated_at": t}
+        for w, la, ln, te, h, wi, t in zip(
+            ward.tolist(), lat.tolist(), lng.tolist(), temperature.tolist(), humidity.tolist(), wind.tolist(), times)
+    ]
+
+
+def _users(n: int, password_hash: str, now: datetime) -> list:
+    roles = ("citizen", "citizen", "citizen", "school", "admin")
+    return [
+        {"full_name": f"Bench User {i}", "email": f"bench-user-{i}@example.org",
+         "password_hash": password_hash, "role": roles[i % len(roles)], "created_at": now}
+        for i in range(n)
+    ]
+
+
+def _feedback(rng, n: int, n_users: int, wards: list, now: datetime) -> list:
+    ward = rng.integers(0, len(wards), n)
+    user = rng.integers(1, n_users + 1, n)
+    template = rng.integers(0, len(_FEEDBACK_TEMPLATES), n)
+    times = _timestamps(rng, n, now)
+    return [
+        {"user_id": int(u), "ward_name": wards[w],
+         "message": _FEEDBACK_TEMPLATES[k].format(ward=wards[w]), "created_at": t}
+        for w, u, k, t in zip(ward.tolist(), user.tolist(), template.tolist(), times)
+    ]
+
+
+def _courses(rng, n: int, n_schools: int, now: datetime) -> list:
+    school = rng.integers(1, n_schools + 1, n)
+    kind = rng.integers(0, len(_COURSE_TYPES), n)
+    students = rng.integers(10, 600, n)
+    start = rng.integers(0, 365, n)
+    today = date.today()
+    return [
+        {"school_id": int(s), "title": f"{_COURSE_TYPES[k]} course {i}", "description": "Synthetic benchmark course",
+         "type": _COURSE_TYPES[k], "students": int(st), "start_date": today - timedelta(days=int(d)),
+         "end_date": today - timedelta(days=int(d)) + timedelta(days=60), "created_at": now}
+        for i, (s, k, st, d) in enumerate(zip(school.tolist(), kind.tolist(), students.tolist(), start.tolist()))
+    ]
+
+
+def is_seeded(engine) -> bool:
+    from sqlalchemy import inspect, select, func
+    from app.models import AirQuality
+
+    if not inspect(engine).has_table(AirQuality.__tablename__):
+        return False
+    with engine.connect() as conn:
+        return bool(conn.execute(select(func.count()).select_from(AirQuality.__table__)).scalar())
+
+
+def seed(engine, scale: str = "small", seed: int = 42, reset: bool = False, **overrides) -> dict:
+    """Migrate the schema and insert one preset's worth of rows; returns counts and timings."""
+    from app.db.base import Base
+    from app.db.migrations import VERSION_TABLE, upgrade
+    from app.models import AirQuality, CitizenFeedback, Course, EnergyData, School, User, WeatherData
+    from app.services.password_hashing import password_hasher
+
+    counts = {**SCALES[scale], **{k: v for k, v in overrides.items() if v is not None}}
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {VERSION_TABLE}"))
+    upgrade(engine)
+
+    rng = np.random.default_rng(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    wards = ward_names(counts["wards"])
+    password_hash = password_hasher.hash_blocking(BENCH_PASSWORD)
+
+    plan = (
+        (AirQuality, lambda: _air_quality(rng, counts["readings"], wards, now)),
+        (School, lambda: _schools(rng, counts["schools"], wards, now)),
+        (EnergyData, lambda: _energy(rng, counts["energy"], wards, now)),
+        (WeatherData, lambda: _weather(rng, counts["weather"], wards, now)),
+        (User, lambda: _users(counts["users"], password_hash, now)),
+        (CitizenFeedback, lambda: _feedback(rng, counts["feedback"], counts["users"], wards, now)),
+        (Course, lambda: _courses(rng, counts["courses"], counts["schools"], now)),
+    )
+    report = {"scale": scale, "seed": seed, "tables": {}}
+    for model, build in plan:
+        start = time.perf_counter()
+        rows = build()
+        with engine.begin() as conn:
+            inserted = _insert(conn, model.__table__, rows)
+        report["tables"][model.__tablename__] = {"rows": inserted, "seconds": round(time.perf_counter() - start, 3)}
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--readings", type=int, help="override the preset's air-quality row count")
+    parser.add_argument("--schools", type=int, help="override the preset's school count")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="drop all tables first")
+    args = parser.parse_args()
+
+    from app.db.base import engine
+
+    if is_seeded(engine) and not args.reset:
+        raise SystemExit("Database already has air-quality rows; pass --reset to reseed")
+    report = seed(engine, args.scale, args.seed, args.reset, readings=args.readings, schools=args.schools)
+    for table, stats in report["tables"].items():
+        print(f"  {table:<18} {stats['rows']:>10,} rows  {stats['seconds']:8.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,19 @@
 """GreenEduMap FastAPI Application."""
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.rate_limit import RateLimitMiddleware, rate_limit_metrics
+from app.core.metrics import MetricsMiddleware, RateLimitCollector, instrument_engine, render_metrics
+from app.core.query_monitor import QueryCountMiddleware, query_monitor
+from prometheus_client import REGISTRY
 from app.api.router import api_router
-from app.db.base import Base, engine
+from app.db.base import engine
+from app.db.migrations import check_schema
+from app.services.streaming_stats import correlation_stream
+from app.services.analysis_jobs import analysis_jobs
+from app.services.password_hashing import password_hasher
+from app.services.sparql_store import lod_store
 
 # Create FastAPI app
 app = FastAPI(
@@ -13,6 +22,15 @@ app = FastAPI(
     debug=settings.debug,
 )
 
+# Innermost, so only statements issued by route handlers are attributed to them
+if settings.query_monitor_enabled:
+    app.add_middleware(QueryCountMiddleware)
+    query_monitor.install(engine)
+
+# Rate limiting runs inside CORS so 429 responses still carry CORS headers
+if settings.rate_limit_enabled:
+    app.add_middleware(RateLimitMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -22,6 +40,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Outermost, so latency includes CORS and rate limiting and 429s are counted
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+    instrument_engine(engine)
+    REGISTRY.register(RateLimitCollector(rate_limit_metrics))
+
 # Include API routes
 app.include_router(api_router, prefix="/api")
 
@@ -39,18 +63,39 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "ok"}
 
+@app.get("/health/rate-limits")
+async def rate_limit_stats():
+    """Allowed / rejected request counts per rate limit rule."""
+    return rate_limit_metrics.snapshot()
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus metrics."""
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
+
 @app.on_event("startup")
 async def startup_event():
     """Startup event handler."""
     print("🚀 GreenEduMap API starting...")
-    # Create all database tables
-    Base.metadata.create_all(bind=engine)
-    print("✅ Database tables created/verified")
+    # Schema changes are applied by `python -m app.db.init_db`, not by each worker
+    if check_schema(engine):
+        print("✅ Database schema up to date")
+    # One elected worker journals new rows for the SPARQL store; each worker
+    # loads the graph on its first query
+    lod_store.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """Shutdown event handler."""
     print("👋 GreenEduMap API shutting down...")
+    lod_store.stop()
+    try:
+        correlation_stream.close()
+    except OSError as e:
+        print(f"⚠️  Correlation snapshot failed: {e}")
+    analysis_jobs.shutdown()
+    password_hasher.shutdown()
 
 if __name__ == "__main__":
     import uvicorn
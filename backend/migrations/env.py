@@ -0,0 +1,71 @@
+"""Alembic environment: runs migrations against the app's configured database."""
+
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.db.base import Base
+import app.models  # noqa: F401  (registers every table on Base.metadata)
+
+# Arbitrary key for pg_advisory_lock, so concurrent migrate runs queue instead of racing
+MIGRATION_LOCK_KEY = 727_1011
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name, disable_existing_loggers=False)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline() -> None:
+    """Emit SQL to stdout instead of executing it (``--sql``)."""
+    context.configure(
+        url=settings.database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        transaction_per_migration=True,
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def _run(connection) -> None:
+    postgres = connection.dialect.name == "postgresql"
+    if postgres:
+        # Give up on a lock instead of queueing live traffic behind an ALTER
+        connection.execute(text(f"SET lock_timeout = {int(settings.migration_lock_timeout_ms)}"))
+        connection.execute(text("SELECT pg_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY})
+        connection.commit()
+    try:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            transaction_per_migration=True,
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+        with context.begin_transaction():
+            context.run_migrations()
+    finally:
+        if postgres:
+            connection.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+            connection.commit()
+
+
+def run_migrations_online() -> None:
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+
+    from app.db.base import engine
+
+    with engine.connect() as connection:
+        _run(connection)
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
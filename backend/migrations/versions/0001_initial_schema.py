@@ -0,0 +1,151 @@
+"""Initial schema: the tables and indexes create_all built before migrations.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _id():
+    return sa.Column("id", sa.Integer(), primary_key=True)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "air_quality",
+        _id(),
+        sa.Column("ward_name", sa.String()),
+        sa.Column("lat", sa.Float()),
+        sa.Column("lng", sa.Float()),
+        sa.Column("aqi", sa.Float()),
+        sa.Column("pm25", sa.Float()),
+        sa.Column("pm10", sa.Float()),
+        sa.Column("no2", sa.Float()),
+        sa.Column("so2", sa.Float()),
+        sa.Column("co", sa.Float()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_air_quality_id", "air_quality", ["id"])
+    op.create_index("ix_air_quality_ward_name", "air_quality", ["ward_name"])
+
+    op.create_table(
+        "weather_data",
+        _id(),
+        sa.Column("ward_name", sa.String()),
+        sa.Column("lat", sa.Float()),
+        sa.Column("lng", sa.Float()),
+        sa.Column("temperature", sa.Float()),
+        sa.Column("humidity", sa.Float()),
+        sa.Column("wind_speed", sa.Float()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_weather_data_id", "weather_data", ["id"])
+    op.create_index("ix_weather_data_ward_name", "weather_data", ["ward_name"])
+
+    op.create_table(
+        "energy_data",
+        _id(),
+        sa.Column("ward_name", sa.String()),
+        sa.Column("lat", sa.Float()),
+        sa.Column("lng", sa.Float()),
+        sa.Column("solar_potential_kw", sa.Float()),
+        sa.Column("current_usage_kw", sa.Float()),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    op.create_index("ix_energy_data_id", "energy_data", ["id"])
+    op.create_index("ix_energy_data_ward_name", "energy_data", ["ward_name"])
+
+    op.create_table(
+        "schools",
+        _id(),
+        sa.Column("school_name", sa.String()),
+        sa.Column("ward_name", sa.String()),
+        sa.Column("lat", sa.Float()),
+        sa.Column("lng", sa.Float()),
+        sa.Column("green_programs_count", sa.Integer()),
+        sa.Column("avg_score", sa.Float()),
+        sa.Column("energy_saving_kw", sa.Float()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_schools_id", "schools", ["id"])
+    op.create_index("ix_schools_school_name", "schools", ["school_name"])
+
+    op.create_table(
+        "courses",
+        _id(),
+        sa.Column("school_id", sa.Integer(), sa.ForeignKey("schools.id")),
+        sa.Column("title", sa.String()),
+        sa.Column("description", sa.Text()),
+        sa.Column("type", sa.String()),
+        sa.Column("students", sa.Integer()),
+        sa.Column("start_date", sa.Date()),
+        sa.Column("end_date", sa.Date()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_courses_id", "courses", ["id"])
+    op.create_index("ix_courses_school_id", "courses", ["school_id"])
+
+    op.create_table(
+        "users",
+        _id(),
+        sa.Column("full_name", sa.String()),
+        sa.Column("email", sa.String()),
+        sa.Column("password_hash", sa.String()),
+        sa.Column("role", sa.String()),
+        sa.Column("avatar_url", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_full_name", "users", ["full_name"])
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "citizen_feedback",
+        _id(),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id")),
+        sa.Column("ward_name", sa.String()),
+        sa.Column("message", sa.Text()),
+        sa.Column("image_url", sa.String()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_citizen_feedback_id", "citizen_feedback", ["id"])
+    op.create_index("ix_citizen_feedback_user_id", "citizen_feedback", ["user_id"])
+
+    op.create_table(
+        "ai_analysis",
+        _id(),
+        sa.Column("ward_name", sa.String()),
+        sa.Column("corr_env_edu", sa.Float()),
+        sa.Column("corr_energy", sa.Float()),
+        sa.Column("recommendation", sa.Text()),
+        sa.Column("timestamp", sa.DateTime()),
+    )
+    op.create_index("ix_ai_analysis_id", "ai_analysis", ["id"])
+    op.create_index("ix_ai_analysis_ward_name", "ai_analysis", ["ward_name"])
+
+    op.create_table(
+        "green_actions",
+        _id(),
+        sa.Column("ward_name", sa.String()),
+        sa.Column("action", sa.Text()),
+        sa.Column("impact_score", sa.Float()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_green_actions_id", "green_actions", ["id"])
+    op.create_index("ix_green_actions_ward_name", "green_actions", ["ward_name"])
+
+
+def downgrade() -> None:
+    for table in (
+        "green_actions", "ai_analysis", "citizen_feedback", "users", "courses",
+        "schools", "energy_data", "weather_data", "air_quality",
+    ):
+        op.drop_table(table)
@@ -0,0 +1,59 @@
+"""AQI forecast tables: stored forecasts and per-ward smoothing state.
+
+Databases adopted at the baseline may already have these tables from the
+old create_all startup, so existing ones are left alone.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    if "aqi_forecasts" not in tables:
+        op.create_table(
+            "aqi_forecasts",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("ward_name", sa.String()),
+            sa.Column("target_time", sa.DateTime()),
+            sa.Column("horizon_hours", sa.Integer()),
+            sa.Column("aqi", sa.Float()),
+            sa.Column("aqi_lower", sa.Float()),
+            sa.Column("aqi_upper", sa.Float()),
+            sa.Column("generated_at", sa.DateTime()),
+        )
+        op.create_index("ix_aqi_forecasts_id", "aqi_forecasts", ["id"])
+        op.create_index("ix_aqi_forecasts_ward_name", "aqi_forecasts", ["ward_name"])
+
+    if "forecast_states" not in tables:
+        op.create_table(
+            "forecast_states",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("ward_name", sa.String()),
+            sa.Column("level", sa.Float()),
+            sa.Column("trend", sa.Float()),
+            sa.Column("alpha", sa.Float()),
+            sa.Column("beta", sa.Float()),
+            sa.Column("sigma", sa.Float()),
+            sa.Column("last_bucket", sa.Integer()),
+            sa.Column("bucket_sum", sa.Float()),
+            sa.Column("bucket_count", sa.Integer()),
+            sa.Column("n_obs", sa.Integer()),
+            sa.Column("updated_at", sa.DateTime()),
+        )
+        op.create_index("ix_forecast_states_id", "forecast_states", ["id"])
+        op.create_index("ix_forecast_states_ward_name", "forecast_states", ["ward_name"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table("forecast_states")
+    op.drop_table("aqi_forecasts")
@@ -0,0 +1,33 @@
+"""Anomaly flag and score on air quality readings.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases first created by the old create_all startup may already have them
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("air_quality")}
+    if "is_anomaly" in columns:
+        return
+    # Existing rows read as not anomalous through the server default
+    with op.batch_alter_table("air_quality") as batch:
+        batch.add_column(sa.Column("is_anomaly", sa.Boolean(), server_default=sa.false()))
+        batch.add_column(sa.Column("anomaly_score", sa.Float()))
+        batch.create_index("ix_air_quality_is_anomaly", ["is_anomaly"])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("air_quality") as batch:
+        batch.drop_index("ix_air_quality_is_anomaly")
+        batch.drop_column("anomaly_score")
+        batch.drop_column("is_anomaly")
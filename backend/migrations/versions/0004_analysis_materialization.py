@@ -0,0 +1,61 @@
+"""Materialized per-ward analysis: result source, batch upsert target and watermarks.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def _columns(inspector, table):
+    return {column["name"] for column in inspector.get_columns(table)}
+
+
+def upgrade() -> None:
+    # Databases adopted from the old create_all startup may have some of this already
+    inspector = sa.inspect(op.get_bind())
+    if "source" not in _columns(inspector, "ai_analysis"):
+        with op.batch_alter_table("ai_analysis") as batch:
+            batch.add_column(sa.Column("source", sa.String(), server_default="manual"))
+        # One materialized row per ward, the target of the batch upsert
+        op.create_index(
+            "uq_ai_analysis_batch_ward",
+            "ai_analysis",
+            ["ward_name"],
+            unique=True,
+            postgresql_where=sa.text("source = 'batch'"),
+            sqlite_where=sa.text("source = 'batch'"),
+        )
+
+    if "source" not in _columns(inspector, "green_actions"):
+        with op.batch_alter_table("green_actions") as batch:
+            batch.add_column(sa.Column("source", sa.String(), server_default="manual"))
+            batch.create_index("ix_green_actions_ward_source", ["ward_name", "source"])
+
+    if not inspector.has_table("analysis_watermarks"):
+        op.create_table(
+            "analysis_watermarks",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("ward_name", sa.String()),
+            sa.Column("input_watermark", sa.DateTime()),
+            sa.Column("computed_at", sa.DateTime()),
+        )
+        op.create_index("ix_analysis_watermarks_id", "analysis_watermarks", ["id"])
+        op.create_index("ix_analysis_watermarks_ward_name", "analysis_watermarks", ["ward_name"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_table("analysis_watermarks")
+    with op.batch_alter_table("green_actions") as batch:
+        batch.drop_index("ix_green_actions_ward_source")
+        batch.drop_column("source")
+    op.drop_index("uq_ai_analysis_batch_ward", table_name="ai_analysis")
+    with op.batch_alter_table("ai_analysis") as batch:
+        batch.drop_column("source")
@@ -0,0 +1,59 @@
+"""Accent-insensitive full-text search index on citizen feedback (Postgres only).
+
+The index is built with CREATE INDEX CONCURRENTLY outside a transaction,
+so feedback inserts keep flowing while it builds. Other dialects use the
+in-process index in ``app.services.feedback_search`` and skip this step.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS unaccent")
+    # Immutable wrapper so unaccent() can be used in an index expression
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+        LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+        AS $$ SELECT public.unaccent('public.unaccent', $1) $$
+        """
+    )
+    with op.get_context().autocommit_block():
+        # An interrupted concurrent build leaves an invalid index that IF NOT EXISTS would keep
+        op.execute(
+            """
+            DO $$ BEGIN
+                IF EXISTS (
+                    SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+                    WHERE c.relname = 'ix_citizen_feedback_fts' AND NOT i.indisvalid
+                ) THEN
+                    DROP INDEX ix_citizen_feedback_fts;
+                END IF;
+            END $$
+            """
+        )
+        op.execute(
+            """
+            CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_citizen_feedback_fts ON citizen_feedback
+            USING GIN (to_tsvector('simple', f_unaccent(coalesce(ward_name, '') || ' ' || coalesce(message, ''))))
+            """
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_citizen_feedback_fts")
+    op.execute("DROP FUNCTION IF EXISTS f_unaccent(text)")
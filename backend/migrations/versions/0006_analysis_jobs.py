@@ -0,0 +1,33 @@
+"""Analysis job table, so job status and results are shared by every API worker.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "analysis_jobs",
+        sa.Column("id", sa.String(32), primary_key=True),
+        sa.Column("kind", sa.String()),
+        sa.Column("status", sa.String()),
+        sa.Column("result", sa.JSON()),
+        sa.Column("error", sa.Text()),
+        sa.Column("persisted", sa.JSON()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("finished_at", sa.DateTime()),
+    )
+    op.create_index("ix_analysis_jobs_created_at", "analysis_jobs", ["created_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("analysis_jobs")
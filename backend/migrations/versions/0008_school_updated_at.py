@@ -0,0 +1,29 @@
+"""Update timestamp on schools, so edits move the analysis input watermark.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    columns = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("schools")}
+    if "updated_at" in columns:
+        return
+    with op.batch_alter_table("schools") as batch:
+        batch.add_column(sa.Column("updated_at", sa.DateTime()))
+    # Existing schools were last changed no later than they were created, as far as anyone knows
+    op.execute("UPDATE schools SET updated_at = created_at")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("schools") as batch:
+        batch.drop_column("updated_at")
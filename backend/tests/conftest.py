@@ -0,0 +1,45 @@
+"""Shared test setup.
+
+Tests build their own throwaway SQLite engines; the app-wide engine only
+needs a URL, so a local file is used unless DATABASE_URL is set (as in CI).
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'greenedumap-test.db')}")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+# Modules that bind SessionLocal at import time, so each needs pointing at the test database
+SESSION_MODULES = (
+    "app.db.base",
+    "app.db",
+    "app.services.analysis_jobs",
+    "app.services.analysis_materializer",
+    "app.services.lod_stream",
+)
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    """A throwaway SQLite database with every table, also used wherever the app opens SessionLocal."""
+    import app.models  # noqa: F401  registers every table on Base.metadata
+    from app.db.base import Base
+
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False, "timeout": 30}
+    )
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+    for module in SESSION_MODULES:
+        monkeypatch.setattr(f"{module}.SessionLocal", factory)
+    yield factory
+    engine.dispose()
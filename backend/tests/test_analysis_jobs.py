@@ -0,0 +1,64 @@
+"""Analysis jobs: database-backed status and process pool recovery."""
+
+import os
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.core.process_pool import ProcessPool
+from app.services.analysis_jobs import JOB_FAILED, AnalysisJobManager, JobQueueFull
+
+
+def wait_finished(manager, job_id, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        status = manager.fetch_status(job_id)
+        if status["finished_at"] is not None:
+            return status
+        time.sleep(0.05)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_status_is_visible_to_other_workers(session_factory):
+    submitter = AnalysisJobManager(max_workers=1, max_pending=4, history=10)
+    other_worker = AnalysisJobManager(max_workers=1, max_pending=4, history=10)
+    try:
+        with session_factory() as db:
+            job_id = submitter.submit(db, "clustering", {"wards": [], "n_clusters": 2})
+        assert other_worker.fetch_status(job_id)["status"] in ("queued", "running", JOB_FAILED)
+
+        wait_finished(submitter, job_id)
+        status = other_worker.fetch_status(job_id)
+        assert status["status"] == JOB_FAILED
+        assert status["error"] == "No data provided"
+        assert status["result"]["clusters"] == {}
+    finally:
+        submitter.shutdown()
+        other_worker.shutdown()
+
+
+def test_pending_limit_and_shutdown_fail_unfinished_jobs(session_factory):
+    manager = AnalysisJobManager(max_workers=1, max_pending=1, history=10)
+    manager._pool.submit = lambda fn, *args: Future()  # never finishes
+    with session_factory() as db:
+        job_id = manager.submit(db, "clustering", {"wards": []})
+        with pytest.raises(JobQueueFull):
+            manager.submit(db, "clustering", {"wards": []})
+
+    manager.shutdown()
+    status = manager.fetch_status(job_id)
+    assert status["status"] == JOB_FAILED
+    assert status["error"] == "server shut down"
+
+
+def test_process_pool_is_replaced_after_a_worker_crash():
+    pool = ProcessPool(max_workers=1)
+    try:
+        with pytest.raises(BrokenProcessPool):
+            pool.submit(os._exit, 1).result(timeout=60)
+        assert pool.submit(abs, -3).result(timeout=60) == 3
+        assert pool.restarts == 1
+    finally:
+        pool.shutdown()
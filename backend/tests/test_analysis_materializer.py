@@ -0,0 +1,72 @@
+"""Batch AI analysis: multi-row upserts and per-ward input watermarks."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.models import AIAnalysis, AirQuality, AnalysisWatermark, GreenAction, School
+from app.services.analysis_materializer import SOURCE_BATCH, AnalysisMaterializer
+
+
+@pytest.fixture
+def db(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "lod_commit_lag_seconds", 0)
+    with session_factory() as session:
+        yield session
+
+
+def add(db, *rows):
+    db.add_all(rows)
+    db.commit()
+
+
+def reading(ward, aqi, age_seconds=600):
+    return AirQuality(ward_name=ward, lat=10.0, lng=106.0, aqi=aqi,
+                      updated_at=datetime.utcnow() - timedelta(seconds=age_seconds))
+
+
+def test_runs_upsert_one_row_per_ward(db):
+    add(db, reading("Phường 1", 180), reading("Phường 2", 40),
+        School(school_name="A", ward_name="Phường 1", lat=10.0, lng=106.0, avg_score=6.0))
+
+    assert AnalysisMaterializer.run(db)["wards"] == 2
+    actions = db.query(GreenAction).filter(GreenAction.source == SOURCE_BATCH).count()
+    assert AnalysisMaterializer.run(db, force=True)["wards"] == 2
+
+    rows = db.query(AIAnalysis).filter(AIAnalysis.source == SOURCE_BATCH).all()
+    assert sorted(row.ward_name for row in rows) == ["Phường 1", "Phường 2"]
+    assert db.query(GreenAction).filter(GreenAction.source == SOURCE_BATCH).count() == actions
+    assert db.query(AnalysisWatermark).count() == 2
+
+
+def test_unchanged_wards_are_skipped_and_new_data_recomputes_its_ward(db):
+    add(db, reading("Phường 1", 80), reading("Phường 2", 40))
+    AnalysisMaterializer.run(db)
+    assert AnalysisMaterializer.run(db) == {"wards": 0, "ai_analysis": 0, "green_actions": 0, "skipped": 2}
+
+    add(db, reading("Phường 2", 60, age_seconds=0))
+    assert AnalysisMaterializer.run(db)["wards"] == 1
+    assert AnalysisMaterializer.stale_wards(db, AnalysisMaterializer.input_watermarks(db)) == []
+
+
+def test_school_edits_move_the_watermark(db):
+    school = School(school_name="A", ward_name="Phường 1", lat=10.0, lng=106.0, avg_score=6.0)
+    add(db, school)
+    AnalysisMaterializer.run(db)
+
+    school.avg_score = 8.0
+    db.commit()
+    assert AnalysisMaterializer.stale_wards(db, AnalysisMaterializer.input_watermarks(db)) == ["Phường 1"]
+
+
+def test_rows_committed_late_within_the_commit_lag_are_not_skipped(db, monkeypatch):
+    monkeypatch.setattr(settings, "lod_commit_lag_seconds", 30)
+    add(db, reading("Phường 1", 80, age_seconds=5))
+    AnalysisMaterializer.run(db)
+    stored = db.query(AnalysisWatermark.input_watermark).scalar()
+    assert stored <= datetime.utcnow() - timedelta(seconds=29)
+
+    # Stamped before the newest reading, but only committed now
+    add(db, reading("Phường 1", 300, age_seconds=20))
+    assert AnalysisMaterializer.run(db)["wards"] == 1
@@ -0,0 +1,48 @@
+"""Station anomaly detector: seeding, re-seeding and station matching."""
+
+import pytest
+
+from app.api.endpoints.environment import _near
+from app.models import AirQuality
+from app.services.anomaly_detection import RobustAnomalyDetector, station_key
+
+
+def detector(**kwargs):
+    return RobustAnomalyDetector(window=8, threshold=5.0, min_samples=4, min_scale=1.0, **kwargs)
+
+
+def test_seed_replaces_the_window_and_expires():
+    anomalies = detector(reseed_seconds=3600)
+    key = station_key("Phường 1", 10.77691, 106.70089)
+    assert anomalies.needs_seed(key)
+
+    anomalies.seed(key, [300, 310, 305, 300])
+    anomalies.seed(key, [50, 52, 48, 50])  # a fresh seed does not keep the old values
+    assert not anomalies.needs_seed(key)
+    assert anomalies.check(key, 51) == (pytest.approx(0.6745, abs=1e-3), False)
+    assert anomalies.check(key, 300)[1] is True
+
+    assert detector(reseed_seconds=0).needs_seed(key) is True
+
+
+def test_history_query_matches_the_rounded_station(session_factory):
+    with session_factory() as db:
+        db.add_all(
+            [
+                AirQuality(ward_name="Phường 1", lat=10.77691, lng=106.70089, aqi=50),
+                AirQuality(ward_name="Phường 1", lat=10.776949, lng=106.700851, aqi=51),
+                AirQuality(ward_name="Phường 1", lat=10.77702, lng=106.70089, aqi=90),
+                AirQuality(ward_name="Phường 1", lat=None, lng=None, aqi=70),
+            ]
+        )
+        db.commit()
+
+        def history(lat, lng):
+            ward_name, lat, lng = station_key("Phường 1", lat, lng)
+            rows = db.query(AirQuality.aqi).filter(
+                AirQuality.ward_name == ward_name, _near(AirQuality.lat, lat), _near(AirQuality.lng, lng)
+            )
+            return sorted(aqi for (aqi,) in rows)
+
+        assert history(10.7769, 106.7009) == [50, 51]
+        assert history(None, None) == [70]
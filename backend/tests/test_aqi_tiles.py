@@ -0,0 +1,41 @@
+"""AQI tile cache: ingest updates only the tiles around the changed station."""
+
+import math
+
+import numpy as np
+
+from app.services import aqi_raster
+from app.services.aqi_raster import AQITileCache
+
+Z = 12
+HCMC = (10.7769, 106.7009)
+HANOI = (21.0285, 105.8542)
+
+
+def tile_of(lat, lng, z=Z):
+    n = 2**z
+    x = int((lng + 180) / 360 * n)
+    y = int((1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2 * n)
+    return z, x, y
+
+
+def test_observe_re_renders_only_nearby_tiles(monkeypatch):
+    loads = []
+    stations = np.array([[*HCMC, 80.0], [*HANOI, 120.0]])
+    monkeypatch.setattr(aqi_raster.AQIRaster, "latest_stations", lambda db: loads.append(1) or stations)
+    tiles = AQITileCache(max_tiles=16, refresh_seconds=3600)
+
+    hcmc_tile, _ = tiles.get_tile(None, *tile_of(*HCMC), fmt="json")
+    tiles.get_tile(None, *tile_of(*HANOI), fmt="json")
+
+    tiles.observe(HCMC[0], HCMC[1], 150.0)
+    tiles.observe(10.80, 106.65, 60.0)  # a new station nearby
+    tiles.get_tile(None, *tile_of(*HANOI), fmt="json")
+    assert tiles.stats()["hits"] == 1
+
+    updated, _ = tiles.get_tile(None, *tile_of(*HCMC), fmt="json")
+    assert updated != hcmc_tile
+    assert tiles.stats()["misses"] == 3
+    assert len(loads) == 1
+    assert stations[0, 2] == 80.0  # the loaded array is never modified in place
+    assert len(tiles.stations(None)) == 3
@@ -0,0 +1,76 @@
+"""Incremental ward clustering: change tracking, per-k models and minimum rows."""
+
+import numpy as np
+import pytest
+
+from app.services.ai_service import AIService
+from app.services.clustering import IncrementalClusterer, ward_clusterer_for
+
+
+def wards(n, offset=0.0):
+    rng = np.random.default_rng(n)
+    return [
+        {
+            "name": f"Phường {i}",
+            "aqi": 50 + 40 * (i % 2) + offset + rng.normal(),
+            "avg_school_score": 7,
+            "num_schools": i,
+        }
+        for i in range(n)
+    ]
+
+
+def test_partial_fit_only_feeds_new_or_changed_rows(monkeypatch):
+    clusterer = IncrementalClusterer(n_clusters=2)
+    names, X = AIService._ward_features(wards(6))
+    clusterer.fit(X, keys=names)
+
+    fed = []
+    original = clusterer.model.partial_fit
+    monkeypatch.setattr(clusterer.model, "partial_fit", lambda rows: fed.append(len(rows)) or original(rows))
+
+    clusterer.partial_fit(X, keys=names)  # nothing new
+    X[1, 0] += 5
+    clusterer.partial_fit(X, keys=names)
+    clusterer.partial_fit(np.vstack([X, X[:1]]), keys=names + ["Phường mới"])
+    assert fed == [1, 1]
+
+
+def test_resent_rows_do_not_reweight_the_scaler():
+    clusterer = IncrementalClusterer(n_clusters=2)
+    names, X = AIService._ward_features(wards(30))
+    clusterer.partial_fit(X, keys=names)
+    mean = clusterer.scaler.mean_.copy()
+
+    clusterer.partial_fit(X, keys=names)
+    clusterer.partial_fit(X, keys=names)
+    assert clusterer.scaler.n_samples_seen_ == 30
+    np.testing.assert_array_equal(clusterer.scaler.mean_, mean)
+
+    X[1, 0] += 5
+    clusterer.partial_fit(np.vstack([X, X[:1]]), keys=names + ["Phường mới"])
+    assert clusterer.scaler.n_samples_seen_ == 32
+
+
+def test_each_cluster_count_keeps_its_own_model():
+    assert ward_clusterer_for(2) is ward_clusterer_for(2)
+    assert ward_clusterer_for(3) is not ward_clusterer_for(2)
+
+    data = wards(8)
+    AIService.cluster_wards_incremental(data, n_clusters=2)
+    AIService.cluster_wards_incremental(data, n_clusters=3)
+    assert len(ward_clusterer_for(2).centroids) == 2
+    assert len(ward_clusterer_for(3).centroids) == 3
+
+
+def test_fitting_needs_at_least_n_clusters_rows():
+    clusterer = IncrementalClusterer(n_clusters=3)
+    names, X = AIService._ward_features(wards(2))
+    with pytest.raises(ValueError):
+        clusterer.fit(X)
+    with pytest.raises(ValueError):
+        clusterer.partial_fit(X, keys=names)
+    assert not clusterer.is_fitted
+
+    result = AIService.cluster_wards_incremental(wards(2), n_clusters=3, clusterer=clusterer)
+    assert result["success"] is False and "at least 3" in result["error"]
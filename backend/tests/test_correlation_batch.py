@@ -0,0 +1,49 @@
+"""Batch correlation engine against scipy.stats.pearsonr."""
+
+import numpy as np
+import pytest
+from scipy import stats
+
+from app.services.ai_service import AIService
+
+WARDS = ["Phường 1", "Phường 2", "Phường 3", "Phường 4"]
+
+
+@pytest.fixture
+def sample():
+    rng = np.random.default_rng(26)
+    ward_ids = rng.integers(0, 3, size=120)  # Phường 4 has no rows
+    base = rng.normal(size=(120, 1))
+    metrics = np.hstack([base, 0.6 * base + rng.normal(size=(120, 1)), rng.normal(size=(120, 2))])
+    metrics = metrics * [50, 1, 10, 5] + [1e4, 7, 30, 0]  # far-from-zero means exercise the centring
+    return metrics, ward_ids
+
+
+def test_every_pair_matches_pearsonr(sample):
+    metrics, ward_ids = sample
+    result = AIService.analyze_correlation_batch(metrics, ward_ids, WARDS)
+
+    groups = {name: metrics[ward_ids == g] for g, name in enumerate(WARDS[:3])}
+    groups["city"] = metrics
+    for name, rows in groups.items():
+        summary = result["city"] if name == "city" else result["wards"][name]
+        assert summary["n_samples"] == len(rows)
+        for i in range(4):
+            for j in range(4):
+                if i == j:
+                    continue
+                expected = stats.pearsonr(rows[:, i], rows[:, j])
+                assert summary["correlation_matrix"][i][j] == pytest.approx(expected.statistic, abs=1e-9)
+                assert summary["p_value_matrix"][i][j] == pytest.approx(expected.pvalue, rel=1e-6, abs=1e-12)
+
+
+def test_degenerate_groups_yield_none(sample):
+    metrics, ward_ids = sample
+    metrics = metrics.copy()
+    metrics[ward_ids == 1, 2] = 3.0  # constant metric in Phường 2
+    result = AIService.analyze_correlation_batch(metrics, ward_ids, WARDS)
+
+    assert result["wards"]["Phường 2"]["correlation_matrix"][0][2] is None
+    assert result["wards"]["Phường 4"]["n_samples"] == 0
+    assert result["wards"]["Phường 4"]["correlations"] == {}
+    assert "error" in AIService.analyze_correlation_batch(metrics, ward_ids[:-1], WARDS)
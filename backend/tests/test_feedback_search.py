@@ -0,0 +1,64 @@
+"""In-process BM25 feedback search used when Postgres full-text search is unavailable."""
+
+import pytest
+
+from app.models import CitizenFeedback
+from app.services import feedback_search
+from app.services.feedback_search import FeedbackInvertedIndex, FeedbackSearch, fold_vietnamese
+
+FEEDBACK = [
+    (1, "Quận Hải Châu", "Khói bụi ở đường Lê Duẩn rất nặng"),
+    (2, "Quận Hải Châu", "Cần trồng thêm cây xanh gần trường học"),
+    (3, "Quận Sơn Trà", "Đường ven biển nhiều khói bụi, khói bụi cả ngày"),
+    (4, "Quận Sơn Trà", "Bãi rác gần chợ bốc mùi"),
+]
+
+
+@pytest.fixture
+def index():
+    index = FeedbackInvertedIndex()
+    for row in FEEDBACK:
+        index.add(*row)
+    return index
+
+
+def test_folding_strips_vietnamese_diacritics():
+    assert fold_vietnamese("Quận Hải Châu") == "quan hai chau"
+    assert fold_vietnamese("ĐƯỜNG Đá") == "duong da"
+
+
+@pytest.mark.parametrize("query", ["khói bụi", "khoi bui", "KHÓI BỤI", "khoi  bụi!"])
+def test_queries_match_with_or_without_diacritics(index, query):
+    total, hits = index.search(query)
+    assert total == 2
+    assert [doc for doc, _ in hits] == [3, 1]  # the repeated terms rank first
+    assert hits[0][1] > hits[1][1] > 0
+
+
+def test_all_terms_and_the_ward_must_match(index):
+    assert index.search("khoi bui cay") == (0, [])
+    assert index.search("duong", ward_name="quan son tra")[0] == 1
+    assert [doc for doc, _ in index.search("duong", ward_name="Quận Sơn Trà")[1]] == [3]
+    assert index.search("!!!") == (0, [])
+
+
+def test_paging_and_tie_order(index):
+    total, hits = index.search("gan", limit=1)
+    assert total == 2 and [doc for doc, _ in hits] == [4]
+    assert [doc for doc, _ in index.search("gan", skip=1, limit=1)[1]] == [2]
+
+
+def test_search_falls_back_to_the_index_on_sqlite(session_factory, monkeypatch):
+    monkeypatch.setattr(feedback_search, "feedback_index", FeedbackInvertedIndex())
+    monkeypatch.setattr(FeedbackSearch, "_postgres_ready", None)
+
+    with session_factory() as db:
+        db.add_all(CitizenFeedback(id=i, ward_name=w, message=m) for i, w, m in FEEDBACK)
+        db.commit()
+        result = FeedbackSearch.search(db, "Khoi bui", "quan hai chau")
+        assert result["total"] == 1
+        assert result["items"][0]["feedback"].id == 1
+
+        db.add(CitizenFeedback(id=5, ward_name="Quận Hải Châu", message="khói bụi công trình"))
+        db.commit()
+        assert FeedbackSearch.search(db, "khói bụi", "Quận Hải Châu")["total"] == 2
@@ -0,0 +1,43 @@
+"""AQI forecast state: bucket folding and concurrent observes."""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from app.models import AQIForecast, ForecastState
+from app.services.forecasting import AQIForecaster
+
+T0 = datetime(2026, 10, 19, 8, 5)
+
+
+def test_closing_a_bucket_folds_its_mean_and_writes_forecasts(session_factory):
+    with session_factory() as db:
+        assert AQIForecaster.observe(db, "Phường 1", 40, T0) is False
+        assert AQIForecaster.observe(db, "Phường 1", 60, T0 + timedelta(minutes=30)) is False
+        assert AQIForecaster.observe(db, "Phường 1", 70, T0 + timedelta(hours=1)) is True
+
+        state = db.query(ForecastState).one()
+        assert state.level == 50
+        assert (state.bucket_sum, state.bucket_count, state.n_obs) == (70, 1, 1)
+        assert db.query(AQIForecast).count() > 0
+
+
+def test_concurrent_observes_lose_no_readings(session_factory):
+    wards = ["Phường 1", "Phường 2", "Phường 3"]
+    per_thread = 20
+
+    def ingest(worker):
+        with session_factory() as db:
+            for i in range(per_thread):
+                AQIForecaster.observe(db, wards[(worker + i) % len(wards)], 50.0, T0)
+
+    # Every ward's first readings arrive together, which must not trip the unique ward_name
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(ingest, range(8)))
+
+    with session_factory() as db:
+        counts = dict(db.query(ForecastState.ward_name, ForecastState.bucket_count).all())
+        assert sorted(counts) == wards
+        assert sum(counts.values()) == 8 * per_thread
+        assert db.query(func.sum(ForecastState.bucket_sum)).scalar() == 50.0 * 8 * per_thread
@@ -0,0 +1,39 @@
+"""Starting the API must not import the scientific or RDF stacks."""
+
+import os
+import subprocess
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("numpy", "sklearn", "scipy", "rdflib")
+
+# Runs startup (including the SPARQL journal sync) and a request, then shutdown
+SCRIPT = f"""
+import sys
+from fastapi.testclient import TestClient
+from app.db.base import engine
+from app.db.migrations import upgrade
+from app.services.sparql_store import lod_store
+from main import app
+
+upgrade(engine)
+with TestClient(app) as client:
+    assert client.get("/health").status_code == 200
+    lod_store.sync()
+print("loaded:", *[name for name in {HEAVY_MODULES!r} if name in sys.modules])
+"""
+
+
+def test_api_startup_does_not_import_heavy_dependencies(tmp_path):
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{tmp_path / 'app.db'}",
+        "AI_STREAM_SNAPSHOT_PATH": str(tmp_path / "correlation_stream.json"),
+        "AI_MODEL_STORE_DIR": str(tmp_path / "models"),
+        "SPARQL_STORE_DIR": str(tmp_path / "lod_store"),
+    }
+    result = subprocess.run([sys.executable, "-c", SCRIPT], cwd=BACKEND_DIR, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    loaded = [line.split()[1:] for line in result.stdout.splitlines() if line.startswith("loaded:")]
+    assert loaded == [[]]
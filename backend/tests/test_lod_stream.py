@@ -0,0 +1,72 @@
+"""Incremental LOD export windows and content negotiation."""
+
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.models import AirQuality
+from app.services.lod_stream import DATASETS, LODStreamExporter, accepts_gzip, watermark
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", True),
+    ("br;q=1.0, gzip;q=0.5", True),
+    ("gzip;q=0", False),
+    ("gzip; q=0.0, *;q=1", False),
+    ("*", True),
+    ("*;q=0", False),
+    ("identity", False),
+    ("", False),
+    ("x-gzip", True),
+])
+def test_accepts_gzip_honours_q_values(header, expected):
+    assert accepts_gzip(header) is expected
+
+
+def pull(since=None):
+    dataset = DATASETS["air-quality"]
+    until = watermark(dataset)
+    exporter = LODStreamExporter(dataset, "ndjson", since=since, until=until)
+    body = b"".join(exporter.iter_chunks()).decode()
+    ids = {json.loads(line)["@id"].rsplit("/", 1)[1] for line in body.splitlines()}
+    return ids, until
+
+
+def test_incremental_pulls_cover_every_row_once_settled(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "lod_commit_lag_seconds", 30)
+    now = datetime.utcnow()
+    with session_factory() as db:
+        db.add_all([
+            AirQuality(id=1, ward_name="Phường 1", aqi=50, updated_at=now - timedelta(hours=1)),
+            # Still inside the commit lag: a row stamped earlier could commit after it
+            AirQuality(id=2, ward_name="Phường 1", aqi=60, updated_at=now - timedelta(seconds=5)),
+        ])
+        db.commit()
+
+    ids, mark = pull()
+    assert ids == {"1"}
+    assert mark <= now - timedelta(seconds=29)
+
+    with session_factory() as db:
+        # Committed late but stamped after the watermark, so the next pull still sees it
+        db.add(AirQuality(id=3, ward_name="Phường 2", aqi=70, updated_at=mark + timedelta(seconds=1)))
+        db.commit()
+
+    monkeypatch.setattr(settings, "lod_commit_lag_seconds", 0)
+    ids, _ = pull(since=mark)
+    assert ids == {"2", "3"}
+
+
+def test_boundary_rows_are_re_sent(session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "lod_commit_lag_seconds", 0)
+    stamp = datetime.utcnow() - timedelta(minutes=1)
+    with session_factory() as db:
+        db.add(AirQuality(id=1, aqi=50, updated_at=stamp))
+        db.commit()
+
+    ids, mark = pull()
+    assert ids == {"1"}
+    assert mark == stamp
+    assert pull(since=mark)[0] == {"1"}
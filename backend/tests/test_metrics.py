@@ -0,0 +1,76 @@
+"""Prometheus metrics: route labels, in-flight requests, pool gauges and upstream errors."""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.core.metrics import UNMATCHED_ROUTE
+from app.services.fiware_service import FiwareService
+from app.services.open_data_service import OpenDataService
+from main import app
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def route_counts(suffix):
+    """Request counts per route label ending in ``suffix``."""
+    return {
+        row.labels["route"]: row.value
+        for metric in REGISTRY.collect() if metric.name == "http_request_duration_seconds"
+        for row in metric.samples
+        if row.name.endswith("_count") and row.labels["route"].endswith(suffix)
+    }
+
+
+def test_latency_is_labelled_by_route_template(session_factory):
+    client = TestClient(app)
+    before = sum(route_counts("/lod/{dataset}.{fmt}").values())
+
+    for dataset in ("nope", "other", "third"):
+        assert client.get(f"/api/api/lod/{dataset}.nt").status_code == 404
+    client.get("/no/such/path")
+
+    assert sum(route_counts("/lod/{dataset}.{fmt}").values()) == before + 3
+    assert route_counts(".nt") == {}
+    assert sample("http_request_duration_seconds_count", method="GET", route=UNMATCHED_ROUTE, status="404") >= 1
+    assert "/no/such/path" not in client.get("/metrics").text
+
+
+def test_in_flight_gauge_and_pool_stats_are_exported():
+    client = TestClient(app)
+    body = client.get("/metrics").text
+    assert 'http_requests_in_flight{method="GET"} 1.0' in body  # the scrape itself
+    for gauge in ("db_pool_size", "db_pool_checked_out", "db_pool_checked_in", "db_pool_overflow"):
+        assert f"\n{gauge} " in body
+    assert "db_pool_checkout_wait_seconds_count" in body
+
+    client.get("/health")
+    assert sample("http_requests_in_flight", method="GET") == 0
+
+
+@pytest.fixture
+def unreachable_upstreams(monkeypatch):
+    async def fail(self, url, *args, **kwargs):
+        raise httpx.ConnectError("connection refused", request=httpx.Request("GET", url))
+
+    monkeypatch.setattr(httpx.AsyncClient, "get", fail)
+    monkeypatch.setattr(httpx.AsyncClient, "post", fail)
+
+
+def test_failed_upstream_calls_are_counted(unreachable_upstreams):
+    openaq = {"target": "openaq", "operation": "fetch_openaq_data"}
+    fiware = {"target": "fiware", "operation": "publish_entity"}
+    before = (sample("upstream_request_errors_total", **openaq), sample("upstream_request_errors_total", **fiware))
+
+    assert asyncio.run(OpenDataService.fetch_openaq_data("Hanoi"))["success"] is False
+    assert asyncio.run(FiwareService.publish_entity({"id": "urn:x"}))["success"] is False
+    assert asyncio.run(FiwareService.publish_entity({"id": "urn:y"}))["success"] is False
+
+    assert sample("upstream_request_errors_total", **openaq) == before[0] + 1
+    assert sample("upstream_request_errors_total", **fiware) == before[1] + 2
+    assert sample("upstream_request_duration_seconds_count", **openaq) >= 1
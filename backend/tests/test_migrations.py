@@ -0,0 +1,99 @@
+"""Alembic migrations against fresh, baseline and legacy create_all databases."""
+
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.orm import Session
+
+import app.models  # noqa: F401
+from app.db.base import Base
+from app.db.migrations import current_revision, head_revision, upgrade
+from app.models import AIAnalysis, AirQuality
+
+# Undo this series' additions, leaving what the baseline's (97b2d47) create_all built
+TO_BASELINE = [
+    "DROP TABLE aqi_forecasts",
+    "DROP TABLE forecast_states",
+    "DROP TABLE analysis_watermarks",
+    "DROP TABLE analysis_jobs",
+    "DROP TABLE revoked_tokens",
+    "DROP INDEX ix_air_quality_is_anomaly",
+    "DROP INDEX uq_ai_analysis_batch_ward",
+    "DROP INDEX ix_green_actions_ward_source",
+    "ALTER TABLE air_quality DROP COLUMN is_anomaly",
+    "ALTER TABLE air_quality DROP COLUMN anomaly_score",
+    "ALTER TABLE ai_analysis DROP COLUMN source",
+    "ALTER TABLE green_actions DROP COLUMN source",
+    "ALTER TABLE schools DROP COLUMN updated_at",
+]
+
+
+def create_baseline(engine, keep_tables=()):
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        for statement in TO_BASELINE:
+            if not any(statement == f"DROP TABLE {table}" for table in keep_tables):
+                conn.exec_driver_sql(statement)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'schema.db'}")
+    yield engine
+    engine.dispose()
+
+
+def assert_matches_models(engine):
+    with engine.connect() as conn:
+        diff = compare_metadata(MigrationContext.configure(conn), Base.metadata)
+    assert diff == []
+
+
+def test_fresh_database_upgrades_to_models(engine):
+    before, after = upgrade(engine)
+    assert (before, after) == (None, head_revision())
+    assert_matches_models(engine)
+
+
+def test_baseline_create_all_database_is_adopted(engine):
+    create_baseline(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("INSERT INTO air_quality (ward_name, aqi) VALUES ('Phường 1', 80)")
+
+    before, after = upgrade(engine)
+
+    assert (before, after) == ("0001", head_revision())
+    assert_matches_models(engine)
+    with Session(engine) as session:
+        reading = session.scalars(select(AirQuality).where(AirQuality.valid())).one()
+        assert reading.is_anomaly is False
+        session.add(AIAnalysis(ward_name="Phường 1", source="batch"))
+        session.commit()
+
+
+def test_series_create_all_database_is_adopted(engine):
+    # Startup's create_all during this series added the new tables but no columns
+    create_baseline(engine, keep_tables=("aqi_forecasts", "forecast_states", "analysis_watermarks"))
+    upgrade(engine)
+    assert_matches_models(engine)
+
+    # ...while a database it built from scratch already has everything
+    Base.metadata.drop_all(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE alembic_version")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        # Added after startup stopped calling create_all
+        conn.exec_driver_sql("DROP TABLE analysis_jobs")
+        conn.exec_driver_sql("DROP TABLE revoked_tokens")
+        conn.exec_driver_sql("ALTER TABLE schools DROP COLUMN updated_at")
+    upgrade(engine)
+    assert current_revision(engine) == head_revision()
+    assert_matches_models(engine)
+
+
+def test_upgrade_is_idempotent(engine):
+    upgrade(engine)
+    assert upgrade(engine) == (head_revision(), head_revision())
+    assert "alembic_version" in inspect(engine).get_table_names()
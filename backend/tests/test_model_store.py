@@ -0,0 +1,49 @@
+"""Model store: fingerprints and recovery from unreadable entries."""
+
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services import model_store as model_store_module
+from app.services.model_store import ModelStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ModelStore(directory=str(tmp_path), max_entries=8, memory_entries=4)
+
+
+def test_fingerprint_depends_on_the_scikit_learn_version(monkeypatch):
+    features = np.arange(12, dtype=float).reshape(4, 3)
+    key = ModelStore.fingerprint(features, 2)
+    assert ModelStore.fingerprint(features.copy(), 2) == key
+
+    monkeypatch.setattr(model_store_module, "sklearn", SimpleNamespace(__version__="0.0"))
+    assert ModelStore.fingerprint(features, 2) != key
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"\x80\x04\x95",  # truncated
+        b"cno_such_module\nThing\n.",  # module removed since it was written
+        b"cos\nno_such_attribute\n.",  # class renamed since it was written
+    ],
+)
+def test_unreadable_entries_are_misses_and_removed(store, content):
+    path = os.path.join(store.directory, "abc.pkl")
+    with open(path, "wb") as f:
+        f.write(content)
+
+    assert store.get("abc") is None
+    assert not os.path.exists(path)
+    assert store.stats()["misses"] == 1
+
+
+def test_entries_round_trip_through_disk(store, tmp_path):
+    store.put("abc", {"labels": [0, 1], "fit_seconds": 0.5})
+    fresh = ModelStore(directory=str(tmp_path))
+    assert fresh.get("abc")["labels"] == [0, 1]
+    assert fresh.stats()["fit_seconds_saved"] == 0.5
@@ -0,0 +1,31 @@
+"""Password hashing pool: round trips, rehash on cost change and crash recovery."""
+
+import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.services.password_hashing import PasswordHasher, hash_rounds
+
+
+def test_verify_upgrades_hashes_made_with_another_cost():
+    old = PasswordHasher(workers=0, max_pending=4, rounds=4)
+    current = PasswordHasher(workers=0, max_pending=4, rounds=5)
+    stored = old.hash_blocking("mật khẩu")
+
+    ok, new_hash = asyncio.run(current.verify("mật khẩu", stored))
+    assert ok and hash_rounds(new_hash) == 5
+    assert asyncio.run(current.verify("wrong", stored)) == (False, None)
+
+
+def test_hashing_survives_a_crashed_worker():
+    hasher = PasswordHasher(workers=1, max_pending=4, rounds=4)
+    try:
+        with pytest.raises(BrokenProcessPool):
+            hasher._submit(os._exit, 1).result(timeout=60)
+        stored = hasher.hash_blocking("secret")
+        assert hasher.verify_blocking("secret", stored)
+        assert hasher.stats()["pending"] == 0
+    finally:
+        hasher.shutdown()
@@ -0,0 +1,87 @@
+"""Query monitor: statement timing, slow-query logging and N+1 detection."""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from app.core.config import settings
+from app.core.query_monitor import QueryCountMiddleware, QueryMonitor
+
+
+def test_failed_statements_leave_nothing_behind(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'q.db'}", pool_size=1, max_overflow=0)
+    monitor = QueryMonitor(slow_query_ms=0)
+    monitor.install(engine)
+
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+        conn.execute(text("SELECT 1"))
+        assert not [key for key in conn.info if "start" in key]
+    assert monitor.slow_count == 1  # only the statement that completed was timed
+    engine.dispose()
+
+
+@pytest.fixture
+def monitored_app(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'routes.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE wards (id INTEGER PRIMARY KEY, name TEXT)"))
+        conn.execute(text("INSERT INTO wards (id, name) VALUES (1, 'a'), (2, 'b'), (3, 'c')"))
+    monitor = QueryMonitor(slow_query_ms=0)
+    monitor.install(engine)
+
+    api = FastAPI()
+
+    @api.get("/wards/{ward_id}")
+    def ward(ward_id: int, lookups: int = 1):
+        with engine.connect() as conn:
+            for _ in range(lookups):
+                conn.execute(text("SELECT name FROM wards WHERE id = :id"), {"id": ward_id}).all()
+        return {"ok": True}
+
+    yield TestClient(QueryCountMiddleware(api, n_plus_one_threshold=5)), monitor
+    engine.dispose()
+
+
+def test_repeated_statements_are_flagged_with_the_route_and_count(monitored_app, capsys):
+    client, _ = monitored_app
+    client.get("/wards/1", params={"lookups": 4})
+    assert "Possible N+1" not in capsys.readouterr().out
+
+    client.get("/wards/2", params={"lookups": 12})
+    out = capsys.readouterr().out
+    assert "Possible N+1 in GET /wards/{ward_id}: 12 queries" in out
+    assert "12x SELECT name FROM wards WHERE id = ?" in out
+
+
+def test_slow_statements_are_logged_once_per_route_and_shape(monitored_app, capsys):
+    client, monitor = monitored_app
+    client.get("/wards/1", params={"lookups": 3})
+    client.get("/wards/3")
+
+    slow = [line for line in capsys.readouterr().out.splitlines() if "Slow query" in line]
+    assert len(slow) == 1
+    assert "in GET /wards/{ward_id}: SELECT name FROM wards WHERE id = ?" in slow[0]
+    assert monitor.slow_count == 4
+
+
+def test_explain_is_only_honoured_in_debug_mode(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(settings, "debug", False)
+    assert QueryMonitor(slow_query_ms=0, explain=True).explain is False
+
+    monkeypatch.setattr(settings, "debug", True)
+    monitor = QueryMonitor(slow_query_ms=0, explain=True)
+    engine = create_engine(f"sqlite:///{tmp_path / 'plan.db'}")
+    monitor.install(engine)
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TABLE t (id INTEGER PRIMARY KEY)"))
+        conn.execute(text("SELECT * FROM t WHERE id = 1")).all()
+    engine.dispose()
+
+    out = capsys.readouterr().out
+    assert "Slow query" in out and "(no request)" in out
+    assert "SEARCH t USING INTEGER PRIMARY KEY" in out
@@ -0,0 +1,137 @@
+"""Rate limiting: token buckets, the Redis store and client identification."""
+
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.core import rate_limit
+from app.core.rate_limit import (
+    RateLimitMetrics,
+    RateLimitMiddleware,
+    RateLimitRule,
+    RedisBucketStore,
+    StripedBucketStore,
+)
+
+
+def test_buckets_allow_a_burst_then_refill_at_the_rate():
+    store = StripedBucketStore(stripes=4)
+    assert [store.take("a", 2.0, 3, now=0.0)[0] for _ in range(4)] == [True, True, True, False]
+    assert store.take("a", 2.0, 3, now=0.0)[1] == pytest.approx(0.5)
+    assert store.take("a", 2.0, 3, now=0.5)[0] is True
+    assert store.take("b", 2.0, 3, now=0.5)[0] is True  # other clients are independent
+
+
+def test_redis_buckets_are_shared_between_workers():
+    server = fakeredis.FakeServer()
+
+    async def run():
+        workers = [RedisBucketStore("", client=fakeredis.FakeAsyncRedis(server=server)) for _ in range(2)]
+        return [(await workers[i % 2].take_async("login|1.2.3.4", 0.01, 3))[0] for i in range(4)]
+
+    assert asyncio.run(run()) == [True, True, True, False]
+
+
+class UnreachableRedis:
+    def __init__(self):
+        self.calls = 0
+
+    def register_script(self, script):
+        async def call(keys, args):
+            self.calls += 1
+            raise ConnectionError("connect timed out")
+
+        return call
+
+
+def test_unreachable_redis_falls_back_and_backs_off():
+    client = UnreachableRedis()
+    store = RedisBucketStore("", client=client, backoff_seconds=30)
+
+    async def take(n):
+        return [(await store.take_async("k", 1.0, 2))[0] for _ in range(n)]
+
+    assert asyncio.run(take(3)) == [True, True, False]
+    assert client.calls == 1
+
+    store._retry_at -= 31  # the backoff has elapsed
+    asyncio.run(take(1))
+    assert client.calls == 2
+
+
+def scope(headers=(), client=("10.0.0.2", 5000)):
+    return {"type": "http", "method": "POST", "path": "/api/users/login", "headers": list(headers), "client": client}
+
+
+def test_client_is_the_hop_added_by_the_trusted_proxy(monkeypatch):
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_trust_forwarded", True)
+    middleware = RateLimitMiddleware(None, rules=[], store=StripedBucketStore(stripes=1))
+    spoofed = [(b"x-forwarded-for", b"6.6.6.6, 203.0.113.7"), (b"x-forwarded-for", b"198.51.100.9 ,")]
+    assert middleware._client(scope(spoofed)) == "198.51.100.9"
+    assert middleware._client(scope()) == "10.0.0.2"
+
+    monkeypatch.setattr(rate_limit.settings, "rate_limit_trust_forwarded", False)
+    untrusting = RateLimitMiddleware(None, rules=[], store=StripedBucketStore(stripes=1))
+    assert untrusting._client(scope(spoofed)) == "10.0.0.2"
+
+
+def test_middleware_answers_429_with_retry_after():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    rule = RateLimitRule("POST */users/login", rate=0.5, burst=1)
+    metrics = RateLimitMetrics()
+    middleware = RateLimitMiddleware(app, rules=[rule], store=StripedBucketStore(stripes=1), metrics=metrics)
+
+    async def call():
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await middleware(scope(), None, send)
+        return sent[0]
+
+    assert asyncio.run(call())["status"] == 200
+    rejected = asyncio.run(call())
+    assert rejected["status"] == 429
+    assert dict(rejected["headers"])[b"retry-after"] == b"2"
+    assert metrics.snapshot() == {"POST */users/login": {"allowed": 1, "rejected": 1}}
+
+
+def test_route_rejections_refund_the_client_token():
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    rule = RateLimitRule("POST */users/login", rate=0.001, burst=2, route_rate=0.001, route_burst=1)
+    store = StripedBucketStore(stripes=1)
+    middleware = RateLimitMiddleware(app, rules=[rule], store=store, metrics=RateLimitMetrics())
+
+    async def status(client):
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        await middleware(scope(client=(client, 5000)), None, send)
+        return sent[0]["status"]
+
+    assert asyncio.run(status("10.0.0.1")) == 200  # drains the route bucket
+    assert [asyncio.run(status("10.0.0.2")) for _ in range(3)] == [429, 429, 429]
+
+    store._buckets[0][f"{rule.name}|*"] = (1.0, 0.0)  # the route has recovered
+    assert asyncio.run(status("10.0.0.2")) == 200
+
+
+def test_redis_refunds_are_capped_at_the_burst():
+    store = RedisBucketStore("", client=fakeredis.FakeAsyncRedis())
+
+    async def run():
+        taken = [(await store.take_async("k", 0.001, 2))[0] for _ in range(2)]
+        for _ in range(3):
+            await store.refund_async("k", 2)
+        return taken + [(await store.take_async("k", 0.001, 2))[0] for _ in range(3)]
+
+    assert asyncio.run(run()) == [True, True, True, True, False]
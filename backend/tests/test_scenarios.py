@@ -0,0 +1,68 @@
+"""Scenario simulation: request limits, percentile bands, seeding and the parameter cache."""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.models import AirQuality, EnergyData
+from app.services import ai_service
+from app.services.scenario_simulation import SCENARIO_METRICS, ScenarioSimulator
+from main import app
+
+WARDS = [
+    {"name": "Phường 1", "aqi": 150.0, "energy_usage_kw": 40.0},
+    {"name": "Phường 2", "aqi": 60.0, "energy_usage_kw": 10.0},
+]
+SCENARIOS = [
+    {"name": "everything", "actions": {"tree_planting": 2.0, "solar_installation": 3.0, "green_education": 1.0}},
+    {"name": "trees in one ward", "actions": {"tree_planting": 5.0}, "ward_names": ["Phường 2"]},
+]
+
+
+def test_oversized_scenario_batches_are_rejected():
+    scenario = {"name": "trees", "actions": {"tree_planting": 1.0}}
+    response = TestClient(app).post(
+        "/api/api/ai/scenarios", json={"scenarios": [scenario] * (settings.scenario_max_scenarios + 1)}
+    )
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["type"] == "too_long"
+
+
+def test_percentile_bands_are_ordered():
+    result = ScenarioSimulator().simulate(SCENARIOS, WARDS, n_draws=500, seed=1)
+    assert result["percentiles"] == [5, 50, 95]
+    for scenario in result["scenarios"]:
+        bands = [scenario["city"]] + list(scenario["wards"].values())
+        for band in bands:
+            for metric in SCENARIO_METRICS:
+                assert band[metric]["p5"] <= band[metric]["p50"] <= band[metric]["p95"], metric
+
+    untouched = result["scenarios"][1]["wards"]["Phường 1"]["aqi_reduction"]
+    assert untouched == {"p5": 0.0, "p50": 0.0, "p95": 0.0, "mean": 0.0}
+
+
+def test_seeded_runs_are_deterministic():
+    first = ScenarioSimulator().simulate(SCENARIOS, WARDS, n_draws=500, seed=7)
+    assert ScenarioSimulator().simulate(SCENARIOS, WARDS, n_draws=500, seed=7) == first
+    assert ScenarioSimulator().simulate(SCENARIOS, WARDS, n_draws=500, seed=8)["scenarios"] != first["scenarios"]
+
+
+@pytest.fixture
+def wards_in_db(session_factory, monkeypatch):
+    monkeypatch.setattr(ai_service, "scenario_simulator", ScenarioSimulator())
+    with session_factory() as db:
+        for ward in WARDS:
+            db.add(AirQuality(ward_name=ward["name"], aqi=ward["aqi"]))
+            db.add(EnergyData(ward_name=ward["name"], solar_potential_kw=5.0, current_usage_kw=ward["energy_usage_kw"]))
+        db.commit()
+
+
+def test_identical_requests_hit_the_parameter_cache(wards_in_db):
+    client = TestClient(app)
+    request = {"scenarios": SCENARIOS, "n_draws": 500, "seed": 3}
+
+    first = client.post("/api/api/ai/scenarios", json=request).json()
+    second = client.post("/api/api/ai/scenarios", json=request).json()
+    assert (first.pop("cached"), second.pop("cached")) == (False, True)
+    assert second == first
+    assert client.post("/api/api/ai/scenarios", json={**request, "seed": 4}).json()["cached"] is False
@@ -0,0 +1,68 @@
+"""JWT verification cache and revocation shared between workers."""
+
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import event
+
+from app.core import security
+from app.core.security import TokenCache, create_access_token, revoke_token, verify_token
+from app.models import RevokedToken
+
+SUBJECT = {"user_id": 7, "email": "a@example.com", "role": "citizen"}
+
+
+@pytest.fixture(autouse=True)
+def token_cache(session_factory, monkeypatch):
+    monkeypatch.setattr(security, "token_cache", TokenCache(max_entries=2))
+
+
+def test_verified_tokens_are_cached_and_evicted(session_factory):
+    tokens = [create_access_token({**SUBJECT, "user_id": i}) for i in range(3)]
+
+    assert verify_token(tokens[0]).user_id == 0
+    assert verify_token(tokens[0]).user_id == 0
+    assert security.token_cache.stats()["hits"] == 1
+
+    verify_token(tokens[1])
+    verify_token(tokens[2])
+    assert security.token_cache.stats()["entries"] == 2
+    assert security.token_cache.get(TokenCache.digest(tokens[0])) is None
+
+
+def test_invalid_and_expired_tokens_are_rejected(session_factory):
+    assert verify_token("not-a-jwt") is None
+    assert verify_token(create_access_token(SUBJECT, timedelta(seconds=-1))) is None
+    assert security.token_cache.stats()["entries"] == 0
+
+
+def test_logout_on_one_worker_is_honoured_by_the_others(session_factory, monkeypatch):
+    token = create_access_token(SUBJECT)
+    other_worker = TokenCache(revocation_ttl=60)
+    monkeypatch.setattr(security, "token_cache", other_worker)
+    assert verify_token(token) is not None  # now cached by the other worker
+
+    monkeypatch.setattr(security, "token_cache", TokenCache())
+    revoke_token(token)
+    revoke_token(token)  # a repeated logout is harmless
+    with session_factory() as db:
+        assert db.query(RevokedToken).count() == 1
+
+    monkeypatch.setattr(security, "token_cache", other_worker)
+    assert verify_token(token) is not None  # its revoked set is still fresh
+    other_worker._revoked_loaded_at -= 60
+    assert verify_token(token) is None
+    assert other_worker.is_revoked(TokenCache.digest(token))
+
+
+def test_cache_hits_do_not_query_the_database(session_factory):
+    statements = []
+    event.listen(session_factory.kw["bind"], "before_cursor_execute", lambda *args: statements.append(args[2]))
+    token = create_access_token(SUBJECT)
+
+    verify_token(token)
+    assert len(statements) == 1  # the first revocation load
+    for _ in range(100):
+        assert verify_token(token).user_id == 7
+    assert statements[1:] == []
+    assert security.token_cache.stats()["revocation_loads"] == 1
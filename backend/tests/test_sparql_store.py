@@ -0,0 +1,137 @@
+"""SPARQL endpoint store: query safety and result caching."""
+
+import json
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from rdflib import Literal, URIRef
+from rdflib.namespace import RDFS
+
+from app.core.config import settings
+from app.models import AirQuality
+from app.services.sparql_store import LODTripleStore, SPARQLQueryError
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = LODTripleStore(directory=str(tmp_path), sync_interval=0)
+    graph = store._new_graph()
+    graph.add((URIRef("http://example.org/school/1"), RDFS.label, Literal("a  b")))
+    store._publish(graph)
+    return store
+
+
+def bindings(entry):
+    return json.loads(entry[1])["results"]["bindings"]
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT * WHERE { SERVICE <http://127.0.0.1:9/sparql> { ?s ?p ?o } }",
+    "SELECT * WHERE { ?s ?p ?o OPTIONAL { SERVICE SILENT <http://127.0.0.1:9/sparql> { ?s ?q ?x } } }",
+    "SELECT * WHERE { { SELECT ?s WHERE { SERVICE <http://127.0.0.1:9/sparql> { ?s ?p ?o } } } }",
+    "SELECT * FROM <http://127.0.0.1:9/graph> WHERE { ?s ?p ?o }",
+])
+def test_remote_data_is_rejected(store, query):
+    with pytest.raises(SPARQLQueryError):
+        store.query(query)
+
+
+def test_cache_is_keyed_on_exact_text(store):
+    template = 'SELECT ?s WHERE {{ ?s rdfs:label ?l FILTER(?l = "{}") }}'
+    assert len(bindings(store.query(template.format("a  b")))) == 1
+    assert bindings(store.query(template.format("a b"))) == []
+    assert len(bindings(store.query(template.format("a  b")))) == 1
+    assert (store.hits, store.misses) == (1, 2)
+
+
+def test_new_segments_invalidate_the_cache_but_not_running_queries(store):
+    query = "SELECT (COUNT(*) AS ?n) WHERE { ?s ?p ?o }"
+    store.query(query)
+    version = store.version
+    with store._graph_lock.write():
+        store.graph.add((URIRef("http://example.org/school/2"), RDFS.label, Literal("c")))
+        store._publish()
+
+    assert store.version == version + 1
+    assert bindings(store.query(query))[0]["n"]["value"] == "2"
+
+
+COUNT = "SELECT (COUNT(*) AS ?n) WHERE { ?s ?p ?o }"
+AQI = "SELECT ?aqi WHERE { ?s ex:aqi ?aqi }"
+
+
+@pytest.fixture
+def journal(tmp_path, session_factory, monkeypatch):
+    monkeypatch.setattr(settings, "lod_commit_lag_seconds", 0)
+    defaults = {"directory": str(tmp_path / "lod"), "sync_interval": 0, "refresh_interval": 0}
+    return lambda **kwargs: LODTripleStore(**{**defaults, **kwargs})
+
+
+def add_reading(session_factory, id, aqi, age_minutes):
+    with session_factory() as db:
+        db.merge(AirQuality(id=id, ward_name="Phường 1", aqi=aqi,
+                            updated_at=datetime.utcnow() - timedelta(minutes=age_minutes)))
+        db.commit()
+
+
+def count(store):
+    return int(bindings(store.query(COUNT))[0]["n"]["value"])
+
+
+def test_segments_are_merged_into_the_live_graph(journal, session_factory):
+    writer, reader = journal(), journal()
+    add_reading(session_factory, 1, 50, 10)
+    assert writer.sync() == 4  # rdf:type, observedProperty, aqi, resultTime
+    assert writer.graph is None  # writing the journal never loads the graph
+
+    assert count(reader) == 4
+    graph = reader.graph
+    add_reading(session_factory, 1, 80, 5)  # a changed row replaces its description
+    add_reading(session_factory, 2, 60, 5)
+    writer.sync()
+
+    assert sorted(b["aqi"]["value"] for b in bindings(reader.query(AQI))) == ["60.0", "80.0"]
+    assert reader.graph is graph
+    assert reader.stats()["segments_applied"] == 2
+
+
+def test_compaction_and_rebuild(journal, session_factory, tmp_path):
+    writer, reader = journal(), journal()
+    add_reading(session_factory, 1, 50, 10)
+    writer.sync()
+    add_reading(session_factory, 2, 60, 5)
+    writer.sync()
+    assert count(reader) == 8
+    graph = reader.graph
+
+    writer._compact(writer._segments())
+    assert sorted(os.listdir(tmp_path / "lod")) == ["journal.lock", "snapshot.nt"]
+    assert count(reader) == 8
+    assert reader.graph is graph  # it had applied everything the snapshot folded
+    assert count(journal()) == 8
+
+    with session_factory() as db:
+        db.query(AirQuality).filter(AirQuality.id == 1).delete()
+        db.commit()
+    assert writer.rebuild() == 4
+    assert count(reader) == 4
+    assert reader.graph is not graph
+
+
+def test_one_worker_leads_the_sync(journal, session_factory):
+    workers = [journal(sync_interval=60), journal(sync_interval=60)]
+    add_reading(session_factory, 1, 50, 10)
+    try:
+        for worker in workers:
+            worker.start()
+        deadline = time.monotonic() + 10
+        while not any(worker._leader for worker in workers) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.1)
+        assert [worker.stats()["leader"] for worker in workers].count(True) == 1
+        assert all(worker.graph is None for worker in workers)
+    finally:
+        for worker in workers:
+            worker.stop()
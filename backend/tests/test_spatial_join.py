@@ -0,0 +1,65 @@
+"""KD-tree station index and the IDW spatial join onto schools."""
+
+import numpy as np
+import pytest
+
+from app.models import AirQuality, School
+from app.services.spatial_join import SpatialJoin, StationIndex, chord_to_km, km_to_chord, to_unit_xyz
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * 6371.0088 * np.arcsin(np.sqrt(a))
+
+
+def test_chord_distance_matches_haversine():
+    a, b = to_unit_xyz([10.76], [106.66]), to_unit_xyz([10.80], [106.70])
+    chord = np.linalg.norm(a - b)
+    assert chord_to_km(chord) == pytest.approx(haversine_km(10.76, 106.66, 10.80, 106.70), rel=1e-9)
+    assert km_to_chord(chord_to_km(chord)) == pytest.approx(chord)
+
+
+def test_idw_weights_by_inverse_squared_distance():
+    # Two stations 1 km and 2 km east of the point, on the same parallel
+    deg_per_km = 1 / 111.32
+    index = StationIndex([0.0, 0.0], [deg_per_km, 2 * deg_per_km], [100.0, 40.0])
+    value = index.query([0.0], [0.0], k=2, max_distance_km=5, power=2)[0]
+    assert value == pytest.approx((100 / 1 + 40 / 4) / (1 / 1 + 1 / 4), rel=1e-3)
+
+    assert index.query([0.0], [deg_per_km], k=2, max_distance_km=5)[0] == 100.0  # exact hit wins
+    assert index.query([0.0], [0.0], k=1, max_distance_km=5)[0] == 100.0
+    assert np.isnan(index.query([1.0], [1.0], k=2, max_distance_km=5)[0])
+
+
+def test_empty_index_returns_nan():
+    index = StationIndex([], [], [])
+    assert np.isnan(index.query([10.0, 11.0], [106.0, 106.0])).all()
+
+
+@pytest.fixture
+def db(session_factory):
+    with session_factory() as session:
+        yield session
+
+
+def test_join_uses_one_latest_reading_per_station(db):
+    db.add_all([
+        # Older readings at the same station must not act as extra neighbours
+        AirQuality(ward_name="Phường 1", lat=10.0, lng=106.0, aqi=300.0),
+        AirQuality(ward_name="Phường 1", lat=10.0, lng=106.0, aqi=280.0),
+        AirQuality(ward_name="Phường 1", lat=10.0, lng=106.0, aqi=60.0),
+        AirQuality(ward_name="Phường 1", lat=10.0, lng=106.0, aqi=999.0, is_anomaly=True),
+        AirQuality(ward_name="Phường 2", lat=10.01, lng=106.0, aqi=120.0),
+        School(school_name="A", ward_name="Phường 1", lat=10.0, lng=106.0, avg_score=0.8),
+        School(school_name="B", ward_name="Phường 1", lat=10.005, lng=106.0, avg_score=None),
+    ])
+    db.commit()
+
+    aligned = SpatialJoin.aligned_features(db, "Phường 1", k=3, max_distance_km=5)
+
+    assert aligned["n_stations"] == 2
+    assert aligned["school_aqi"][0] == 60.0
+    assert aligned["school_aqi"][1] == pytest.approx(90.0)  # halfway between the two stations
+    assert aligned["school_score"][0] == pytest.approx(80.0)
+    assert np.isnan(aligned["school_score"][1])  # missing score stays missing, not 0
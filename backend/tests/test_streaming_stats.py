@@ -0,0 +1,81 @@
+"""Streaming correlation store: Welford merge and per-worker snapshots."""
+
+import os
+import threading
+import time
+
+import numpy as np
+
+from app.services.streaming_stats import CorrelationAccumulator, StreamingCorrelationStore
+
+
+def accumulate(rows):
+    acc = CorrelationAccumulator(rows.shape[1])
+    for row in rows:
+        acc.update(row)
+    return acc
+
+
+def feed(store, ward, steps, offset=0):
+    for step in range(steps):
+        for i, metric in enumerate(store.metrics):
+            store.observe(ward, metric, (step + offset) * (i + 1) + i * i)
+
+
+def test_merged_accumulators_match_a_single_pass():
+    rows = np.random.default_rng(3).normal(size=(50, 4)) * [1, 10, 100, 0.1]
+    merged = accumulate(rows[:17])
+    merged.merge(accumulate(rows[17:]))
+    merged.merge(CorrelationAccumulator(4))  # empty side is a no-op
+
+    assert merged.n == 50
+    np.testing.assert_allclose(merged.mean, rows.mean(axis=0))
+    np.testing.assert_allclose(merged.covariance(), np.cov(rows, rowvar=False, bias=True))
+
+    copy = merged.copy()
+    copy.update(rows[0])
+    assert merged.n == 50
+
+
+def test_workers_write_their_own_files_and_are_folded_in_once(tmp_path):
+    path = str(tmp_path / "stream.json")
+    a = StreamingCorrelationStore(snapshot_path=path, snapshot_interval=0, worker_id="a")
+    b = StreamingCorrelationStore(snapshot_path=path, snapshot_interval=0, worker_id="b")
+    feed(a, "Phường 1", 5)
+    feed(b, "Phường 1", 4, offset=7)
+    n_a, n_b = a.correlations("Phường 1")["n_samples"], b.correlations("Phường 1")["n_samples"]
+    a.close()
+    b.snapshot()  # b is still running
+    assert {"stream.a.json", "stream.b.json"} <= set(os.listdir(tmp_path))
+
+    c = StreamingCorrelationStore(snapshot_path=path, snapshot_interval=0, worker_id="c")
+    assert c.correlations("Phường 1")["n_samples"] == n_a
+    c.close()
+    b.close()
+
+    d = StreamingCorrelationStore(snapshot_path=path, snapshot_interval=0, worker_id="d")
+    assert d.correlations("Phường 1")["n_samples"] == n_a + n_b
+    assert not [name for name in os.listdir(tmp_path) if name.startswith(("stream.a.", "stream.b.", "stream.c."))]
+    d.close()
+
+
+def test_concurrent_first_use_waits_for_the_restore(tmp_path, monkeypatch):
+    path = str(tmp_path / "stream.json")
+    writer = StreamingCorrelationStore(snapshot_path=path, snapshot_interval=0, worker_id="writer")
+    feed(writer, "Phường 1", 5)
+    expected = writer.correlations("Phường 1")["n_samples"]
+    writer.close()
+
+    reader = StreamingCorrelationStore(snapshot_path=path, snapshot_interval=0, worker_id="reader")
+    compact = reader._compact
+    monkeypatch.setattr(reader, "_compact", lambda: time.sleep(0.2) or compact())
+
+    seen = []
+    threads = [threading.Thread(target=lambda: seen.append(reader.wards())) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert seen == [["Phường 1"]] * 4
+    assert reader.correlations("Phường 1")["n_samples"] == expected
+    reader.close()